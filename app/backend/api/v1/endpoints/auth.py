@@ -1,26 +1,40 @@
 from fastapi import APIRouter, HTTPException, status, Body, Depends, Header
+from fastapi.responses import JSONResponse
+from core.config import settings
 from services.auth_service import AuthService
-from schemas.auth import LoginRequest, LoginResponse, UserInfo
+from services.google_certs import dev_certificate_authority
+from schemas.auth import LoginRequest, LoginResponse, UserInfo, DevIdTokenRequest
 from schemas.common import ErrorResponse
 from typing import Annotated
 
 router = APIRouter()
 
 
-async def get_current_user(
+async def get_authenticated_user(
     authorization: Annotated[str | None, Header()] = None,
     auth_service: AuthService = Depends()
-) -> str:
+) -> dict:
     """
-    Dependency para obtener el usuario actual desde el token JWT.
-    Delega toda la lógica de validación al servicio de autenticación.
+    Dependency de autenticación compartida por todos los endpoints protegidos.
+    Delega toda la lógica de validación (con caché de tokens verificados) al
+    servicio de autenticación.
     
     :param authorization: Header de autorización con formato "Bearer <token>"
     :param auth_service: Servicio de autenticación inyectado
-    :return: Email del usuario autenticado
+    :return: Diccionario con email, name, token y expires_at del usuario autenticado
     :raises HTTPException: Si el token es inválido o no está presente
     """
-    return auth_service.get_current_user_email(authorization)
+    return auth_service.authenticate(authorization)
+
+
+async def get_current_user(user: dict = Depends(get_authenticated_user)) -> str:
+    """
+    Dependency para obtener el email del usuario actual desde el token JWT.
+    
+    :param user: Usuario autenticado.
+    :return: Email del usuario autenticado
+    """
+    return user["email"]
 
 
 @router.post(
@@ -52,7 +66,7 @@ async def login(
     :raises HTTPException: Si el token de Google es inválido
     """
     # 1. Verificar token de Google
-    user_info = auth_service.verify_google_token(request.google_token)
+    user_info = await auth_service.verify_google_token(request.google_token)
     
     if not user_info:
         raise HTTPException(
@@ -74,3 +88,38 @@ async def login(
         token_type="bearer",
         user=UserInfo(**user_info)
     )
+
+
+if settings.AUTH_DEV_MODE:
+    # Sustituto local de Google para desarrollo y pruebas sin red.
+    # Apuntar GOOGLE_CERTS_URL a /api/v1/auth/dev/certs para usarlo.
+
+    @router.get(
+        "/dev/certs",
+        summary="Certificados de desarrollo",
+        description="Claves públicas de desarrollo con el mismo formato que el endpoint de certificados de Google. Solo disponible con AUTH_DEV_MODE."
+    )
+    async def get_dev_certs():
+        """
+        Devuelve las claves públicas de desarrollo.
+        
+        :return: Diccionario kid -> clave pública PEM, cacheable durante una hora.
+        """
+        return JSONResponse(
+            dev_certificate_authority.certs(),
+            headers={"Cache-Control": f"public, max-age={dev_certificate_authority.MAX_AGE_SECONDS}"}
+        )
+
+    @router.post(
+        "/dev/id-token",
+        summary="Emitir ID token de desarrollo",
+        description="Firma un ID token con la clave de desarrollo para usarlo en `/auth/login`. Solo disponible con AUTH_DEV_MODE."
+    )
+    async def create_dev_id_token(request: DevIdTokenRequest = Body(...)):
+        """
+        Emite un ID token de desarrollo.
+        
+        :param request: Email y nombre del usuario.
+        :return: Diccionario con el ID token firmado.
+        """
+        return {"google_token": dev_certificate_authority.sign_id_token(request.email, request.name)}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Body, Depends
+from fastapi import APIRouter, HTTPException, status, Body, Depends, Query
 from schemas.interaction import InteractionCreate, InteractionResponse, InteractionSummary
 from schemas.common import ErrorResponse
 from datetime import datetime
@@ -9,12 +9,18 @@ from api.v1.endpoints.auth import get_current_user
 
 router = APIRouter()
 
+# Máximo de ubicaciones por petición del resumen agrupado
+MAX_SUMMARY_LOCATIONS = 100
+
 @router.post(
     "/",
     response_model=InteractionResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Crear nueva interacción",
-    description="Crea una nueva interacción (comentario, visita o like) asociada a una ubicación. Requiere autenticación.",
+    description=(
+        "Crea una nueva interacción (comentario, visita o like) asociada a una ubicación. Requiere autenticación. "
+        "Cada usuario puede dar un solo like por ubicación: repetirlo devuelve el like existente."
+    ),
     responses={
         201: {
             "description": "Interacción creada exitosamente",
@@ -127,7 +133,11 @@ async def get_location_interactions(
     response_model=InteractionSummary,
     status_code=status.HTTP_200_OK,
     summary="Obtener resumen de interacciones",
-    description="Obtiene un resumen con contadores de interacciones por tipo para una ubicación.",
+    description=(
+        "Obtiene un resumen con contadores de interacciones por tipo para una ubicación. "
+        "Los contadores se mantienen al crear cada interacción, así que la consulta no depende "
+        "del número de interacciones."
+    ),
     responses={
         200: {
             "description": "Resumen obtenido exitosamente",
@@ -145,14 +155,51 @@ async def get_interactions_summary(
     :param location_id: ID de la ubicación
     :return: Contadores por tipo de interacción
     """
-    interactions = await interaction_repository.get_by_location(location_id)
+    summaries = await interaction_repository.get_summaries([location_id])
+    return InteractionSummary.from_counts(location_id, summaries[location_id])
+
+
+@router.get(
+    "/summary",
+    response_model=list[InteractionSummary],
+    status_code=status.HTTP_200_OK,
+    summary="Obtener resúmenes de varias ubicaciones",
+    description=(
+        "Obtiene en una sola petición los contadores de interacciones por tipo de varias "
+        f"ubicaciones (`?location_id=a&location_id=b`, máximo {MAX_SUMMARY_LOCATIONS}). "
+        "Los resúmenes se devuelven en el orden de los IDs recibidos."
+    ),
+    responses={
+        200: {
+            "description": "Resúmenes obtenidos exitosamente",
+            "model": list[InteractionSummary]
+        },
+        400: {
+            "description": "Demasiadas ubicaciones",
+            "model": ErrorResponse
+        }
+    }
+)
+async def get_interactions_summaries(
+    location_id: list[str] = Query(..., description="IDs de las ubicaciones"),
+    interaction_repository: InteractionRepository = Depends()
+):
+    """
+    Obtiene los resúmenes de interacciones de varias ubicaciones con una sola consulta.
     
-    summary = InteractionSummary(
-        location_id=location_id,
-        total_interactions=len(interactions),
-        comments_count=sum(1 for i in interactions if i.type == "comment"),
-        visits_count=sum(1 for i in interactions if i.type == "visit"),
-        likes_count=sum(1 for i in interactions if i.type == "like")
-    )
+    :param location_id: IDs de las ubicaciones
+    :return: Contadores por tipo de interacción de cada ubicación
+    :raises HTTPException: Si se piden más de MAX_SUMMARY_LOCATIONS ubicaciones
+    """
+    location_ids = list(dict.fromkeys(location_id))
+    if len(location_ids) > MAX_SUMMARY_LOCATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Como máximo {MAX_SUMMARY_LOCATIONS} ubicaciones por petición"
+        )
     
-    return summary
+    summaries = await interaction_repository.get_summaries(location_ids)
+    return [
+        InteractionSummary.from_counts(location_id, summaries[location_id])
+        for location_id in location_ids
+    ]
@@ -1,11 +1,14 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends
-from services.map_service import GeocodingService
-from services.image_service import ImageService
+from services.map_service import GeocodingService, get_geocoding_service
+from services.image_service import ImageService, get_image_service
+from core.uploads import open_image_upload
 from schemas.location import LocationResponse, LocationSummary
 from schemas.common import ErrorResponse
 from models.location import LocationModel
 from datetime import datetime
 from repositories.location_repository import LocationRepository
+from repositories.image_repository import ImageRepository
 from api.v1.endpoints.auth import get_current_user
 
 router = APIRouter()
@@ -83,6 +86,14 @@ async def get_location(
             "description": "Dirección no encontrada o datos inválidos",
             "model": ErrorResponse
         },
+        413: {
+            "description": "Imagen o petición demasiado grande",
+            "model": ErrorResponse
+        },
+        415: {
+            "description": "El archivo no es una imagen aceptada",
+            "model": ErrorResponse
+        },
         500: {
             "description": "Error al subir imagen a Cloudinary",
             "model": ErrorResponse
@@ -96,8 +107,8 @@ async def create_location(
     image: UploadFile = File(..., description="Imagen de la ubicación (JPEG, PNG, WebP)"),
     owner_email: str = Depends(get_current_user),  # Email extraído del token JWT
     location_repository: LocationRepository = Depends(),
-    geocoding_service: GeocodingService = Depends(),
-    image_service: ImageService = Depends()
+    geocoding_service: GeocodingService = Depends(get_geocoding_service),
+    image_service: ImageService = Depends(get_image_service)
 ):
     """
     Crea una nueva ubicación con geocodificación automática y subida de imagen.
@@ -112,20 +123,23 @@ async def create_location(
     :return: Ubicación creada con coordenadas e imagen
     :raises HTTPException: Si falla la subida de imagen o geocodificación
     """
-    # 1. Upload Image to Cloudinary
-    file_content = await image.read()
-    image_url = image_service.upload_image(file_content)
+    # 1. Upload Image to Cloudinary y 2. Geocoding with OpenStreetMap, en paralelo
+    file_content = await open_image_upload(image)
+    (image_url, _), coordinates = await asyncio.gather(
+        image_service.process_and_upload(file_content),
+        geocoding_service.get_coordinates(address)
+    )
     if not image_url:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail="Error al subir imagen a Cloudinary"
         )
 
-    # 2. Geocoding with OpenStreetMap
-    coordinates = await geocoding_service.get_coordinates(address)
     lat, lng = coordinates if coordinates else (None, None)
     
     if not lat:
+        # La ubicación no se guarda: devolver la referencia que se sumó a la imagen
+        await ImageRepository().release([image_url])
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Dirección no encontrada. Verifica que sea una dirección válida."
@@ -150,3 +164,51 @@ async def create_location(
         id=str(created_location.id),
         **created_location.model_dump()
     )
+
+
+@router.delete(
+    "/{location_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Eliminar una ubicación",
+    description="Elimina una ubicación existente. Solo el propietario puede eliminarla.",
+    responses={
+        204: {
+            "description": "Ubicación eliminada exitosamente"
+        },
+        403: {
+            "description": "No tienes permiso para eliminar esta ubicación",
+            "model": ErrorResponse
+        },
+        404: {
+            "description": "Ubicación no encontrada",
+            "model": ErrorResponse
+        }
+    }
+)
+async def delete_location(
+    location_id: str,
+    owner_email: str = Depends(get_current_user),
+    location_repository: LocationRepository = Depends()
+):
+    """
+    Elimina una ubicación por su ID.
+    
+    :param location_id: ID de la ubicación a eliminar
+    :param owner_email: Email del usuario autenticado
+    :param location_repository: Repositorio de ubicaciones inyectado
+    :raises HTTPException: Si la ubicación no existe o no tiene permiso
+    """
+    location = await location_repository.get_by_id(location_id)
+    if not location:
+        raise HTTPException(status_code=404, detail="Ubicación no encontrada")
+    
+    if location.owner_email != owner_email:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para eliminar esta ubicación"
+        )
+    
+    await location_repository.delete(location_id)
+    # Las imágenes sin referencias quedan marcadas (ref_count 0) para poder eliminarlas
+    if location.image_url:
+        await ImageRepository().release([location.image_url])
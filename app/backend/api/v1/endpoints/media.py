@@ -0,0 +1,52 @@
+"""Endpoint para servir las imágenes del almacenamiento local"""
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from schemas.common import ErrorResponse
+from services.storage import LocalStorage, media_type_for
+
+router = APIRouter()
+
+# Los nombres son el hash del contenido: una URL nunca cambia de contenido
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+media_storage = LocalStorage()
+
+
+@router.get(
+    "/{file_path:path}",
+    status_code=status.HTTP_200_OK,
+    summary="Servir imagen almacenada en disco",
+    description=(
+        "Sirve una imagen del backend de almacenamiento local. Admite peticiones `Range`, "
+        "responde `304` si `If-None-Match` coincide con el ETag (hash del contenido) "
+        "y permite cachear la respuesta indefinidamente."
+    ),
+    responses={
+        200: {"description": "Contenido de la imagen", "content": {"image/*": {}}},
+        206: {"description": "Rango parcial de la imagen"},
+        304: {"description": "La copia en caché del cliente sigue siendo válida"},
+        404: {"description": "Imagen no encontrada", "model": ErrorResponse}
+    }
+)
+async def get_media(file_path: str, request: Request):
+    """
+    Devuelve una imagen del almacenamiento local.
+    FileResponse envía el fichero sin cargarlo en memoria (con pathsend si el
+    servidor ASGI lo soporta) y atiende las peticiones Range.
+
+    :param file_path: Ruta relativa de la imagen (carpeta/hash.ext).
+    :param request: Petición HTTP (para If-None-Match).
+    :return: Contenido de la imagen o 304 si el cliente ya la tiene.
+    :raises HTTPException: Si la imagen no existe.
+    """
+    path = media_storage.path_for(file_path)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+
+    etag = f'"{path.stem}"'
+    headers = {"ETag": etag, "Cache-Control": MEDIA_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(path, media_type=media_type_for(path), headers=headers)
@@ -1,56 +1,250 @@
 """Endpoints para gestión de reseñas de establecimientos"""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends, Header
-from services.map_service import GeocodingService
-from services.image_service import ImageService
-from schemas.review import ReviewResponse, ReviewSummary, GeocodingResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends, Query
+from services.map_service import (
+    GeocodingService, get_geocoding_service, DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+)
+from services.review_enrichment import enqueue_geocode_review
+from services.review_events import review_events
+from core.config import settings
+from core.responses import RawJSONResponse
+from core.uploads import open_image_upload
+from services.image_service import ImageService, get_image_service
+from schemas.review import (
+    ReviewResponse, ReviewSummary, ReviewPage, ReviewSearchPage, ReviewClusterResponse,
+    GeocodingResponse
+)
 from schemas.common import ErrorResponse
 from models.review import ReviewModel
 from datetime import datetime, timedelta
-from repositories.review_repository import ReviewRepository
-from api.v1.endpoints.auth import get_current_user
-from services.auth_service import AuthService
-from typing import Annotated
+from repositories.review_repository import ReviewRepository, BoundingBox
+from repositories.image_repository import ImageRepository
+from api.v1.endpoints.auth import get_current_user, get_authenticated_user
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Tamaño de página por defecto y máximo para el listado paginado
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Tamaño de página por defecto y máximo de la búsqueda, y resultados máximos a saltar
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 50
+MAX_SEARCH_OFFSET = 500
+
+# A partir de este zoom se devuelven reseñas individuales en lugar de clusters
+CLUSTER_MAX_ZOOM = 16
+# Tamaño aproximado en píxeles de cada celda de agrupación (teselas de 256 px)
+CLUSTER_CELL_PIXELS = 64
+# Máximo de reseñas individuales devueltas en zoom alto
+MAX_CLUSTER_POINTS = 500
+
+# Intervalo de comprobación del stream de eventos de una reseña
+REVIEW_EVENTS_POLL_SECONDS = 5.0
+
 
 @router.get(
     "",
-    response_model=list[ReviewSummary],
+    response_model=ReviewPage | list[ReviewSummary],
     status_code=status.HTTP_200_OK,
-    summary="Listar todas las reseñas",
-    description="Obtiene una lista de todas las reseñas registradas en la aplicación.",
+    summary="Listar reseñas",
+    description=(
+        "Obtiene las reseñas paginadas por cursor, de la más reciente a la más antigua. "
+        "Para pedir la siguiente página se envía en `after` el `next_cursor` de la anterior. "
+        "Con `bbox=minLon,minLat,maxLon,maxLat` solo se devuelven las reseñas visibles en ese "
+        "viewport del mapa. El modo `legacy=true` devuelve la lista completa sin paginar."
+    ),
     responses={
         200: {
-            "description": "Lista de reseñas obtenida exitosamente",
-            "model": list[ReviewSummary]
+            "description": "Página de reseñas obtenida exitosamente",
+            "model": ReviewPage
+        },
+        400: {
+            "description": "Cursor o bbox inválido",
+            "model": ErrorResponse
         }
     }
 )
 async def get_reviews(
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Número máximo de reseñas por página"
+    ),
+    after: str | None = Query(
+        None,
+        description="Cursor opaco (`next_cursor`) de la página anterior"
+    ),
+    bbox: str | None = Query(
+        None,
+        description="Viewport del mapa: minLon,minLat,maxLon,maxLat",
+        examples=["-4.45,36.70,-4.39,36.74"]
+    ),
+    legacy: bool = Query(
+        False,
+        description="Devuelve todas las reseñas en una lista sin paginar (modo antiguo)"
+    ),
     review_repository: ReviewRepository = Depends()
 ):
     """
-    Obtiene todas las reseñas del sistema.
+    Obtiene las reseñas del sistema paginadas por cursor.
     
-    :return: Lista de reseñas con información resumida.
+    :param limit: Tamaño máximo de la página.
+    :param after: Cursor de la página anterior.
+    :param bbox: Viewport del mapa en formato minLon,minLat,maxLon,maxLat.
+    :param legacy: Si es True, devuelve la lista completa sin paginar.
+    :param review_repository: Repositorio de reseñas inyectado.
+    :return: Página de reseñas con el cursor siguiente, o lista completa en modo legacy.
+    :raises HTTPException: Si el cursor o el bbox son inválidos.
     """
-    reviews = await review_repository.get_all()
-    return [
-        ReviewSummary(
-            id=str(review.id),
-            establishment_name=review.establishment_name,
-            address=review.address,
-            latitude=review.latitude or 0,
-            longitude=review.longitude or 0,
-            rating=review.rating,
-            image_urls=review.image_urls,
-            author_email=review.author_email,
-            author_name=review.author_name,
-            created_at=review.created_at
+    # Los resúmenes salen del repositorio con la forma de ReviewSummary y se
+    # serializan directamente, sin construir un modelo por reseña
+    if legacy:
+        return RawJSONResponse(await review_repository.get_all_summaries())
+    
+    bounding_box = _parse_bbox(bbox) if bbox else None
+    try:
+        items, next_cursor = await review_repository.get_summary_page(limit, after, bounding_box)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    
+    return RawJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get(
+    "/clusters",
+    response_model=ReviewClusterResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Marcadores agrupados para el mapa",
+    description=(
+        "Agrupa en el servidor las reseñas del viewport en una rejilla que depende del zoom "
+        "y devuelve, por grupo, el centroide, el número de reseñas y la valoración media. "
+        f"A partir del zoom {CLUSTER_MAX_ZOOM} se devuelven las reseñas individuales."
+    ),
+    responses={
+        200: {
+            "description": "Marcadores obtenidos exitosamente",
+            "model": ReviewClusterResponse
+        },
+        400: {
+            "description": "bbox inválido",
+            "model": ErrorResponse
+        }
+    }
+)
+async def get_review_clusters(
+    bbox: str = Query(
+        ...,
+        description="Viewport del mapa: minLon,minLat,maxLon,maxLat",
+        examples=["-4.55,36.65,-4.30,36.78"]
+    ),
+    zoom: int = Query(..., ge=0, le=22, description="Nivel de zoom del mapa (0-22)"),
+    review_repository: ReviewRepository = Depends()
+):
+    """
+    Obtiene los marcadores del mapa para un viewport y nivel de zoom.
+    
+    :param bbox: Viewport del mapa en formato minLon,minLat,maxLon,maxLat.
+    :param zoom: Nivel de zoom del mapa.
+    :param review_repository: Repositorio de reseñas inyectado.
+    :return: Clusters (zoom bajo) o reseñas individuales (zoom alto).
+    :raises HTTPException: Si el bbox es inválido.
+    """
+    bounding_box = _parse_bbox(bbox)
+    
+    if zoom >= CLUSTER_MAX_ZOOM:
+        points, _ = await review_repository.get_summary_page(MAX_CLUSTER_POINTS, bbox=bounding_box)
+        return RawJSONResponse({"zoom": zoom, "clusters": [], "points": points})
+    
+    # Grados que ocupan CLUSTER_CELL_PIXELS en una tesela de 256 px a este zoom
+    cell_size = 360 / (2 ** zoom) * CLUSTER_CELL_PIXELS / 256
+    clusters = await review_repository.get_clusters(bounding_box, cell_size)
+    return RawJSONResponse({"zoom": zoom, "clusters": clusters, "points": []})
+
+
+@router.get(
+    "/search",
+    response_model=ReviewSearchPage,
+    status_code=status.HTTP_200_OK,
+    summary="Buscar reseñas",
+    description=(
+        "Busca reseñas por palabras del nombre del establecimiento y de la dirección "
+        "(sin distinguir mayúsculas ni tildes y con raíces en español: `tapas` encuentra `tapa`). "
+        "Los resultados se ordenan por relevancia; el nombre pesa más que la dirección. "
+        "Admite `\"frase exacta\"` y `-palabra` para excluir. Para la siguiente página se "
+        "envía en `offset` el `next_offset` de la anterior."
+    ),
+    responses={
+        200: {
+            "description": "Resultados obtenidos exitosamente",
+            "model": ReviewSearchPage
+        }
+    }
+)
+async def search_reviews(
+    q: str = Query(
+        ...,
+        min_length=2,
+        max_length=100,
+        description="Palabras a buscar",
+        examples=["casa lola"]
+    ),
+    limit: int = Query(
+        DEFAULT_SEARCH_PAGE_SIZE,
+        ge=1,
+        le=MAX_SEARCH_PAGE_SIZE,
+        description="Número máximo de resultados por página"
+    ),
+    offset: int = Query(
+        0,
+        ge=0,
+        le=MAX_SEARCH_OFFSET,
+        description="Resultados a saltar (`next_offset` de la página anterior)"
+    ),
+    review_repository: ReviewRepository = Depends()
+):
+    """
+    Busca reseñas con el índice de texto ordenadas por relevancia.
+    
+    :param q: Palabras a buscar.
+    :param limit: Tamaño máximo de la página.
+    :param offset: Resultados a saltar.
+    :param review_repository: Repositorio de reseñas inyectado.
+    :return: Página de resultados con el offset de la siguiente.
+    """
+    results, has_more = await review_repository.search(q, limit, offset)
+    next_offset = offset + limit if has_more and offset + limit <= MAX_SEARCH_OFFSET else None
+    return RawJSONResponse({"items": results, "next_offset": next_offset})
+
+
+def _parse_bbox(bbox: str) -> BoundingBox:
+    """
+    Parsea y valida un viewport en formato minLon,minLat,maxLon,maxLat.
+    
+    :param bbox: Cadena con las cuatro coordenadas separadas por comas.
+    :return: Tupla (min_lon, min_lat, max_lon, max_lat).
+    :raises HTTPException: Si el formato o los rangos no son válidos.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="bbox inválido. Formato esperado: minLon,minLat,maxLon,maxLat"
         )
-        for review in reviews
-    ]
+    
+    if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+        raise HTTPException(status_code=400, detail="bbox inválido: longitud fuera de rango")
+    if not (-90 <= min_lat < max_lat <= 90):
+        raise HTTPException(status_code=400, detail="bbox inválido: latitud fuera de rango")
+    
+    return min_lon, min_lat, max_lon, max_lat
 
 
 @router.get(
@@ -85,14 +279,26 @@ async def get_review(
     if not review:
         raise HTTPException(status_code=404, detail="Reseña no encontrada")
     
+    return _to_response(review)
+
+
+def _to_response(review: ReviewModel) -> ReviewResponse:
+    """
+    Convierte un documento de reseña en la respuesta completa.
+    
+    :param review: Modelo de la reseña.
+    :return: Reseña con toda su información, incluido el token OAuth.
+    """
     return ReviewResponse(
         id=str(review.id),
         establishment_name=review.establishment_name,
         address=review.address,
-        latitude=review.latitude or 0,
-        longitude=review.longitude or 0,
+        latitude=review.latitude,
+        longitude=review.longitude,
+        geocode_status=review.geocode_status,
         rating=review.rating,
         image_urls=review.image_urls,
+        thumbnail_urls=review.thumbnail_urls,
         author_email=review.author_email,
         author_name=review.author_name,
         auth_token=review.auth_token,
@@ -101,12 +307,94 @@ async def get_review(
     )
 
 
+@router.get(
+    "/{review_id}/events",
+    status_code=status.HTTP_200_OK,
+    summary="Suscribirse a cambios de una reseña",
+    description=(
+        "Stream Server-Sent Events con el estado de geocodificación de la reseña. "
+        "Envía el estado actual y, mientras esté `pending`, cada actualización; "
+        "el stream se cierra cuando la geocodificación termina."
+    ),
+    responses={
+        200: {
+            "description": "Stream de eventos (text/event-stream)",
+            "content": {"text/event-stream": {}}
+        },
+        404: {
+            "description": "Reseña no encontrada",
+            "model": ErrorResponse
+        }
+    }
+)
+async def stream_review_events(
+    review_id: str,
+    review_repository: ReviewRepository = Depends()
+):
+    """
+    Envía por SSE el estado de geocodificación de una reseña hasta que deja de estar pendiente.
+    
+    :param review_id: ID de la reseña en MongoDB.
+    :param review_repository: Repositorio de reseñas inyectado.
+    :return: Respuesta de streaming text/event-stream.
+    :raises HTTPException: Si la reseña no existe.
+    """
+    review = await review_repository.get_by_id(review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Reseña no encontrada")
+    
+    async def event_stream():
+        queue = review_events.subscribe(review_id)
+        current = review
+        try:
+            yield _review_event(current)
+            while current and current.geocode_status == "pending":
+                try:
+                    # La notificación llega del worker de este proceso; si la reseña
+                    # la geocodifica otro proceso, se detecta al volver a consultarla
+                    await asyncio.wait_for(queue.get(), timeout=REVIEW_EVENTS_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                current = await review_repository.get_by_id(review_id)
+                if current and current.geocode_status != "pending":
+                    yield _review_event(current)
+        finally:
+            review_events.unsubscribe(review_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _review_event(review: ReviewModel) -> str:
+    """
+    Formatea el estado de geocodificación de una reseña como evento SSE.
+    
+    :param review: Modelo de la reseña.
+    :return: Evento SSE serializado.
+    """
+    data = {
+        "id": str(review.id),
+        "latitude": review.latitude,
+        "longitude": review.longitude,
+        "geocode_status": review.geocode_status
+    }
+    return f"event: review\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post(
     "",
     response_model=ReviewResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Crear nueva reseña",
-    description="Crea una nueva reseña con geocodificación automática y subida de imágenes a Cloudinary. Requiere autenticación OAuth.",
+    description=(
+        "Crea una nueva reseña con geocodificación automática y subida de imágenes a Cloudinary. "
+        "Si la dirección no está en caché, la reseña se devuelve con `geocode_status: pending` y las "
+        "coordenadas se rellenan en segundo plano (consultar `GET /reviews/{id}` o "
+        "`GET /reviews/{id}/events`). Requiere autenticación OAuth."
+    ),
     responses={
         201: {
             "description": "Reseña creada exitosamente",
@@ -120,6 +408,14 @@ async def get_review(
             "description": "No autenticado",
             "model": ErrorResponse
         },
+        413: {
+            "description": "Imagen o petición demasiado grande",
+            "model": ErrorResponse
+        },
+        415: {
+            "description": "El archivo no es una imagen aceptada",
+            "model": ErrorResponse
+        },
         500: {
             "description": "Error al subir imágenes a Cloudinary",
             "model": ErrorResponse
@@ -148,11 +444,10 @@ async def create_review(
         default=[],
         description="Imágenes del establecimiento (JPEG, PNG, WebP). Puede subir múltiples archivos."
     ),
-    authorization: Annotated[str | None, Header()] = None,
+    user: dict = Depends(get_authenticated_user),
     review_repository: ReviewRepository = Depends(),
-    geocoding_service: GeocodingService = Depends(),
-    image_service: ImageService = Depends(),
-    auth_service: AuthService = Depends()
+    geocoding_service: GeocodingService = Depends(get_geocoding_service),
+    image_service: ImageService = Depends(get_image_service)
 ):
     """
     Crea una nueva reseña con geocodificación automática y subida de imágenes.
@@ -161,76 +456,47 @@ async def create_review(
     :param address: Dirección para geocodificar.
     :param rating: Valoración de 0 a 5.
     :param images: Lista de archivos de imagen.
-    :param authorization: Header de autorización Bearer token.
+    :param user: Usuario autenticado (email, nombre y token).
     :param review_repository: Repositorio de reseñas inyectado.
     :param geocoding_service: Servicio de geocodificación inyectado.
     :param image_service: Servicio de imágenes inyectado.
-    :param auth_service: Servicio de autenticación inyectado.
     :return: Reseña creada con coordenadas e imágenes.
     :raises HTTPException: Si falla la autenticación, subida de imagen o geocodificación.
     """
-    # 0. Validar autenticación y obtener información del usuario
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token de autorización requerido"
-        )
-    
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise ValueError("Esquema inválido")
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Formato de token inválido"
-        )
+    # 0. Datos del usuario autenticado
+    user_email = user["email"]
+    user_name = user["name"]
+    token = user["token"]
+    expires_at = user["expires_at"] or datetime.utcnow() + timedelta(hours=24)
     
-    payload = auth_service.verify_access_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido o expirado"
-        )
-    
-    user_email = payload.get("sub")
-    # Obtener el nombre del usuario del token, o usar parte del email como fallback
-    user_name = payload.get("name", user_email.split("@")[0] if user_email else "Usuario")
-    
-    # Obtener timestamps del token
-    token_exp = payload.get("exp")
-    expires_at = datetime.fromtimestamp(token_exp) if token_exp else datetime.utcnow() + timedelta(hours=24)
+    # 1. Upload Images to Cloudinary and Geocoding, en paralelo
+    uploads = [image for image in images if image.filename]  # Solo procesar si hay archivo
+    # Se validan todas antes de subir ninguna; las imágenes se envían como stream
+    files_content = [await open_image_upload(image) for image in uploads]
+    uploaded_urls, (lat, lng, geocode_status) = await asyncio.gather(
+        image_service.process_and_upload_images(files_content),
+        _geocode_review_address(address, geocoding_service)
+    )
     
-    # 1. Upload Images to Cloudinary
     image_urls = []
-    for image in images:
-        if image.filename:  # Solo procesar si hay archivo
-            file_content = await image.read()
-            image_url = image_service.upload_image(file_content)
-            if image_url:
-                image_urls.append(image_url)
-            else:
-                print(f"Error al subir imagen: {image.filename}")
-    
-    # 2. Geocoding with OpenStreetMap
-    coordinates = await geocoding_service.get_coordinates(address)
-    
-    if coordinates:
-        lat, lng = coordinates
-        print(f"Geocoding success for review: {address} -> ({lat}, {lng})")
-    else:
-        # Usar coordenadas por defecto cuando falla el geocoding
-        lat, lng = DEFAULT_LATITUDE, DEFAULT_LONGITUDE
-        print(f"Using default coordinates for review: {address} -> ({lat}, {lng})")
+    thumbnail_urls = []
+    for image, (image_url, thumbnail_url) in zip(uploads, uploaded_urls):
+        if image_url:
+            image_urls.append(image_url)
+            thumbnail_urls.append(thumbnail_url or image_url)
+        else:
+            logger.warning("Error al subir imagen: %s", image.filename)
     
-    # 3. Create Review Model
+    # 2. Create Review Model
     review_data = ReviewModel(
         establishment_name=establishment_name,
         address=address,
         latitude=lat,
         longitude=lng,
+        geocode_status=geocode_status,
         rating=rating,
         image_urls=image_urls,
+        thumbnail_urls=thumbnail_urls,
         author_email=user_email,
         author_name=user_name,
         auth_token=token,
@@ -238,23 +504,65 @@ async def create_review(
         expires_at=expires_at
     )
     
-    # 4. Save to Database
-    created_review = await review_repository.create(review_data)
+    # 3. Save to Database
+    try:
+        created_review = await review_repository.create(review_data)
+    except Exception:
+        # Las imágenes ya tienen su referencia: liberarla para que la limpieza
+        # periódica pueda borrarlas
+        if image_urls:
+            try:
+                await ImageRepository().release(image_urls)
+            except Exception:
+                logger.exception("Error releasing images of unsaved review")
+        raise
     
-    return ReviewResponse(
-        id=str(created_review.id),
-        establishment_name=created_review.establishment_name,
-        address=created_review.address,
-        latitude=created_review.latitude or 0,
-        longitude=created_review.longitude or 0,
-        rating=created_review.rating,
-        image_urls=created_review.image_urls,
-        author_email=created_review.author_email,
-        author_name=created_review.author_name,
-        auth_token=created_review.auth_token,
-        created_at=created_review.created_at,
-        expires_at=created_review.expires_at
-    )
+    # 4. Encolar la geocodificación diferida
+    if geocode_status == "pending":
+        try:
+            await enqueue_geocode_review(created_review.id, address)
+        except Exception:
+            # pending_geocoding_sweeper la encolará en su próxima pasada
+            logger.exception("Error enqueuing geocoding for review %s", created_review.id)
+    
+    return _to_response(created_review)
+
+
+async def _geocode_review_address(
+    address: str,
+    geocoding_service: GeocodingService
+) -> tuple[float | None, float | None, str]:
+    """
+    Obtiene las coordenadas de una reseña nueva.
+    
+    :param address: Dirección del establecimiento.
+    :param geocoding_service: Servicio de geocodificación.
+    :return: Tupla (lat, lng, geocode_status); lat y lng son None si la
+             geocodificación queda pendiente para el worker.
+    """
+    # Geocoding with OpenStreetMap
+    if settings.GEOCODING_ASYNC_ENRICHMENT:
+        # Solo se resuelve al momento si la dirección está en el gazetteer o en
+        # caché; si no, o si la caché la guarda como no encontrada, la reseña se
+        # guarda como pendiente y un worker la geocodifica después
+        _, coordinates = await geocoding_service.lookup_local(address)
+        geocode_status = "done" if coordinates else "pending"
+    else:
+        coordinates = await geocoding_service.get_coordinates(address)
+        geocode_status = "done" if coordinates else "failed"
+    
+    if coordinates:
+        lat, lng = coordinates
+        logger.debug("Geocoding success for review: %s -> (%s, %s)", address, lat, lng)
+    elif geocode_status == "pending":
+        lat, lng = None, None
+        logger.debug("Geocoding deferred for review: %s", address)
+    else:
+        # Usar coordenadas por defecto cuando falla el geocoding
+        lat, lng = DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+        logger.info("Using default coordinates for review: %s -> (%s, %s)", address, lat, lng)
+    
+    return lat, lng, geocode_status
 
 
 @router.delete(
@@ -300,11 +608,10 @@ async def delete_review(
         )
     
     await review_repository.delete(review_id)
+    # Las imágenes sin referencias quedan marcadas (ref_count 0) para poder eliminarlas
+    await ImageRepository().release(review.image_urls)
 
 
-# Coordenadas por defecto (Málaga, España) cuando falla el geocoding
-DEFAULT_LATITUDE = 36.7213028
-DEFAULT_LONGITUDE = -4.4216366
 GEOCODING_WARNING = (
     "⚠️ No se pudo geocodificar la dirección (incompatibilidad con el servicio de hosting Render). "
     "Se han asignado coordenadas por defecto (Málaga, España). "
@@ -327,7 +634,7 @@ GEOCODING_WARNING = (
 )
 async def geocode_address(
     address: str = Form(..., description="Dirección a geocodificar"),
-    geocoding_service: GeocodingService = Depends()
+    geocoding_service: GeocodingService = Depends(get_geocoding_service)
 ):
     """
     Geocodifica una dirección postal y devuelve sus coordenadas.
@@ -341,7 +648,7 @@ async def geocode_address(
     
     if not coordinates:
         # Usar coordenadas por defecto cuando falla el geocoding
-        print(f"Using default coordinates for: {address}")
+        logger.info("Using default coordinates for: %s", address)
         return GeocodingResponse(
             latitude=DEFAULT_LATITUDE,
             longitude=DEFAULT_LONGITUDE,
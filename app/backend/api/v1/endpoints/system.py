@@ -0,0 +1,108 @@
+"""Endpoints operativos: estado de cachés, proveedores y tareas en segundo plano"""
+from fastapi import APIRouter, HTTPException, status, Depends
+from services.map_service import GeocodingService, get_geocoding_service
+from services.geocode_cache import geocode_cache
+from services.image_service import image_stage_timings
+from services.image_gc import image_garbage_collector
+from schemas.review import GeocodeCacheStats, GeocodingProviderStatus, ImageStageTiming, ImageGcReport
+from schemas.common import ErrorResponse
+
+# Se monta en main.py fuera de /api/v1, junto a /metrics: no forma parte de la API pública
+router = APIRouter()
+
+
+@router.get(
+    "/geocode/cache",
+    response_model=GeocodeCacheStats,
+    status_code=status.HTTP_200_OK,
+    summary="Estadísticas de la caché de geocodificación",
+    description="Devuelve los contadores de aciertos y fallos de la caché de geocodificación de este proceso.",
+    responses={
+        200: {
+            "description": "Estadísticas obtenidas exitosamente",
+            "model": GeocodeCacheStats
+        }
+    }
+)
+async def get_geocode_cache_stats():
+    """
+    Obtiene los contadores de la caché de geocodificación.
+    
+    :return: Aciertos en memoria y en MongoDB, fallos y tamaño de la caché.
+    """
+    return GeocodeCacheStats(**geocode_cache.stats())
+
+
+@router.get(
+    "/geocode/providers",
+    response_model=list[GeocodingProviderStatus],
+    status_code=status.HTTP_200_OK,
+    summary="Estado de los proveedores de geocodificación",
+    description=(
+        "Devuelve, en el orden en que se probarían ahora, el estado del circuit breaker, "
+        "la tasa de éxito y las latencias de cada proveedor de geocodificación."
+    ),
+    responses={
+        200: {
+            "description": "Estado obtenido exitosamente",
+            "model": list[GeocodingProviderStatus]
+        }
+    }
+)
+async def get_geocoding_providers(
+    geocoding_service: GeocodingService = Depends(get_geocoding_service)
+):
+    """
+    Obtiene el estado de salud de los proveedores de geocodificación.
+    
+    :param geocoding_service: Servicio de geocodificación inyectado.
+    :return: Lista de proveedores con su estado.
+    """
+    return [
+        GeocodingProviderStatus(**provider)
+        for provider in geocoding_service.provider_status()
+    ]
+
+
+@router.get(
+    "/images/timings",
+    response_model=dict[str, ImageStageTiming],
+    status_code=status.HTTP_200_OK,
+    summary="Tiempos del procesado de imágenes",
+    description="Tiempo medio y máximo de cada etapa del procesado de imágenes (volcado, decodificación, orientación, redimensionado, codificación, miniatura y subida) desde el arranque."
+)
+async def get_image_stage_timings():
+    """
+    Devuelve los tiempos acumulados de cada etapa del procesado de imágenes.
+    
+    :return: Diccionario etapa -> estadísticas.
+    """
+    return {
+        stage: ImageStageTiming(**timing)
+        for stage, timing in image_stage_timings.snapshot().items()
+    }
+
+
+@router.get(
+    "/images/gc",
+    response_model=ImageGcReport,
+    status_code=status.HTTP_200_OK,
+    summary="Informe de limpieza de imágenes",
+    description="Informe de la última pasada del recolector de imágenes huérfanas (en modo simulación solo indica qué se borraría).",
+    responses={
+        404: {
+            "description": "Todavía no se ha ejecutado ninguna pasada",
+            "model": ErrorResponse
+        }
+    }
+)
+async def get_image_gc_report():
+    """
+    Devuelve el informe de la última pasada de limpieza de imágenes.
+    
+    :return: Informe de la pasada.
+    :raises HTTPException: Si aún no se ha ejecutado ninguna.
+    """
+    if image_garbage_collector.last_report is None:
+        raise HTTPException(status_code=404, detail="Todavía no se ha ejecutado ninguna limpieza")
+    return ImageGcReport(**image_garbage_collector.last_report)
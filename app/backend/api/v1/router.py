@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from api.v1.endpoints import auth, locations, interactions, reviews
+from api.v1.endpoints import auth, locations, interactions, reviews, media
 
 api_router = APIRouter()
 
@@ -7,3 +7,4 @@ api_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
 api_router.include_router(locations.router, prefix="/locations", tags=["Locations"])
 api_router.include_router(interactions.router, prefix="/interactions", tags=["Interactions"])
 api_router.include_router(reviews.router, prefix="/reviews", tags=["Reviews"])
+api_router.include_router(media.router, prefix="/media", tags=["Media"])
@@ -21,6 +21,101 @@ class Settings(BaseSettings):
     # JWT Secret Key
     SECRET_KEY: str = "exam_secret_key_12345"  # Por defecto para desarrollo, cambiar en producción
     
+    # Certificados de firma de los ID tokens de Google (se cachean según su Cache-Control)
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
+    # Expone /auth/dev/certs y /auth/dev/id-token para probar el login sin red
+    AUTH_DEV_MODE: bool = False
+    
+    # Caché de JWT ya verificados (clave: hash del token, caduca con su 'exp')
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Geocoding cache
+    GEOCODE_CACHE_MAX_ENTRIES: int = 10000  # Entradas en la caché en memoria (LRU)
+    GEOCODE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600  # Validez de un resultado positivo
+    GEOCODE_CACHE_NEGATIVE_TTL_SECONDS: int = 600  # Validez de "dirección no encontrada"
+    
+    # Geocoding HTTP client (compartido durante toda la vida de la aplicación)
+    GEOCODING_HTTP2: bool = False  # Requiere el paquete 'h2'
+    GEOCODING_MAX_CONNECTIONS: int = 20
+    GEOCODING_MAX_CONNECTIONS_PER_HOST: int = 4
+    GEOCODING_KEEPALIVE_SECONDS: float = 60.0
+    
+    # Geocoding hedging: lanza el siguiente proveedor si el actual tarda demasiado
+    GEOCODING_HEDGED: bool = True  # False = cascada secuencial estricta
+    GEOCODING_HEDGE_DELAY_SECONDS: float = 2.0  # Retardo inicial hasta tener muestras de latencia
+    GEOCODING_LATENCY_BUDGET_SECONDS: float = 20.0  # Tiempo máximo total de una geocodificación
+    
+    # Geocoding circuit breakers y orden adaptativo de proveedores
+    GEOCODING_BREAKER_WINDOW: int = 20  # Resultados recientes considerados por proveedor
+    GEOCODING_BREAKER_MIN_CALLS: int = 5  # Mínimo de resultados antes de abrir el circuito
+    GEOCODING_BREAKER_FAILURE_RATE: float = 0.5  # Tasa de fallos que abre el circuito
+    GEOCODING_BREAKER_OPEN_SECONDS: float = 60.0  # Tiempo abierto antes de la petición de prueba
+    GEOCODING_LATENCY_EWMA_ALPHA: float = 0.2  # Peso de la última muestra en la latencia media
+    
+    # Geocoding rate limiting (token bucket por proveedor)
+    # Formato "Proveedor=peticiones_por_segundo" separados por comas
+    GEOCODING_RATE_LIMITS: str = "Nominatim=1,Photon=5,Geocode.maps.co=1,Open-Meteo=10"
+    GEOCODING_RATE_LIMIT_MAX_WAIT_SECONDS: float = 5.0  # Espera máxima en cola
+    GEOCODING_RATE_LIMIT_SHARED: bool = False  # Compartir el límite entre procesos vía MongoDB
+    
+    # Enriquecimiento asíncrono: la reseña se guarda antes de geocodificarla
+    GEOCODING_ASYNC_ENRICHMENT: bool = True
+    
+    # Cola de trabajos en segundo plano (colección 'jobs')
+    JOB_WORKERS: int = 2  # Workers concurrentes por proceso
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0  # Sondeo cuando la cola está vacía
+    JOB_LEASE_SECONDS: float = 120.0  # Reserva de un trabajo antes de recuperarlo
+    JOB_RETRY_BASE_SECONDS: float = 60.0  # Primer reintento; se duplica en cada uno
+    JOB_MAX_ATTEMPTS: int = 5
+    # Revisión de reseñas pendientes de geocodificar sin trabajo (al arrancar y periódicamente)
+    GEOCODE_PENDING_SWEEP_SECONDS: int = 300
+    
+    # Subida de imágenes: hilos compartidos y subidas simultáneas por petición
+    IMAGE_UPLOAD_WORKERS: int = 8
+    IMAGE_UPLOAD_CONCURRENCY: int = 4
+    IMAGE_UPLOAD_CHUNK_BYTES: int = 6 * 1024 * 1024  # Cloudinary exige trozos de al menos 5 MB
+    MAX_IMAGE_BYTES: int = 10 * 1024 * 1024  # Por imagen; se comprueba tras recibir el formulario
+    MAX_REQUEST_BYTES: int = 60 * 1024 * 1024  # Cuerpo completo (varias imágenes)
+    
+    # Almacenamiento de imágenes: cloudinary o local (disco, servido en /api/v1/media)
+    IMAGE_STORAGE_BACKEND: str = "cloudinary"
+    MEDIA_ROOT: str = "media"
+    MEDIA_BASE_URL: str = "http://localhost:8000/api/v1/media"
+    
+    # Limpieza periódica de imágenes huérfanas en el almacenamiento
+    IMAGE_GC_ENABLED: bool = True
+    IMAGE_GC_DRY_RUN: bool = True  # Solo informa; poner a False para borrar
+    IMAGE_GC_INTERVAL_SECONDS: int = 6 * 3600
+    IMAGE_GC_GRACE_SECONDS: int = 24 * 3600  # No tocar imágenes más recientes
+    IMAGE_GC_FOLDER: str = "reviews"
+    IMAGE_GC_BATCH_SIZE: int = 100
+    IMAGE_GC_BATCHES_PER_SECOND: float = 1.0
+    
+    # Revisión periódica de los contadores de interacciones por ubicación
+    INTERACTION_COUNTERS_RECONCILE_ENABLED: bool = True
+    INTERACTION_COUNTERS_RECONCILE_SECONDS: int = 3600
+    
+    # Preprocesado de imágenes antes de subirlas (pool de procesos con Pillow)
+    IMAGE_PREPROCESSING: bool = True
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_MAX_DIMENSION: int = 2048
+    IMAGE_THUMBNAIL_SIZE: int = 400
+    IMAGE_OUTPUT_FORMAT: str = "webp"  # webp o jpeg
+    IMAGE_QUALITY: int = 80
+    
+    # Gazetteer local: CSV (name, latitude, longitude, city[, country]) o volcado
+    # de GeoNames (.txt). Vacío para desactivarlo
+    GAZETTEER_PATH: str = ""
+    
+    # Logging: nivel global, niveles por módulo ("services.map_service=DEBUG,...")
+    # y formato de salida (json o text)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_FORMAT: str = "json"
+    
+    # Métricas de Prometheus en /metrics
+    METRICS_ENABLED: bool = True
+    
     # CORS Configuration
     # Lista de orígenes permitidos separados por comas
     # Ejemplo: "http://localhost:5173,https://mi-app.vercel.app"
@@ -33,6 +128,16 @@ class Settings(BaseSettings):
             return []
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",") if origin.strip()]
     
+    @property
+    def geocoding_rate_limits(self) -> dict[str, float]:
+        """Convierte GEOCODING_RATE_LIMITS en un diccionario proveedor -> peticiones/segundo."""
+        limits = {}
+        for item in self.GEOCODING_RATE_LIMITS.split(","):
+            if "=" in item:
+                name, rate = item.split("=", 1)
+                limits[name.strip()] = float(rate)
+        return limits
+    
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
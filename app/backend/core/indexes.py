@@ -0,0 +1,421 @@
+"""
+Registro declarativo de los índices de MongoDB y verificación de los planes de consulta.
+
+Los índices se crean de forma idempotente al arrancar la aplicación. Para
+comprobar que cada consulta de los repositorios (incluidas las agregaciones)
+se resuelve con su índice, sin COLLSCAN ni recorridos de otro índice:
+
+    python -m core.indexes
+"""
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from core.config import settings
+from core.database import db
+from repositories.image_repository import ImageRepository
+from repositories.interaction_repository import InteractionRepository, LIKE_UNIQUE_INDEX
+from repositories.job_repository import CLAIM_SORT, JobRepository
+from repositories.review_repository import SEARCH_SORT, SUMMARY_SORT, ReviewRepository
+
+logger = logging.getLogger(__name__)
+
+# Códigos de error de MongoDB cuando ya existe un índice con el mismo nombre o claves
+_INDEX_CONFLICT_CODES = {85, 86}
+
+# Índices de cada colección
+INDEXES: dict[str, list[IndexModel]] = {
+    "reviews": [
+        # Listado paginado (created_at, _id) y get_all ordenado por created_at
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id_desc"),
+        IndexModel([("author_email", ASCENDING), ("created_at", DESCENDING)], name="author_email_created_at"),
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+        # Reseñas que esperan al worker de geocodificación (pocas en cada momento)
+        IndexModel(
+            [("geocode_status", ASCENDING)],
+            name="geocode_status_pending",
+            partialFilterExpression={"geocode_status": "pending"}
+        ),
+        # Búsqueda por palabras; el nombre pesa más que la dirección al ordenar por relevancia
+        IndexModel(
+            [("establishment_name", TEXT), ("address", TEXT)],
+            name="establishment_name_address_text",
+            weights={"establishment_name": 3, "address": 1},
+            default_language="spanish"
+        ),
+    ],
+    "locations": [
+        IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+    ],
+    "interactions": [
+        IndexModel([("location_id", ASCENDING), ("created_at", DESCENDING)], name="location_id_created_at"),
+        # Cubre el $group del resumen: se resuelve solo con el índice, sin leer documentos
+        IndexModel([("location_id", ASCENDING), ("type", ASCENDING)], name="location_id_type"),
+        # Un solo like por usuario y ubicación
+        IndexModel(
+            [("location_id", ASCENDING), ("user_email", ASCENDING)],
+            name=LIKE_UNIQUE_INDEX,
+            unique=True,
+            partialFilterExpression={"type": "like"}
+        ),
+    ],
+    "jobs": [
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+        IndexModel([("status", ASCENDING), ("leased_until", ASCENDING)], name="status_leased_until"),
+        # Trabajos idempotentes: un solo trabajo por clave (p. ej. geocode_review:<id>)
+        IndexModel(
+            [("key", ASCENDING)],
+            name="key_unique",
+            unique=True,
+            partialFilterExpression={"key": {"$exists": True}}
+        ),
+        # Los trabajos terminados se eliminan solos pasada una semana
+        IndexModel(
+            [("updated_at", ASCENDING)],
+            name="done_updated_at_ttl",
+            expireAfterSeconds=7 * 24 * 3600,
+            partialFilterExpression={"status": "done"}
+        ),
+    ],
+    "images": [
+        IndexModel([("url", ASCENDING)], name="url"),
+        IndexModel([("ref_count", ASCENDING), ("updated_at", ASCENDING)], name="ref_count_updated_at"),
+    ],
+    "geocode_cache": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """
+    Consulta de un repositorio con valores de ejemplo para explain(): un
+    filtro (con orden opcional) o un pipeline de agregación, y los índices
+    con los que debe resolverse.
+    """
+
+    name: str
+    collection: str
+    indexes: tuple[str, ...]
+    filter: dict | None = None
+    sort: list[tuple[str, Any]] = field(default_factory=list)
+    pipeline: list[dict] | None = None
+    # Si debe resolverse solo con el índice, sin leer ningún documento
+    covered: bool = False
+
+
+_SAMPLE_ID = ObjectId()
+_SAMPLE_DATE = datetime(2024, 1, 1)
+_SAMPLE_BBOX = (-5.0, 36.0, -4.0, 37.0)
+_SAMPLE_WORLD_BBOX = (-180.0, -85.0, 180.0, 85.0)
+_SAMPLE_ANTIMERIDIAN_BBOX = (170.0, -20.0, -170.0, 20.0)
+
+# Documentos leídos por documento devuelto a partir de los cuales un plan se
+# considera un recorrido (p. ej. un índice de orden filtrando por $geoWithin).
+# Deja margen para los falsos positivos de las celdas de 2dsphere.
+MAX_DOCS_EXAMINED_PER_RETURNED = 10
+
+# Consultas de los repositorios que deben resolverse con un índice. Los filtros
+# y pipelines se construyen con los mismos métodos que usan los repositorios.
+# get_image_urls de reseñas y ubicaciones y la lectura de interaction_counters
+# en reconcile_counters recorren la colección a propósito (tareas en segundo
+# plano que necesitan todos los documentos) y no se incluyen.
+QUERY_SHAPES: list[QueryShape] = [
+    QueryShape(
+        "ReviewRepository.get_all_summaries", "reviews", ("created_at_id_desc",),
+        filter={}, sort=[("created_at", DESCENDING)]
+    ),
+    QueryShape(
+        "ReviewRepository.get_summary_page", "reviews", ("created_at_id_desc",),
+        filter=ReviewRepository.summary_page_filter((_SAMPLE_DATE, _SAMPLE_ID)), sort=SUMMARY_SORT
+    ),
+    QueryShape(
+        "ReviewRepository.get_summary_page(bbox)", "reviews", ("location_2dsphere",),
+        filter=ReviewRepository.summary_page_filter(bbox=_SAMPLE_BBOX), sort=SUMMARY_SORT
+    ),
+    QueryShape(
+        "ReviewRepository.get_summary_page(bbox world)", "reviews", ("location_2dsphere",),
+        filter=ReviewRepository.summary_page_filter(bbox=_SAMPLE_WORLD_BBOX), sort=SUMMARY_SORT
+    ),
+    QueryShape(
+        "ReviewRepository.get_summary_page(bbox antimeridian)", "reviews", ("location_2dsphere",),
+        filter=ReviewRepository.summary_page_filter(bbox=_SAMPLE_ANTIMERIDIAN_BBOX), sort=SUMMARY_SORT
+    ),
+    QueryShape(
+        "ReviewRepository.get_clusters", "reviews", ("location_2dsphere",),
+        pipeline=ReviewRepository.clusters_pipeline(_SAMPLE_BBOX, 0.1)
+    ),
+    QueryShape(
+        "ReviewRepository.get_pending_geocoding", "reviews", ("geocode_status_pending",),
+        filter=ReviewRepository.pending_geocoding_filter()
+    ),
+    QueryShape("ReviewRepository.get_by_id", "reviews", ("_id_",), filter={"_id": _SAMPLE_ID}),
+    QueryShape(
+        "ReviewRepository.get_by_author", "reviews", ("author_email_created_at",),
+        filter={"author_email": "user@example.com"}, sort=[("created_at", DESCENDING)]
+    ),
+    QueryShape(
+        "ReviewRepository.search", "reviews", ("establishment_name_address_text",),
+        filter=ReviewRepository.search_filter("casa lola"), sort=SEARCH_SORT
+    ),
+    QueryShape(
+        "LocationRepository.get_all", "locations", ("created_at_desc",),
+        filter={}, sort=[("created_at", DESCENDING)]
+    ),
+    QueryShape("LocationRepository.get_by_id", "locations", ("_id_",), filter={"_id": _SAMPLE_ID}),
+    QueryShape(
+        "InteractionRepository.get_by_location", "interactions", ("location_id_created_at",),
+        filter={"location_id": str(_SAMPLE_ID)}, sort=[("created_at", DESCENDING)]
+    ),
+    QueryShape(
+        "InteractionRepository.count_by_location", "interactions", ("location_id_type",),
+        pipeline=InteractionRepository.count_pipeline([str(_SAMPLE_ID)]), covered=True
+    ),
+    QueryShape(
+        "InteractionRepository.reconcile_counters", "interactions", ("location_id_type",),
+        pipeline=InteractionRepository.count_pipeline(), covered=True
+    ),
+    QueryShape(
+        "InteractionRepository.create(like)", "interactions", (LIKE_UNIQUE_INDEX,),
+        filter=InteractionRepository.like_filter(str(_SAMPLE_ID), "user@example.com")
+    ),
+    QueryShape(
+        "InteractionRepository.get_summaries", "interaction_counters", ("_id_",),
+        filter={"_id": {"$in": [str(_SAMPLE_ID)]}}
+    ),
+    QueryShape(
+        "JobRepository.claim", "jobs", ("status_run_at", "status_leased_until"),
+        filter=JobRepository.claimable_filter(_SAMPLE_DATE), sort=CLAIM_SORT
+    ),
+    QueryShape("JobRepository.complete", "jobs", ("_id_",), filter={"_id": _SAMPLE_ID}),
+    QueryShape("JobRepository.enqueue(key)", "jobs", ("key_unique",), filter={"key": "geocode_review:sample"}),
+    QueryShape("ImageRepository.acquire", "images", ("_id_",), filter={"_id": "0" * 64}),
+    QueryShape(
+        "ImageRepository.release", "images", ("url",),
+        filter=ImageRepository.release_filter(["https://example.com/a.webp"], 1)
+    ),
+    QueryShape(
+        "ImageRepository.get_referenced_urls", "images", ("ref_count_updated_at",),
+        filter=ImageRepository.referenced_filter(_SAMPLE_DATE)
+    ),
+    QueryShape(
+        "ImageRepository.delete_unreferenced", "images", ("ref_count_updated_at",),
+        filter=ImageRepository.unreferenced_filter(_SAMPLE_DATE)
+    ),
+    QueryShape("GeocodeCache.lookup", "geocode_cache", ("_id_",), filter={"_id": "calle larios 1 malaga"}),
+]
+
+
+def _key_pattern(key) -> list[tuple[str, int | str]]:
+    """
+    Normaliza las claves de un índice para compararlas (los números pueden
+    llegar como float desde el servidor).
+
+    :param key: Claves de IndexModel.document o de index_information().
+    :return: Lista de pares (campo, dirección o tipo).
+    """
+    items = key.items() if hasattr(key, "items") else key
+    return [(name, int(kind) if isinstance(kind, float) else kind) for name, kind in items]
+
+
+async def _conflicting_indexes(collection, index: IndexModel) -> list[str]:
+    """
+    Busca los índices existentes que impiden crear uno declarado: el del
+    mismo nombre y el de las mismas claves con otro nombre. Un índice de
+    texto choca con cualquier otro de texto (solo puede haber uno por colección).
+
+    :param collection: Colección de Motor.
+    :param index: Índice declarado.
+    :return: Nombres de los índices a eliminar.
+    """
+    name = index.document["name"]
+    pattern = _key_pattern(index.document["key"])
+    is_text = any(kind == TEXT for _, kind in pattern)
+    conflicts = []
+    for existing_name, info in (await collection.index_information()).items():
+        if existing_name == "_id_":
+            continue
+        existing_pattern = _key_pattern(info["key"])
+        if (
+            existing_name == name
+            or existing_pattern == pattern
+            or (is_text and any(field == "_fts" for field, _ in existing_pattern))
+        ):
+            conflicts.append(existing_name)
+    return conflicts
+
+
+async def ensure_indexes(database=None) -> None:
+    """
+    Crea los índices de INDEXES. Es idempotente; si ya existe un índice con
+    el mismo nombre o las mismas claves pero otra definición, se elimina y
+    se vuelve a crear.
+
+    :param database: Base de datos de Motor; por defecto, la de la aplicación.
+    """
+    database = database if database is not None else db.get_db()
+    for collection_name, indexes in INDEXES.items():
+        collection = database[collection_name]
+        for index in indexes:
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure as e:
+                if e.code not in _INDEX_CONFLICT_CODES:
+                    raise
+                conflicts = await _conflicting_indexes(collection, index)
+                if not conflicts:
+                    raise
+                for existing_name in conflicts:
+                    logger.warning(
+                        "Replacing index %s.%s with %s: %s",
+                        collection_name, existing_name, index.document["name"], e
+                    )
+                    await collection.drop_index(existing_name)
+                await collection.create_indexes([index])
+
+
+def _collect(explanation, key: str) -> list:
+    """
+    Recoge todos los valores de una clave en una salida de explain(). Las
+    agregaciones anidan el plan en etapas ($cursor) y los clústeres
+    fragmentados en cada shard.
+
+    :param explanation: Salida de explain() o un fragmento.
+    :param key: Clave buscada (queryPlanner, executionStats...).
+    :return: Valores encontrados.
+    """
+    found = []
+    if isinstance(explanation, dict):
+        for name, value in explanation.items():
+            if name == key:
+                found.append(value)
+            else:
+                found.extend(_collect(value, key))
+    elif isinstance(explanation, list):
+        for item in explanation:
+            found.extend(_collect(item, key))
+    return found
+
+
+def _plan_stages(plan) -> set[str]:
+    """
+    Recoge las etapas de un plan de ejecución (clásico o SBE).
+
+    :param plan: Plan o fragmento de plan devuelto por explain().
+    :return: Conjunto de nombres de etapa.
+    """
+    stages = set()
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.add(plan["stage"])
+        for value in plan.values():
+            stages |= _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            stages |= _plan_stages(item)
+    return stages
+
+
+def _plan_indexes(plan) -> set[str]:
+    """
+    Recoge los nombres de los índices que usa un plan de ejecución.
+    Las búsquedas por _id (IDHACK, EXPRESS) cuentan como el índice _id_.
+
+    :param plan: Plan ganador devuelto por explain().
+    :return: Conjunto de nombres de índice.
+    """
+    indexes = set(name for name in _collect(plan, "indexName") if isinstance(name, str))
+    if any(stage == "IDHACK" or stage.startswith("EXPRESS") for stage in _plan_stages(plan)):
+        indexes.add("_id_")
+    return indexes
+
+
+async def _explain(database, shape: QueryShape) -> dict:
+    """
+    Ejecuta explain con estadísticas de ejecución sobre una consulta.
+
+    :param database: Base de datos de Motor.
+    :param shape: Consulta a explicar.
+    :return: Salida de explain.
+    """
+    if shape.pipeline is not None:
+        command = {"aggregate": shape.collection, "pipeline": shape.pipeline, "cursor": {}}
+    else:
+        command = {"find": shape.collection, "filter": shape.filter or {}}
+        if shape.sort:
+            command["sort"] = dict(shape.sort)
+    return await database.command({"explain": command, "verbosity": "executionStats"})
+
+
+def check_plan(shape: QueryShape, explanation: dict) -> str | None:
+    """
+    Comprueba el plan ganador de una consulta: sin COLLSCAN, solo con los
+    índices esperados y sin leer muchos más documentos de los que devuelve
+    (ninguno si debe estar cubierta por el índice).
+
+    :param shape: Consulta explicada.
+    :param explanation: Salida de explain con executionStats.
+    :return: Descripción del problema o None si el plan es correcto.
+    """
+    plans = [planner["winningPlan"] for planner in _collect(explanation, "queryPlanner")]
+    stages = _plan_stages(plans)
+    indexes = _plan_indexes(plans)
+    if "COLLSCAN" in stages or not indexes:
+        return f"{shape.name}: COLLSCAN, expected {', '.join(shape.indexes)}"
+    unexpected = indexes - set(shape.indexes)
+    if unexpected:
+        return f"{shape.name}: uses {', '.join(sorted(unexpected))}, expected {', '.join(shape.indexes)}"
+
+    stats = _collect(explanation, "executionStats")
+    examined = sum(item.get("totalDocsExamined", 0) for item in stats)
+    returned = sum(item.get("nReturned", 0) for item in stats)
+    if shape.covered and examined:
+        return f"{shape.name}: not covered by {', '.join(shape.indexes)} ({examined} documents examined)"
+    if examined > max(returned, 1) * MAX_DOCS_EXAMINED_PER_RETURNED:
+        return f"{shape.name}: examined {examined} documents to return {returned}"
+    return None
+
+
+async def verify_query_plans(database=None) -> list[str]:
+    """
+    Ejecuta explain() sobre cada consulta de QUERY_SHAPES y comprueba su plan
+    con check_plan. Conviene ejecutarlo contra una base de datos con datos
+    reales: con las colecciones vacías el optimizador puede elegir otro plan.
+
+    :param database: Base de datos de Motor; por defecto, la de la aplicación.
+    :return: Descripción de cada consulta con un plan incorrecto.
+    """
+    database = database if database is not None else db.get_db()
+    violations = []
+    for shape in QUERY_SHAPES:
+        problem = check_plan(shape, await _explain(database, shape))
+        if problem:
+            violations.append(problem)
+    return violations
+
+
+async def _main() -> int:
+    """Crea los índices y verifica los planes contra la base de datos configurada."""
+    db.connect()
+    try:
+        await ensure_indexes()
+        violations = await verify_query_plans()
+    finally:
+        db.client.close()
+    if violations:
+        sys.stderr.write(f"Query plan check failed in {settings.DATABASE_NAME}:\n")
+        for violation in violations:
+            sys.stderr.write(f"  {violation}\n")
+        return 1
+    sys.stdout.write(f"{len(QUERY_SHAPES)} queries use their expected index in {settings.DATABASE_NAME}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,151 @@
+"""Logging estructurado (JSON) con escritura en segundo plano e IDs de petición"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.config import settings
+
+# ID de la petición en curso; lo fija RequestIdMiddleware y lo leen los logs
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Atributos estándar de LogRecord; el resto (extra=...) se añade al JSON
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Añade a cada registro el ID de la petición en curso."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo que registra el mensaje:
+    el formateo y la escritura los hace el hilo del QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _parse_levels(levels: str) -> dict[str, str]:
+    """
+    Convierte "modulo=NIVEL,otro=NIVEL" en un diccionario.
+
+    :param levels: Niveles por módulo.
+    :return: Diccionario logger -> nivel.
+    """
+    result = {}
+    for item in levels.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            result[name.strip()] = level.strip().upper()
+    return result
+
+
+def setup_logging() -> None:
+    """
+    Configura el logging de la aplicación: el logger raíz encola los
+    registros y un hilo en segundo plano los formatea (JSON o texto) y los
+    escribe en stdout. Se llama al arrancar la aplicación.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    handler = _DeferredQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in _parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Vacía la cola de logs y detiene el hilo de escritura. Se llama al detener la aplicación."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """
+    Asigna un ID a cada petición (o reutiliza el del header X-Request-ID),
+    lo expone a los logs y lo devuelve en la respuesta.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        :param app: Aplicación ASGI envuelta.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(REQUEST_ID_HEADER.lower().encode(), b"").decode("latin-1")
+        request_id = incoming[:64] if incoming else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,157 @@
+"""Métricas de Prometheus de la API (latencias de rutas, MongoDB, geocodificación e imágenes)"""
+import functools
+import inspect
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Cubetas en segundos: de 5 ms a 10 s para rutas y dependencias externas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Las operaciones de MongoDB suelen estar por debajo de los 100 ms
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta y código de estado",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Peticiones HTTP en curso",
+    ["method"]
+)
+DB_OPERATION_DURATION = Histogram(
+    "db_operation_duration_seconds",
+    "Duración de las operaciones de MongoDB por método de repositorio",
+    ["repository", "operation"],
+    buckets=DB_BUCKETS
+)
+DB_OPERATION_ERRORS = Counter(
+    "db_operation_errors_total",
+    "Operaciones de MongoDB que lanzaron una excepción",
+    ["repository", "operation"]
+)
+GEOCODING_PROVIDER_DURATION = Histogram(
+    "geocoding_provider_duration_seconds",
+    "Latencia de cada proveedor de geocodificación (con reintentos)",
+    ["provider"],
+    buckets=LATENCY_BUCKETS
+)
+GEOCODING_PROVIDER_REQUESTS = Counter(
+    "geocoding_provider_requests_total",
+    "Llamadas a proveedores de geocodificación por resultado",
+    ["provider", "outcome"]
+)
+GEOCODING_LOOKUPS = Counter(
+    "geocoding_lookups_total",
+    "Direcciones geocodificadas según de dónde salió la respuesta",
+    ["source"]
+)
+IMAGE_UPLOAD_DURATION = Histogram(
+    "image_upload_duration_seconds",
+    "Duración de las subidas al almacenamiento de imágenes",
+    ["backend", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+IMAGE_STAGE_DURATION = Histogram(
+    "image_stage_duration_seconds",
+    "Duración de cada etapa del procesado de imágenes",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+# Etiqueta de las peticiones que no coinciden con ninguna ruta (evita una serie por URL)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Serializa todas las métricas en el formato de texto de Prometheus.
+
+    :return: Tupla (contenido, tipo MIME).
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def instrument_repository(cls: type) -> type:
+    """
+    Decorador de clase que mide la duración de los métodos asíncronos públicos
+    de un repositorio (una serie por clase y método).
+
+    :param cls: Clase del repositorio.
+    :return: La misma clase con los métodos instrumentados.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _timed_operation(cls.__name__, name, method))
+    return cls
+
+
+def _timed_operation(repository: str, operation: str, method):
+    """
+    Envuelve un método de repositorio para registrar su duración y errores.
+
+    :param repository: Nombre de la clase.
+    :param operation: Nombre del método.
+    :param method: Corrutina original.
+    :return: Corrutina instrumentada.
+    """
+    duration = DB_OPERATION_DURATION.labels(repository, operation)
+    errors = DB_OPERATION_ERRORS.labels(repository, operation)
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+class PrometheusMiddleware:
+    """
+    Mide la latencia y las peticiones en curso de cada ruta.
+    La ruta se etiqueta con su plantilla (/api/v1/reviews/{review_id}), no con
+    la URL concreta, para que el número de series no crezca con los datos.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        :param app: Aplicación ASGI envuelta.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # El router guarda en el scope la ruta que atendió la petición
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUEST_DURATION.labels(method, route_path, str(status_code)).observe(
+                time.perf_counter() - start
+            )
@@ -0,0 +1,41 @@
+"""Utilidades de paginación por cursor (keyset) para listados"""
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+
+
+def encode_cursor(created_at: datetime, document_id: str | ObjectId) -> str:
+    """
+    Codifica la posición de un documento como cursor opaco.
+
+    El cursor contiene la clave de ordenación (created_at, _id) del último
+    elemento devuelto, codificada en base64 URL-safe.
+
+    :param created_at: Fecha de creación del último documento.
+    :param document_id: ID del último documento.
+    :return: Cursor opaco.
+    """
+    raw = json.dumps(
+        {"c": created_at.isoformat(), "i": str(document_id)},
+        separators=(",", ":")
+    ).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    :param cursor: Cursor opaco recibido del cliente.
+    :return: Tupla (created_at, _id) del último elemento de la página anterior.
+    :raises ValueError: Si el cursor está mal formado.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(data["c"])
+        document_id = ObjectId(data["i"])
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+    return created_at, document_id
@@ -0,0 +1,38 @@
+"""Respuestas JSON para datos ya preparados por los repositorios"""
+import json
+from datetime import datetime
+from typing import Any
+from fastapi.responses import JSONResponse
+
+
+def _json_default(value: Any) -> str:
+    """
+    Serializa los tipos de MongoDB que json no admite.
+
+    :param value: Valor no serializable por json.
+    :return: Representación en texto (ISO 8601 para fechas, como Pydantic).
+    :raises TypeError: Si el tipo no está soportado.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RawJSONResponse(JSONResponse):
+    """
+    Respuesta JSON que serializa directamente diccionarios y listas.
+
+    Al devolver una Response, FastAPI no valida el resultado contra el
+    response_model ni lo pasa por jsonable_encoder: el contenido debe tener ya
+    la forma del schema documentado. Se usa en los listados, donde construir
+    un modelo Pydantic por elemento es la mayor parte del coste.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=_json_default
+        ).encode("utf-8")
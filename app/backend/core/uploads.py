@@ -0,0 +1,125 @@
+"""Ingesta de imágenes: límite de tamaño del cuerpo y validación por magic bytes"""
+from typing import BinaryIO
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.config import settings
+
+# Firmas de los formatos de imagen aceptados: (desplazamiento, bytes, tipo)
+_SIGNATURES: tuple[tuple[int, bytes, str], ...] = (
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+    (4, b"ftypheic", "image/heic"),
+    (4, b"ftypheix", "image/heic"),
+    (4, b"ftypmif1", "image/heif"),
+    (4, b"ftypavif", "image/avif"),
+)
+_HEADER_BYTES = 16
+
+
+def detect_image_type(header: bytes) -> str | None:
+    """
+    Identifica el formato de una imagen por su cabecera, sin fiarse de la
+    extensión ni del Content-Type que envía el cliente.
+
+    :param header: Primeros bytes del fichero.
+    :return: Tipo MIME o None si no es un formato aceptado.
+    """
+    for offset, signature, mime_type in _SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            if mime_type == "image/webp" and not header.startswith(b"RIFF"):
+                continue
+            return mime_type
+    return None
+
+
+async def open_image_upload(upload: UploadFile, max_bytes: int = settings.MAX_IMAGE_BYTES) -> BinaryIO:
+    """
+    Valida una imagen recibida y devuelve su contenido como stream.
+
+    El parser multipart ya vuelca a disco los ficheros grandes, así que la
+    imagen no se lee en memoria: se comprueban su tamaño y su cabecera y se
+    devuelve el fichero temporal posicionado al principio.
+
+    El límite por fichero se comprueba cuando el formulario ya se ha recibido
+    entero: el parser de Starlette no admite un tamaño máximo para las partes
+    de tipo fichero. Lo que se lee antes de responder 413 lo acota
+    MaxBodySizeMiddleware con MAX_REQUEST_BYTES.
+
+    :param upload: Fichero recibido en el formulario.
+    :param max_bytes: Tamaño máximo permitido.
+    :return: Fichero binario listo para subir.
+    :raises HTTPException: 413 si supera el tamaño máximo, 415 si no es una imagen aceptada.
+    """
+    size = upload.size
+    if size is None:
+        upload.file.seek(0, 2)
+        size = upload.file.tell()
+    if size > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"La imagen {upload.filename} supera el tamaño máximo de {max_bytes // (1024 * 1024)} MB"
+        )
+
+    await upload.seek(0)
+    header = await upload.read(_HEADER_BYTES)
+    if detect_image_type(header) is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"El archivo {upload.filename} no es una imagen JPEG, PNG, GIF, WebP o HEIC"
+        )
+    await upload.seek(0)
+    return upload.file
+
+
+class MaxBodySizeMiddleware:
+    """
+    Rechaza con 413 las peticiones cuyo cuerpo supera el límite configurado.
+
+    Si la petición declara Content-Length se rechaza antes de leer nada; si
+    no (chunked), se cuentan los bytes según llegan y se corta la lectura en
+    cuanto se supera el límite, sin esperar a recibir el fichero completo.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = settings.MAX_REQUEST_BYTES):
+        """
+        :param app: Aplicación ASGI envuelta.
+        :param max_bytes: Tamaño máximo del cuerpo de la petición.
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(
+                {"detail": "El cuerpo de la petición es demasiado grande"},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # HTTPException atraviesa el parser del formulario y se responde como 413
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="El cuerpo de la petición es demasiado grande"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,8 +1,28 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from api.v1.router import api_router
+from api.v1.endpoints import system
 from core.config import settings
 from core.database import db
+from core.indexes import ensure_indexes
+from core.metrics import PrometheusMiddleware, render_metrics
+from core.logging_config import RequestIdMiddleware, setup_logging, shutdown_logging
+from core.uploads import MaxBodySizeMiddleware
+from repositories.interaction_repository import InteractionRepository
+from repositories.review_repository import ReviewRepository
+from services.map_service import geocoding_service
+from services.gazetteer import gazetteer
+from services.google_certs import google_certs
+from services.image_service import shutdown_upload_executor
+from services.image_gc import image_garbage_collector
+from services.interaction_counters import interaction_counter_reconciler
+from services.job_worker import job_worker_pool
+from services.review_enrichment import pending_geocoding_sweeper, register_enrichment_jobs
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Configuración de metadatos para OpenAPI
 # redirect_slashes=False evita los 307 Temporary Redirect
@@ -42,10 +62,19 @@ app = FastAPI(
         {
             "name": "Interactions",
             "description": "Interacciones de usuarios: comentarios, visitas y likes"
+        },
+        {
+            "name": "Media",
+            "description": "Imágenes del almacenamiento local"
         }
     ]
 )
 
+# Rechaza con 413 los cuerpos mayores que MAX_REQUEST_BYTES antes de leerlos enteros.
+# Se registra antes que CORS para quedar dentro: el 413 lleva las cabeceras CORS
+# y el navegador puede leerlo
+app.add_middleware(MaxBodySizeMiddleware)
+
 # CORS Configuration
 # Los orígenes permitidos se configuran desde .env (ALLOWED_ORIGINS)
 app.add_middleware(
@@ -56,6 +85,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Asigna un X-Request-ID a cada petición y lo incluye en sus logs
+app.add_middleware(RequestIdMiddleware)
+
+# Latencia por ruta y peticiones en curso para /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
 # Startup and Shutdown Events
 @app.on_event("startup")
 async def startup_event():
@@ -63,8 +99,34 @@ async def startup_event():
     Inicializa conexiones y servicios al arrancar la aplicación.
     """
     db.connect()
-    print("✅ Conexión a MongoDB establecida")
-    print("🚀 ReViews API iniciada correctamente")
+    logger.info("Conexión a MongoDB establecida")
+    # Los likes repetidos impedirían crear su índice único
+    removed_likes = await InteractionRepository().remove_duplicate_likes()
+    if removed_likes:
+        logger.warning("Eliminados %s likes repetidos", removed_likes)
+    await ensure_indexes()
+    await ReviewRepository().backfill_locations()
+    logger.info("Índices de MongoDB verificados")
+    await geocoding_service.start()
+    logger.info("Cliente HTTP de geocodificación creado")
+    await google_certs.start()
+    if settings.GAZETTEER_PATH:
+        try:
+            entries = await asyncio.to_thread(gazetteer.load, settings.GAZETTEER_PATH)
+            logger.info("Gazetteer local cargado (%s entradas)", entries)
+        except (OSError, ValueError) as e:
+            logger.warning("No se pudo cargar el gazetteer local: %s", e)
+    register_enrichment_jobs(job_worker_pool)
+    await job_worker_pool.start()
+    logger.info("%s workers de trabajos en segundo plano iniciados", job_worker_pool.workers)
+    # Reseñas que quedaron pendientes sin trabajo (fallo al encolar o parada del proceso)
+    await pending_geocoding_sweeper.start()
+    if settings.IMAGE_GC_ENABLED:
+        await image_garbage_collector.start()
+        logger.info("Limpieza de imágenes huérfanas programada (simulación: %s)", settings.IMAGE_GC_DRY_RUN)
+    if settings.INTERACTION_COUNTERS_RECONCILE_ENABLED:
+        await interaction_counter_reconciler.start()
+    logger.info("ReViews API iniciada correctamente")
 
 
 @app.on_event("shutdown")
@@ -72,14 +134,25 @@ async def shutdown_event():
     """
     Cierra conexiones al detener la aplicación.
     """
+    await image_garbage_collector.stop()
+    await interaction_counter_reconciler.stop()
+    await pending_geocoding_sweeper.stop()
+    await job_worker_pool.stop()
+    await geocoding_service.close()
+    await google_certs.close()
+    await asyncio.to_thread(shutdown_upload_executor)
     if db.client:
         db.client.close()
-        print("❌ Conexión a MongoDB cerrada")
+        logger.info("Conexión a MongoDB cerrada")
+    await asyncio.to_thread(shutdown_logging)
 
 
 # Include API Router
 app.include_router(api_router, prefix="/api/v1")
 
+# Endpoints operativos (cachés, proveedores, imágenes), fuera de la API pública como /metrics
+app.include_router(system.router, prefix="/system", tags=["System"])
+
 # Root Endpoint
 @app.get(
     "/",
@@ -120,3 +193,24 @@ def health_check():
         "version": "1.0.0"
     }
 
+
+# Prometheus Metrics Endpoint
+if settings.METRICS_ENABLED:
+    @app.get(
+        "/metrics",
+        tags=["System"],
+        summary="Prometheus Metrics",
+        description=(
+            "Métricas en formato Prometheus: latencia por ruta y estado, peticiones en curso, "
+            "operaciones de MongoDB, proveedores de geocodificación y subidas de imágenes."
+        ),
+        response_class=Response
+    )
+    def metrics():
+        """
+        Exporta las métricas de la aplicación.
+        
+        :return: Métricas en el formato de texto de Prometheus
+        """
+        content, media_type = render_metrics()
+        return Response(content=content, media_type=media_type)
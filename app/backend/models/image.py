@@ -0,0 +1,18 @@
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+
+
+class ImageModel(BaseModel):
+    """
+    Modelo de documento MongoDB para imágenes almacenadas.
+    El ID es el SHA-256 del contenido original, de modo que la misma imagen
+    se sube una sola vez y la comparten todas las reseñas que la usan.
+    """
+    id: str = Field(..., alias="_id", description="SHA-256 del contenido original")
+    url: str = Field(..., description="URL de la imagen almacenada")
+    thumbnail_url: str | None = Field(None, description="URL de la miniatura")
+    ref_count: int = Field(0, description="Número de reseñas o ubicaciones que la usan")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="Fecha de la primera subida")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Fecha del último cambio de referencias")
+
+    model_config = ConfigDict(populate_by_name=True)
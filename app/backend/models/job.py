@@ -0,0 +1,23 @@
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+
+
+class JobModel(BaseModel):
+    """
+    Modelo de documento MongoDB para trabajos en segundo plano.
+    Los workers reclaman los trabajos en estado 'queued' cuyo run_at ha vencido.
+    """
+    id: str | None = Field(None, alias="_id")
+    type: str = Field(..., description="Tipo de trabajo (selecciona el handler)")
+    payload: dict = Field(default_factory=dict, description="Datos del trabajo")
+    key: str | None = Field(None, description="Clave única opcional; encolar dos veces la misma clave crea un solo trabajo")
+    status: str = Field("queued", description="queued, running, done o failed")
+    attempts: int = Field(0, description="Intentos realizados")
+    max_attempts: int = Field(5, description="Intentos máximos antes de marcarlo como fallido")
+    run_at: datetime = Field(default_factory=datetime.utcnow, description="Momento a partir del cual puede ejecutarse")
+    leased_until: datetime | None = Field(None, description="Fin de la reserva del worker que lo ejecuta")
+    last_error: str | None = Field(None, description="Último error producido")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="Fecha de creación")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Fecha de última actualización")
+
+    model_config = ConfigDict(populate_by_name=True)
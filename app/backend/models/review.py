@@ -1,5 +1,20 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
+from typing import Literal
+
+
+class GeoPoint(BaseModel):
+    """
+    Punto GeoJSON usado por el índice 2dsphere.
+    Las coordenadas siguen el orden GeoJSON: [longitud, latitud].
+    """
+    type: Literal["Point"] = "Point"
+    coordinates: list[float] = Field(..., min_length=2, max_length=2)
+
+    @classmethod
+    def from_lat_lng(cls, latitude: float, longitude: float) -> "GeoPoint":
+        """Crea un punto a partir de latitud y longitud."""
+        return cls(coordinates=[longitude, latitude])
 
 
 class ReviewModel(BaseModel):
@@ -12,14 +27,30 @@ class ReviewModel(BaseModel):
     address: str = Field(..., description="Dirección postal del establecimiento")
     latitude: float | None = Field(None, description="Latitud obtenida por geocoding")
     longitude: float | None = Field(None, description="Longitud obtenida por geocoding")
+    location: GeoPoint | None = Field(None, description="Punto GeoJSON con las coordenadas (índice 2dsphere)")
+    geocode_status: Literal["pending", "done", "failed"] = Field(
+        "done",
+        description="Estado de la geocodificación: pending (en cola), done o failed (coordenadas por defecto)"
+    )
     rating: int = Field(..., ge=0, le=5, description="Valoración de 0 a 5 puntos")
     image_urls: list[str] = Field(default_factory=list, description="URLs de imágenes en Cloudinary")
+    thumbnail_urls: list[str] = Field(
+        default_factory=list,
+        description="URLs de las miniaturas, en el mismo orden que image_urls"
+    )
     author_email: str = Field(..., description="Email del autor de la reseña")
     author_name: str = Field(..., description="Nombre del autor de la reseña")
     auth_token: str = Field(..., description="Token OAuth usado al crear la reseña")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Fecha de creación")
     expires_at: datetime = Field(..., description="Fecha de caducidad del token")
 
+    @model_validator(mode="after")
+    def sync_location(self) -> "ReviewModel":
+        """Mantiene el punto GeoJSON sincronizado con latitude/longitude."""
+        if self.latitude is not None and self.longitude is not None:
+            self.location = GeoPoint.from_lat_lng(self.latitude, self.longitude)
+        return self
+
     model_config = ConfigDict(
         populate_by_name=True,
         json_schema_extra={
@@ -0,0 +1,157 @@
+"""Repositorio de imágenes deduplicadas por contenido"""
+from collections import Counter
+from datetime import datetime
+from pymongo import ReturnDocument
+from core.database import db
+from core.metrics import instrument_repository
+from models.image import ImageModel
+
+
+@instrument_repository
+class ImageRepository:
+    """
+    Índice de imágenes subidas sobre la colección `images`.
+    Cada documento asocia el hash del contenido con su URL y cuenta cuántas
+    reseñas la referencian; las imágenes con ref_count 0 pueden eliminarse.
+    """
+
+    def __init__(self):
+        """Inicializa el repositorio con la colección de imágenes."""
+        self.collection = db.get_db().images
+
+    @staticmethod
+    def release_filter(urls: list[str], count: int) -> dict:
+        """
+        Construye el filtro de release para URLs que aparecen count veces.
+
+        :param urls: URLs de las imágenes.
+        :param count: Referencias a quitar a cada una.
+        :return: Filtro de MongoDB.
+        """
+        return {"url": {"$in": urls}, "ref_count": {"$gte": count}}
+
+    @staticmethod
+    def referenced_filter(released_after: datetime) -> dict:
+        """
+        Construye el filtro de las imágenes con referencias o liberadas
+        después de una fecha. Ambas ramas usan el índice (ref_count, updated_at).
+
+        :param released_after: Fecha límite de la liberación.
+        :return: Filtro de MongoDB.
+        """
+        return {"$or": [
+            {"ref_count": {"$gt": 0}},
+            {"ref_count": {"$lte": 0}, "updated_at": {"$gte": released_after}}
+        ]}
+
+    @staticmethod
+    def unreferenced_filter(before: datetime) -> dict:
+        """
+        Construye el filtro de las imágenes sin referencias desde antes de una fecha.
+
+        :param before: Fecha límite del último cambio de referencias.
+        :return: Filtro de MongoDB.
+        """
+        return {"ref_count": {"$lte": 0}, "updated_at": {"$lt": before}}
+
+    async def acquire(self, content_hash: str) -> ImageModel | None:
+        """
+        Añade una referencia a una imagen ya subida.
+
+        :param content_hash: SHA-256 del contenido.
+        :return: Imagen existente o None si no se ha subido antes.
+        """
+        document = await self.collection.find_one_and_update(
+            {"_id": content_hash},
+            {"$inc": {"ref_count": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        return ImageModel(**document) if document else None
+
+    async def register(self, content_hash: str, url: str, thumbnail_url: str | None) -> ImageModel:
+        """
+        Registra una imagen recién subida con una referencia.
+        Si otra petición registró el mismo contenido a la vez, se conserva la
+        primera URL y se devuelve esa.
+
+        :param content_hash: SHA-256 del contenido.
+        :param url: URL de la imagen subida.
+        :param thumbnail_url: URL de la miniatura, si existe.
+        :return: Imagen registrada.
+        """
+        now = datetime.utcnow()
+        document = await self.collection.find_one_and_update(
+            {"_id": content_hash},
+            {
+                "$setOnInsert": {"url": url, "thumbnail_url": thumbnail_url, "created_at": now},
+                "$inc": {"ref_count": 1},
+                "$set": {"updated_at": now}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return ImageModel(**document)
+
+    async def release(self, urls: list[str]) -> int:
+        """
+        Quita una referencia a cada imagen de la lista.
+
+        :param urls: URLs de las imágenes que deja de usar una reseña
+                     (una URL repetida libera una referencia por aparición).
+        :return: Número de imágenes actualizadas.
+        """
+        # Agrupar por número de apariciones para resolverlo con pocas update_many
+        by_count: dict[int, list[str]] = {}
+        for url, count in Counter(urls).items():
+            by_count.setdefault(count, []).append(url)
+
+        modified = 0
+        now = datetime.utcnow()
+        for count, group in by_count.items():
+            result = await self.collection.update_many(
+                self.release_filter(group, count),
+                {"$inc": {"ref_count": -count}, "$set": {"updated_at": now}}
+            )
+            modified += result.modified_count
+        return modified
+
+    async def get_referenced_urls(self, released_after: datetime) -> set[str]:
+        """
+        Obtiene las URLs (imagen y miniatura) de las imágenes con alguna
+        referencia o que la perdieron hace poco: acquire() aún puede volver a
+        usarlas, así que su fichero tiene que seguir existiendo.
+
+        :param released_after: Las imágenes sin referencias cuyo último cambio
+                               es posterior a esta fecha cuentan como referenciadas.
+        :return: Conjunto de URLs.
+        """
+        urls = set()
+        cursor = self.collection.find(
+            self.referenced_filter(released_after), {"url": 1, "thumbnail_url": 1}
+        )
+        async for document in cursor:
+            urls.add(document["url"])
+            if document.get("thumbnail_url"):
+                urls.add(document["thumbnail_url"])
+        return urls
+
+    async def count_unreferenced(self, before: datetime) -> int:
+        """
+        Cuenta las imágenes sin referencias desde antes de una fecha.
+
+        :param before: Fecha límite del último cambio de referencias.
+        :return: Número de imágenes.
+        """
+        return await self.collection.count_documents(self.unreferenced_filter(before))
+
+    async def delete_unreferenced(self, before: datetime) -> int:
+        """
+        Elimina los registros de imágenes sin referencias desde antes de una
+        fecha. Cada documento solo se borra si sigue sin referencias en ese
+        momento, así que una subida que lo reutilice a la vez lo conserva.
+
+        :param before: Fecha límite del último cambio de referencias.
+        :return: Número de registros eliminados.
+        """
+        result = await self.collection.delete_many(self.unreferenced_filter(before))
+        return result.deleted_count
@@ -1,9 +1,23 @@
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from core.database import db
+from core.metrics import instrument_repository
 from models.interaction import InteractionModel
 
+# Tipo de interacción -> campo de su contador en interaction_counters
+COUNTER_FIELDS = {"comment": "comments", "visit": "visits", "like": "likes"}
+# Contadores de una ubicación sin interacciones
+EMPTY_COUNTERS = {"comments": 0, "visits": 0, "likes": 0, "total": 0}
+# Índice único que hace idempotentes los likes de cada usuario
+LIKE_UNIQUE_INDEX = "location_id_user_email_like"
+
+@instrument_repository
 class InteractionRepository:
     def __init__(self):
         self.collection = db.get_db().interactions
+        # Un documento por ubicación: {_id: location_id, comments, visits, likes, total, updated_at}
+        self.counters = db.get_db().interaction_counters
 
     async def get_by_location(self, location_id: str) -> list[InteractionModel]:
         """Obtiene todas las interacciones de una ubicación específica."""
@@ -13,9 +27,170 @@ class InteractionRepository:
             interactions.append(InteractionModel(**document))
         return interactions
 
+    async def get_summaries(self, location_ids: list[str]) -> dict[str, dict[str, int]]:
+        """
+        Obtiene los contadores de interacciones de varias ubicaciones.
+        Se leen de interaction_counters por _id: una búsqueda por ubicación,
+        sin importar cuántas interacciones tenga.
+
+        :param location_ids: IDs de las ubicaciones.
+        :return: Diccionario location_id -> {comments, visits, likes, total}.
+        """
+        summaries = {location_id: dict(EMPTY_COUNTERS) for location_id in location_ids}
+        cursor = self.counters.find({"_id": {"$in": list(summaries)}})
+        async for document in cursor:
+            summaries[document["_id"]].update(
+                {name: document.get(name, 0) for name in EMPTY_COUNTERS}
+            )
+        return summaries
+
+    @staticmethod
+    def count_pipeline(location_ids: list[str] | None = None) -> list[dict]:
+        """
+        Construye la agregación de count_by_location. Lo comparte core.indexes
+        para verificar que se resuelve solo con el índice.
+
+        :param location_ids: IDs de las ubicaciones; None para todas.
+        :return: Pipeline de agregación.
+        """
+        pipeline = [
+            {"$project": {"_id": 0, "location_id": 1, "type": 1}},
+            {"$group": {
+                "_id": {"location_id": "$location_id", "type": "$type"},
+                "count": {"$sum": 1}
+            }}
+        ]
+        if location_ids is not None:
+            pipeline.insert(0, {"$match": {"location_id": {"$in": location_ids}}})
+        else:
+            # Sin filtro, ordenar por las claves del índice hace que se recorra solo el índice
+            pipeline.insert(0, {"$sort": {"location_id": 1, "type": 1}})
+        return pipeline
+
+    async def count_by_location(self, location_ids: list[str] | None = None) -> dict[str, dict[str, int]]:
+        """
+        Cuenta las interacciones por tipo directamente en la colección.
+        El $group se calcula en MongoDB recorriendo solo el índice
+        (location_id, type), sin leer ni transferir los documentos.
+
+        :param location_ids: IDs de las ubicaciones; None para todas.
+        :return: Diccionario location_id -> {comments, visits, likes, total}.
+        """
+        pipeline = self.count_pipeline(location_ids)
+        counts: dict[str, dict[str, int]] = {}
+        async for group in self.collection.aggregate(pipeline):
+            location_counts = counts.setdefault(group["_id"]["location_id"], dict(EMPTY_COUNTERS))
+            field = COUNTER_FIELDS.get(group["_id"]["type"])
+            if field:
+                location_counts[field] += group["count"]
+            location_counts["total"] += group["count"]
+        return counts
+
+    @staticmethod
+    def like_filter(location_id: str, user_email: str) -> dict:
+        """
+        Construye el filtro del like de un usuario en una ubicación
+        (resuelto con el índice único parcial de likes).
+
+        :param location_id: ID de la ubicación.
+        :param user_email: Email del usuario.
+        :return: Filtro de MongoDB.
+        """
+        return {"location_id": location_id, "user_email": user_email, "type": "like"}
+
     async def create(self, interaction: InteractionModel) -> InteractionModel:
-        """Crea una nueva interacción."""
+        """
+        Crea una nueva interacción e incrementa los contadores de su ubicación.
+        Los likes son idempotentes: si el usuario ya dio like a la ubicación
+        se devuelve el existente y los contadores no cambian.
+        """
         interaction_dict = interaction.model_dump(by_alias=True, exclude={"id"})
-        result = await self.collection.insert_one(interaction_dict)
+        try:
+            result = await self.collection.insert_one(interaction_dict)
+        except DuplicateKeyError:
+            existing = await self.collection.find_one(
+                self.like_filter(interaction.location_id, interaction.user_email)
+            )
+            if existing is None:
+                raise
+            existing["_id"] = str(existing["_id"])
+            return InteractionModel(**existing)
         interaction.id = str(result.inserted_id)
+
+        increments = {"total": 1}
+        field = COUNTER_FIELDS.get(interaction.type)
+        if field:
+            increments[field] = 1
+        await self.counters.update_one(
+            {"_id": interaction.location_id},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
         return interaction
+
+    async def remove_duplicate_likes(self) -> int:
+        """
+        Elimina los likes repetidos (mismo usuario y ubicación) anteriores al
+        índice único, conservando el primero. Solo actúa mientras el índice no
+        existe; se ejecuta al arrancar la aplicación, antes de crear los índices.
+
+        :return: Número de likes eliminados.
+        """
+        if LIKE_UNIQUE_INDEX in await self.collection.index_information():
+            return 0
+        pipeline = [
+            {"$match": {"type": "like"}},
+            {"$sort": {"created_at": 1}},
+            {"$group": {
+                "_id": {"location_id": "$location_id", "user_email": "$user_email"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1}
+            }},
+            {"$match": {"count": {"$gt": 1}}}
+        ]
+        duplicates = []
+        async for group in self.collection.aggregate(pipeline):
+            duplicates.extend(group["ids"][1:])
+        if not duplicates:
+            return 0
+        result = await self.collection.delete_many({"_id": {"$in": duplicates}})
+        return result.deleted_count
+
+    async def reconcile_counters(self, started_at: datetime) -> dict[str, int]:
+        """
+        Corrige los contadores que no coinciden con las interacciones guardadas.
+
+        Un contador modificado después de started_at no se toca: su $inc puede
+        no estar reflejado todavía en el recuento y se revisará en la próxima
+        pasada. Los contadores que faltan se crean solo si nadie los ha creado
+        entretanto.
+
+        :param started_at: Momento en que empezó la pasada, antes del recuento.
+        :return: Informe con ubicaciones revisadas y contadores corregidos.
+        """
+        counts = await self.count_by_location()
+        operations = []
+        seen = set()
+        async for document in self.counters.find({}):
+            location_id = document["_id"]
+            seen.add(location_id)
+            expected = counts.get(location_id, EMPTY_COUNTERS)
+            if all(document.get(name, 0) == value for name, value in expected.items()):
+                continue
+            operations.append(UpdateOne(
+                {"_id": location_id, "updated_at": {"$lt": started_at}},
+                {"$set": {**expected, "updated_at": started_at}}
+            ))
+        for location_id, expected in counts.items():
+            if location_id not in seen:
+                operations.append(UpdateOne(
+                    {"_id": location_id},
+                    {"$setOnInsert": {**expected, "updated_at": started_at}},
+                    upsert=True
+                ))
+
+        corrected = 0
+        if operations:
+            result = await self.counters.bulk_write(operations, ordered=False)
+            corrected = result.modified_count + result.upserted_count
+        return {"checked": len(seen | set(counts)), "corrected": corrected}
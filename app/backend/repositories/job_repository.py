@@ -0,0 +1,152 @@
+"""Repositorio de la cola de trabajos en segundo plano en MongoDB"""
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from core.database import db
+from core.metrics import instrument_repository
+from models.job import JobModel
+
+# Orden en que se reclaman los trabajos
+CLAIM_SORT = [("run_at", ASCENDING)]
+
+
+@instrument_repository
+class JobRepository:
+    """
+    Cola de trabajos persistente sobre la colección `jobs`.
+    Los trabajos se reclaman de forma atómica con find_one_and_update, por lo
+    que varios workers (o procesos) pueden consumir la misma cola sin duplicados.
+    """
+
+    def __init__(self):
+        """Inicializa el repositorio con la colección de trabajos."""
+        self.collection = db.get_db().jobs
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: dict,
+        max_attempts: int,
+        key: str | None = None
+    ) -> JobModel:
+        """
+        Añade un trabajo a la cola para ejecutarse inmediatamente.
+        Con clave, la operación es idempotente: si ya existe un trabajo con
+        esa clave (en cualquier estado) se devuelve ese y no se crea otro.
+
+        :param job_type: Tipo de trabajo.
+        :param payload: Datos del trabajo.
+        :param max_attempts: Intentos máximos.
+        :param key: Clave única opcional del trabajo.
+        :return: Trabajo creado (o el existente con la misma clave) con ID asignado.
+        """
+        job = JobModel(type=job_type, payload=payload, max_attempts=max_attempts, key=key)
+        document = job.model_dump(by_alias=True, exclude={"id"})
+        if key is None:
+            # Sin el campo: el índice único parcial solo incluye los trabajos con clave
+            del document["key"]
+            result = await self.collection.insert_one(document)
+            job.id = str(result.inserted_id)
+            return job
+
+        try:
+            existing = await self.collection.find_one_and_update(
+                {"key": key},
+                {"$setOnInsert": document},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Dos upserts simultáneos de la misma clave: el otro ganó
+            existing = await self.collection.find_one({"key": key})
+        existing["_id"] = str(existing["_id"])
+        return JobModel(**existing)
+
+    @staticmethod
+    def claimable_filter(now: datetime) -> dict:
+        """
+        Construye el filtro de los trabajos que se pueden reclamar: los
+        pendientes cuya hora ha llegado y los 'running' con la reserva caducada.
+
+        :param now: Momento actual.
+        :return: Filtro de MongoDB.
+        """
+        return {"$or": [
+            {"status": "queued", "run_at": {"$lte": now}},
+            {"status": "running", "leased_until": {"$lt": now}}
+        ]}
+
+    async def claim(self, lease_seconds: float) -> JobModel | None:
+        """
+        Reclama el siguiente trabajo listo para ejecutarse.
+        También recupera trabajos 'running' cuya reserva ha caducado (worker caído).
+
+        :param lease_seconds: Duración de la reserva del trabajo.
+        :return: Trabajo reclamado o None si no hay ninguno pendiente.
+        """
+        now = datetime.utcnow()
+        document = await self.collection.find_one_and_update(
+            self.claimable_filter(now),
+            {
+                "$set": {
+                    "status": "running",
+                    "leased_until": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=CLAIM_SORT,
+            return_document=ReturnDocument.AFTER
+        )
+        if not document:
+            return None
+        document["_id"] = str(document["_id"])
+        return JobModel(**document)
+
+    async def complete(self, job_id: str) -> None:
+        """
+        Marca un trabajo como terminado.
+
+        :param job_id: ID del trabajo.
+        """
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {"status": "done", "leased_until": None, "updated_at": datetime.utcnow()}}
+        )
+
+    async def retry(self, job_id: str, run_at: datetime, error: str) -> None:
+        """
+        Devuelve un trabajo a la cola para reintentarlo más tarde.
+
+        :param job_id: ID del trabajo.
+        :param run_at: Momento del siguiente intento.
+        :param error: Error del intento fallido.
+        """
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {
+                "status": "queued",
+                "run_at": run_at,
+                "leased_until": None,
+                "last_error": error,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    async def fail(self, job_id: str, error: str) -> None:
+        """
+        Marca un trabajo como fallido definitivamente.
+
+        :param job_id: ID del trabajo.
+        :param error: Último error producido.
+        """
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {
+                "status": "failed",
+                "leased_until": None,
+                "last_error": error,
+                "updated_at": datetime.utcnow()
+            }}
+        )
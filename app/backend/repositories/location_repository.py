@@ -1,7 +1,9 @@
 from core.database import db
+from core.metrics import instrument_repository
 from models.location import LocationModel
 from bson import ObjectId
 
+@instrument_repository
 class LocationRepository:
     def __init__(self):
         self.collection = db.get_db().locations
@@ -26,9 +28,27 @@ class LocationRepository:
         except Exception:
             return None
 
+    async def get_image_urls(self) -> set[str]:
+        """Obtiene las URLs de imagen usadas por alguna ubicación."""
+        urls = set()
+        cursor = self.collection.find({"image_url": {"$ne": None}}, {"_id": 0, "image_url": 1})
+        async for document in cursor:
+            urls.add(document["image_url"])
+        return urls
+
     async def create(self, location: LocationModel) -> LocationModel:
         """Guarda una nueva ubicación en la base de datos."""
         location_dict = location.model_dump(by_alias=True, exclude={"id"})
         result = await self.collection.insert_one(location_dict)
         location.id = str(result.inserted_id)
         return location
+
+    async def delete(self, id: str) -> bool:
+        """Elimina una ubicación por su ID. Devuelve False si no existía."""
+        try:
+            if not ObjectId.is_valid(id):
+                return False
+            result = await self.collection.delete_one({"_id": ObjectId(id)})
+            return result.deleted_count > 0
+        except Exception:
+            return False
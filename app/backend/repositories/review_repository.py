@@ -1,9 +1,46 @@
 """Repositorio para operaciones CRUD de reseñas en MongoDB"""
+import math
+from datetime import datetime
 from core.database import db
+from core.metrics import instrument_repository
+from core.pagination import encode_cursor, decode_cursor
 from models.review import ReviewModel
 from bson import ObjectId
+from pymongo import DESCENDING
 
+# Caja de coordenadas (min_lon, min_lat, max_lon, max_lat)
+BoundingBox = tuple[float, float, float, float]
 
+# Anchura máxima (grados de longitud) de cada polígono $geoWithin: 2dsphere no
+# admite polígonos de un hemisferio o más
+MAX_POLYGON_LON_SPAN = 90.0
+# Separación máxima (grados de longitud) entre vértices de los lados norte y sur.
+# 2dsphere une los vértices con arcos de círculo máximo, que se curvan hacia el
+# polo; con vértices cada grado el lado se separa del paralelo unos 100 m
+POLYGON_EDGE_STEP = 1.0
+
+# Campos que necesitan los listados (ReviewSummary); auth_token, expires_at y
+# location no salen de MongoDB
+SUMMARY_PROJECTION = {
+    "establishment_name": 1,
+    "address": 1,
+    "latitude": 1,
+    "longitude": 1,
+    "geocode_status": 1,
+    "rating": 1,
+    "image_urls": 1,
+    "thumbnail_urls": 1,
+    "author_email": 1,
+    "author_name": 1,
+    "created_at": 1
+}
+# Orden del listado paginado; coincide con el índice created_at_id_desc
+SUMMARY_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+# Orden de la búsqueda: relevancia y, a igual relevancia, fecha
+SEARCH_SORT = [("score", {"$meta": "textScore"}), ("created_at", DESCENDING)]
+
+
+@instrument_repository
 class ReviewRepository:
     """
     Repositorio para gestionar reseñas en MongoDB.
@@ -14,18 +51,232 @@ class ReviewRepository:
         """Inicializa el repositorio con la colección de reseñas."""
         self.collection = db.get_db().reviews
 
-    async def get_all(self) -> list[ReviewModel]:
+    async def backfill_locations(self) -> None:
         """
-        Obtiene todas las reseñas ordenadas por fecha de creación descendente.
+        Rellena el punto GeoJSON en reseñas anteriores a su introducción.
+        La operación es idempotente y se ejecuta al arrancar la aplicación.
+        Los índices de la colección se declaran en core.indexes.
+        """
+        await self.collection.update_many(
+            {
+                "location": {"$exists": False},
+                "latitude": {"$type": "number"},
+                "longitude": {"$type": "number"}
+            },
+            [{"$set": {"location": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}]
+        )
+
+    @classmethod
+    def _bbox_filter(cls, bbox: BoundingBox) -> dict:
+        """
+        Construye el filtro $geoWithin para una caja de coordenadas.
+        
+        Si la caja cruza el antimeridiano (min_lon > max_lon) se divide en dos.
+        Las cajas más anchas que MAX_POLYGON_LON_SPAN se dividen en franjas
+        iguales, de modo que cada una sigue resolviéndose con el índice 2dsphere.
+        Los lados norte y sur llevan vértices intermedios para que sigan el
+        paralelo y no un arco de círculo máximo.
         
-        :return: Lista de todas las reseñas.
+        :param bbox: Caja (min_lon, min_lat, max_lon, max_lat).
+        :return: Filtro de MongoDB.
         """
-        reviews = []
-        cursor = self.collection.find().sort("created_at", -1)
-        async for document in cursor:
-            document["_id"] = str(document["_id"])
-            reviews.append(ReviewModel(**document))
-        return reviews
+        min_lon, min_lat, max_lon, max_lat = bbox
+        if min_lon > max_lon:
+            return {"$or": [
+                cls._bbox_filter((min_lon, min_lat, 180.0, max_lat)),
+                cls._bbox_filter((-180.0, min_lat, max_lon, max_lat))
+            ]}
+        width = max_lon - min_lon
+        if width > MAX_POLYGON_LON_SPAN:
+            strips = math.ceil(width / MAX_POLYGON_LON_SPAN)
+            step = width / strips
+            edges = [min_lon + step * i for i in range(strips)] + [max_lon]
+            return {"$or": [
+                cls._bbox_filter((edges[i], min_lat, edges[i + 1], max_lat))
+                for i in range(strips)
+            ]}
+        # Los lados este y oeste son meridianos (ya son círculos máximos)
+        south = cls._parallel(min_lat, min_lon, max_lon)
+        north = cls._parallel(max_lat, max_lon, min_lon)
+        return {
+            "location": {
+                "$geoWithin": {
+                    "$geometry": {
+                        "type": "Polygon",
+                        "coordinates": [south + north + [south[0]]]
+                    }
+                }
+            }
+        }
+
+    @staticmethod
+    def _parallel(latitude: float, from_lon: float, to_lon: float) -> list[list[float]]:
+        """
+        Genera los vértices de un tramo de paralelo, ambos extremos incluidos,
+        separados como mucho POLYGON_EDGE_STEP grados.
+        
+        :param latitude: Latitud del paralelo.
+        :param from_lon: Longitud inicial.
+        :param to_lon: Longitud final.
+        :return: Lista de posiciones [lon, lat].
+        """
+        steps = max(1, math.ceil(abs(to_lon - from_lon) / POLYGON_EDGE_STEP))
+        return [
+            [from_lon + (to_lon - from_lon) * i / steps, latitude]
+            for i in range(steps + 1)
+        ]
+
+    @classmethod
+    def summary_page_filter(
+        cls,
+        after: tuple[datetime, ObjectId] | None = None,
+        bbox: BoundingBox | None = None
+    ) -> dict:
+        """
+        Construye el filtro de una página del listado. Lo comparte
+        core.indexes para verificar su plan de ejecución.
+        
+        :param after: Clave (created_at, _id) del último elemento de la página anterior.
+        :param bbox: Caja (min_lon, min_lat, max_lon, max_lat) para limitar al viewport.
+        :return: Filtro de MongoDB.
+        """
+        filters = []
+        if bbox:
+            filters.append(cls._bbox_filter(bbox))
+        if after:
+            created_at, last_id = after
+            filters.append({
+                "$or": [
+                    {"created_at": {"$lt": created_at}},
+                    {"created_at": created_at, "_id": {"$lt": last_id}}
+                ]
+            })
+        return filters[0] if len(filters) == 1 else ({"$and": filters} if filters else {})
+
+    @classmethod
+    def clusters_pipeline(cls, bbox: BoundingBox, cell_size: float) -> list[dict]:
+        """
+        Construye la agregación de get_clusters.
+        
+        :param bbox: Caja (min_lon, min_lat, max_lon, max_lat) del viewport.
+        :param cell_size: Tamaño de la celda en grados.
+        :return: Pipeline de agregación.
+        """
+        return [
+            {"$match": cls._bbox_filter(bbox)},
+            {"$group": {
+                "_id": {
+                    "x": {"$floor": {"$divide": ["$longitude", cell_size]}},
+                    "y": {"$floor": {"$divide": ["$latitude", cell_size]}}
+                },
+                "count": {"$sum": 1},
+                "latitude": {"$avg": "$latitude"},
+                "longitude": {"$avg": "$longitude"},
+                "average_rating": {"$avg": "$rating"},
+                "review_id": {"$first": "$_id"}
+            }},
+            {"$project": {
+                "_id": 0,
+                "count": 1,
+                "latitude": 1,
+                "longitude": 1,
+                "average_rating": {"$round": ["$average_rating", 2]},
+                "review_id": {
+                    "$cond": [{"$eq": ["$count", 1]}, {"$toString": "$review_id"}, None]
+                }
+            }}
+        ]
+
+    @staticmethod
+    def search_filter(query: str) -> dict:
+        """
+        Construye el filtro de texto de search.
+        
+        :param query: Palabras a buscar.
+        :return: Filtro de MongoDB.
+        """
+        return {"$text": {"$search": query}}
+
+    @staticmethod
+    def _to_summary(document: dict) -> dict:
+        """
+        Convierte un documento leído con SUMMARY_PROJECTION en un resumen
+        con la forma de ReviewSummary, sin construir modelos Pydantic.
+        
+        :param document: Documento de MongoDB.
+        :return: Diccionario listo para serializar como respuesta.
+        """
+        return {
+            "id": str(document["_id"]),
+            "establishment_name": document["establishment_name"],
+            "address": document["address"],
+            "latitude": document.get("latitude"),
+            "longitude": document.get("longitude"),
+            "geocode_status": document.get("geocode_status", "done"),
+            "rating": document["rating"],
+            "image_urls": document.get("image_urls", []),
+            "thumbnail_urls": document.get("thumbnail_urls", []),
+            "author_email": document["author_email"],
+            "author_name": document["author_name"],
+            "created_at": document["created_at"]
+        }
+
+    async def get_all_summaries(self) -> list[dict]:
+        """
+        Obtiene el resumen de todas las reseñas ordenadas por fecha de creación descendente.
+        
+        :return: Lista de resúmenes (ver _to_summary).
+        """
+        cursor = self.collection.find({}, SUMMARY_PROJECTION).sort("created_at", -1)
+        return [self._to_summary(document) async for document in cursor]
+
+    async def get_summary_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        bbox: BoundingBox | None = None
+    ) -> tuple[list[dict], str | None]:
+        """
+        Obtiene una página de resúmenes de reseñas usando paginación por cursor (keyset).
+        
+        Las reseñas se ordenan por (created_at, _id) descendente, de forma que
+        cada página se resuelve con un recorrido acotado del índice compuesto
+        sin importar cuántas páginas se hayan leído antes. Solo se leen los
+        campos de SUMMARY_PROJECTION.
+        
+        :param limit: Número máximo de reseñas a devolver.
+        :param after: Cursor opaco devuelto por la página anterior.
+        :param bbox: Caja (min_lon, min_lat, max_lon, max_lat) para limitar al viewport.
+        :return: Tupla (resúmenes, cursor de la siguiente página o None).
+        :raises ValueError: Si el cursor es inválido.
+        """
+        query = self.summary_page_filter(decode_cursor(after) if after else None, bbox)
+        
+        cursor = self.collection.find(query, SUMMARY_PROJECTION).sort(SUMMARY_SORT).limit(limit + 1)
+        documents = await cursor.to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor(last["created_at"], last["_id"])
+        
+        return [self._to_summary(document) for document in documents], next_cursor
+
+    async def get_clusters(self, bbox: BoundingBox, cell_size: float) -> list[dict]:
+        """
+        Agrupa las reseñas de un viewport en celdas de una rejilla regular.
+        
+        La agregación se resuelve en MongoDB: cada reseña cae en la celda
+        (floor(lon / cell_size), floor(lat / cell_size)) y por celda se devuelve
+        el centroide, el número de reseñas y la valoración media.
+        
+        :param bbox: Caja (min_lon, min_lat, max_lon, max_lat) del viewport.
+        :param cell_size: Tamaño de la celda en grados.
+        :return: Lista de clusters con latitude, longitude, count, average_rating y review_id.
+        """
+        pipeline = self.clusters_pipeline(bbox, cell_size)
+        return await self.collection.aggregate(pipeline).to_list(length=None)
 
     async def get_by_id(self, review_id: str) -> ReviewModel | None:
         """
@@ -59,6 +310,43 @@ class ReviewRepository:
             reviews.append(ReviewModel(**document))
         return reviews
 
+    @staticmethod
+    def pending_geocoding_filter() -> dict:
+        """
+        Construye el filtro de las reseñas pendientes de geocodificar
+        (resuelto con el índice parcial geocode_status_pending).
+        
+        :return: Filtro de MongoDB.
+        """
+        return {"geocode_status": "pending"}
+
+    async def get_pending_geocoding(self, limit: int) -> list[dict]:
+        """
+        Obtiene las reseñas pendientes de geocodificar.
+        
+        :param limit: Número máximo de reseñas.
+        :return: Lista de diccionarios con id y address.
+        """
+        cursor = self.collection.find(self.pending_geocoding_filter(), {"address": 1}).limit(limit)
+        return [
+            {"id": str(document["_id"]), "address": document["address"]}
+            async for document in cursor
+        ]
+
+    async def get_image_urls(self) -> set[str]:
+        """
+        Obtiene todas las URLs de imágenes y miniaturas usadas por alguna reseña.
+        Solo lee esos dos campos de cada documento.
+        
+        :return: Conjunto de URLs referenciadas.
+        """
+        urls = set()
+        cursor = self.collection.find({}, {"_id": 0, "image_urls": 1, "thumbnail_urls": 1})
+        async for document in cursor:
+            urls.update(document.get("image_urls") or [])
+            urls.update(document.get("thumbnail_urls") or [])
+        return urls
+
     async def create(self, review: ReviewModel) -> ReviewModel:
         """
         Guarda una nueva reseña en la base de datos.
@@ -86,6 +374,13 @@ class ReviewRepository:
             # Eliminar campos None del update
             update_data = {k: v for k, v in update_data.items() if v is not None}
             
+            # Mantener el punto GeoJSON sincronizado con las coordenadas
+            if "latitude" in update_data and "longitude" in update_data:
+                update_data["location"] = {
+                    "type": "Point",
+                    "coordinates": [update_data["longitude"], update_data["latitude"]]
+                }
+            
             if not update_data:
                 return await self.get_by_id(review_id)
             
@@ -112,18 +407,28 @@ class ReviewRepository:
         except Exception:
             return False
 
-    async def search_by_name(self, query: str) -> list[ReviewModel]:
+    async def search(self, query: str, limit: int, offset: int = 0) -> tuple[list[dict], bool]:
         """
-        Busca reseñas por nombre del establecimiento.
+        Busca reseñas por nombre del establecimiento y dirección con el índice
+        de texto (palabras con raíces en español, sin distinguir mayúsculas ni
+        tildes), ordenadas por relevancia y, a igual relevancia, por fecha.
+        
+        Solo se leen los documentos que contienen alguna de las palabras
+        buscadas, nunca la colección entera.
         
-        :param query: Texto a buscar en el nombre.
-        :return: Lista de reseñas que coinciden.
+        :param query: Palabras a buscar ("frase exacta" y -exclusión admitidas).
+        :param limit: Número máximo de resultados.
+        :param offset: Resultados a saltar (paginación).
+        :return: Tupla (resúmenes con su puntuación en score, si hay más resultados).
         """
-        reviews = []
-        cursor = self.collection.find({
-            "establishment_name": {"$regex": query, "$options": "i"}
-        }).sort("created_at", -1)
-        async for document in cursor:
-            document["_id"] = str(document["_id"])
-            reviews.append(ReviewModel(**document))
-        return reviews
+        cursor = self.collection.find(
+            self.search_filter(query),
+            {**SUMMARY_PROJECTION, "score": {"$meta": "textScore"}}
+        ).sort(SEARCH_SORT).skip(offset).limit(limit + 1)
+        documents = await cursor.to_list(length=limit + 1)
+        
+        results = [
+            {**self._to_summary(document), "score": round(document.get("score", 0.0), 4)}
+            for document in documents[:limit]
+        ]
+        return results, len(documents) > limit
@@ -62,3 +62,18 @@ class LoginResponse(BaseModel):
         }
     )
 
+
+class DevIdTokenRequest(BaseModel):
+    """Datos del usuario para emitir un ID token de desarrollo (solo con AUTH_DEV_MODE)"""
+    
+    email: EmailStr = Field(..., description="Correo electrónico del usuario")
+    name: str = Field(..., description="Nombre completo del usuario", min_length=1)
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "email": "juan.perez@example.com",
+                "name": "Juan Pérez"
+            }
+        }
+    )
@@ -81,3 +81,19 @@ class InteractionSummary(BaseModel):
         }
     )
 
+    @classmethod
+    def from_counts(cls, location_id: str, counts: dict[str, int]) -> "InteractionSummary":
+        """
+        Construye el resumen a partir de los contadores de la ubicación.
+
+        :param location_id: ID de la ubicación.
+        :param counts: Contadores comments, visits, likes y total.
+        :return: Resumen de la ubicación.
+        """
+        return cls(
+            location_id=location_id,
+            total_interactions=counts["total"],
+            comments_count=counts["comments"],
+            visits_count=counts["visits"],
+            likes_count=counts["likes"]
+        )
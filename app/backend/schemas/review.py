@@ -73,18 +73,22 @@ class ReviewResponse(BaseModel):
     id: str = Field(..., description="ID único de la reseña en MongoDB")
     establishment_name: str = Field(..., description="Nombre del establecimiento")
     address: str = Field(..., description="Dirección postal del establecimiento")
-    latitude: float = Field(
+    latitude: float | None = Field(
         ..., 
-        description="Latitud en grados decimales",
+        description="Latitud en grados decimales (null mientras la geocodificación está pendiente)",
         ge=-90,
         le=90
     )
-    longitude: float = Field(
+    longitude: float | None = Field(
         ..., 
-        description="Longitud en grados decimales",
+        description="Longitud en grados decimales (null mientras la geocodificación está pendiente)",
         ge=-180,
         le=180
     )
+    geocode_status: str = Field(
+        "done",
+        description="Estado de la geocodificación: pending (coordenadas aún no disponibles), done o failed"
+    )
     rating: int = Field(
         ..., 
         description="Valoración de 0 a 5 puntos",
@@ -95,6 +99,10 @@ class ReviewResponse(BaseModel):
         ..., 
         description="URLs de las imágenes en Cloudinary"
     )
+    thumbnail_urls: list[str] = Field(
+        default_factory=list,
+        description="URLs de las miniaturas, en el mismo orden que image_urls"
+    )
     author_email: EmailStr = Field(..., description="Email del autor de la reseña")
     author_name: str = Field(..., description="Nombre del autor de la reseña")
     auth_token: str = Field(..., description="Token OAuth usado para crear la reseña")
@@ -111,6 +119,7 @@ class ReviewResponse(BaseModel):
                 "address": "Calle Granada 46, Málaga, España",
                 "latitude": 36.7220033,
                 "longitude": -4.4189788,
+                "geocode_status": "done",
                 "rating": 4,
                 "image_urls": [
                     "https://res.cloudinary.com/demo/image/upload/v1/reviews/casa_lola_1.jpg",
@@ -132,10 +141,12 @@ class ReviewSummary(BaseModel):
     id: str = Field(..., description="ID único de la reseña")
     establishment_name: str = Field(..., description="Nombre del establecimiento")
     address: str = Field(..., description="Dirección postal")
-    latitude: float = Field(..., description="Latitud")
-    longitude: float = Field(..., description="Longitud")
+    latitude: float | None = Field(..., description="Latitud (null si la geocodificación está pendiente)")
+    longitude: float | None = Field(..., description="Longitud (null si la geocodificación está pendiente)")
+    geocode_status: str = Field("done", description="Estado de la geocodificación")
     rating: int = Field(..., description="Valoración de 0 a 5")
     image_urls: list[str] = Field(..., description="URLs de las imágenes")
+    thumbnail_urls: list[str] = Field(default_factory=list, description="URLs de las miniaturas")
     author_email: EmailStr = Field(..., description="Email del autor")
     author_name: str = Field(..., description="Nombre del autor")
     created_at: datetime = Field(..., description="Fecha de creación")
@@ -149,6 +160,7 @@ class ReviewSummary(BaseModel):
                 "address": "Calle Granada 46, Málaga",
                 "latitude": 36.7220033,
                 "longitude": -4.4189788,
+                "geocode_status": "done",
                 "rating": 4,
                 "image_urls": [
                     "https://res.cloudinary.com/demo/image/upload/v1/reviews/casa_lola_1.jpg"
@@ -161,6 +173,134 @@ class ReviewSummary(BaseModel):
     )
 
 
+class ReviewPage(BaseModel):
+    """Página de reseñas con cursor para obtener la siguiente"""
+    
+    items: list[ReviewSummary] = Field(..., description="Reseñas de la página actual")
+    next_cursor: str | None = Field(
+        None,
+        description="Cursor opaco para pedir la siguiente página (null si no hay más)"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {
+                        "id": "507f1f77bcf86cd799439011",
+                        "establishment_name": "Casa Lola",
+                        "address": "Calle Granada 46, Málaga",
+                        "latitude": 36.7220033,
+                        "longitude": -4.4189788,
+                        "rating": 4,
+                        "image_urls": [],
+                        "author_email": "juan.perez@example.com",
+                        "author_name": "Juan Pérez",
+                        "created_at": "2025-12-08T10:30:00Z"
+                    }
+                ],
+                "next_cursor": "eyJjIjoiMjAyNS0xMi0wOFQxMDozMDowMCIsImkiOiI1MDdmMWY3N2JjZjg2Y2Q3OTk0MzkwMTEifQ"
+            }
+        }
+    )
+
+
+class ReviewSearchHit(ReviewSummary):
+    """Reseña encontrada por la búsqueda con su puntuación de relevancia"""
+    
+    score: float = Field(..., description="Relevancia de la reseña para la búsqueda")
+
+
+class ReviewSearchPage(BaseModel):
+    """Página de resultados de búsqueda ordenados por relevancia"""
+    
+    items: list[ReviewSearchHit] = Field(..., description="Reseñas de la página actual")
+    next_offset: int | None = Field(
+        None,
+        description="Valor de `offset` para pedir la siguiente página (null si no hay más)"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {
+                        "id": "507f1f77bcf86cd799439011",
+                        "establishment_name": "Casa Lola",
+                        "address": "Calle Granada 46, Málaga",
+                        "latitude": 36.7220033,
+                        "longitude": -4.4189788,
+                        "rating": 4,
+                        "image_urls": [],
+                        "author_email": "juan.perez@example.com",
+                        "author_name": "Juan Pérez",
+                        "created_at": "2025-12-08T10:30:00Z",
+                        "score": 3.75
+                    }
+                ],
+                "next_offset": 20
+            }
+        }
+    )
+
+
+class ReviewCluster(BaseModel):
+    """Grupo de reseñas cercanas agregado en el servidor para el mapa"""
+    
+    latitude: float = Field(..., description="Latitud del centroide del grupo")
+    longitude: float = Field(..., description="Longitud del centroide del grupo")
+    count: int = Field(..., description="Número de reseñas del grupo", ge=1)
+    average_rating: float = Field(..., description="Valoración media del grupo", ge=0, le=5)
+    review_id: str | None = Field(
+        None,
+        description="ID de la reseña cuando el grupo contiene una sola"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "latitude": 36.7213028,
+                "longitude": -4.4216366,
+                "count": 42,
+                "average_rating": 3.81,
+                "review_id": None
+            }
+        }
+    )
+
+
+class ReviewClusterResponse(BaseModel):
+    """Marcadores del mapa para un viewport y nivel de zoom"""
+    
+    zoom: int = Field(..., description="Nivel de zoom solicitado")
+    clusters: list[ReviewCluster] = Field(
+        default_factory=list,
+        description="Grupos de reseñas (zoom bajo)"
+    )
+    points: list[ReviewSummary] = Field(
+        default_factory=list,
+        description="Reseñas individuales (solo con zoom alto)"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "zoom": 12,
+                "clusters": [
+                    {
+                        "latitude": 36.7213028,
+                        "longitude": -4.4216366,
+                        "count": 42,
+                        "average_rating": 3.81,
+                        "review_id": None
+                    }
+                ],
+                "points": []
+            }
+        }
+    )
+
+
 class GeocodingRequest(BaseModel):
     """Schema para solicitar geocodificación de una dirección"""
     
@@ -205,3 +345,125 @@ class GeocodingResponse(BaseModel):
             }
         }
     )
+
+
+class GeocodeCacheStats(BaseModel):
+    """Contadores de la caché de geocodificación"""
+    
+    memory_hits: int = Field(..., description="Aciertos en la caché en memoria", ge=0)
+    persistent_hits: int = Field(..., description="Aciertos en la colección geocode_cache", ge=0)
+    negative_hits: int = Field(..., description="Aciertos de direcciones no encontradas", ge=0)
+    misses: int = Field(..., description="Consultas que tuvieron que ir a los proveedores", ge=0)
+    hit_ratio: float = Field(..., description="Proporción de aciertos sobre el total", ge=0, le=1)
+    memory_entries: int = Field(..., description="Entradas actuales en memoria", ge=0)
+    max_entries: int = Field(..., description="Capacidad de la caché en memoria", ge=0)
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "memory_hits": 1520,
+                "persistent_hits": 87,
+                "negative_hits": 12,
+                "misses": 143,
+                "hit_ratio": 0.9183,
+                "memory_entries": 230,
+                "max_entries": 10000
+            }
+        }
+    )
+
+
+class GeocodingProviderStatus(BaseModel):
+    """Estado de salud de un proveedor de geocodificación"""
+    
+    name: str = Field(..., description="Nombre del proveedor")
+    preference: int = Field(..., description="Posición en el orden de preferencia estático", ge=0)
+    state: str = Field(..., description="Estado del circuit breaker: closed, open o half_open")
+    success_rate: float = Field(..., description="Tasa de éxito en la ventana reciente", ge=0, le=1)
+    latency_ewma_ms: float | None = Field(None, description="Latencia media exponencial (ms)")
+    latency_p95_ms: float | None = Field(None, description="Latencia p95 reciente (ms)")
+    total_calls: int = Field(..., description="Peticiones realizadas", ge=0)
+    total_failures: int = Field(..., description="Peticiones fallidas", ge=0)
+    consecutive_failures: int = Field(..., description="Fallos consecutivos", ge=0)
+    open_remaining_seconds: float | None = Field(
+        None,
+        description="Segundos hasta la petición de prueba si el circuito está abierto"
+    )
+    rate_limit_per_second: float | None = Field(
+        None,
+        description="Cuota de peticiones por segundo (null si no tiene límite)"
+    )
+    rate_limit_waiting: int = Field(0, description="Peticiones esperando en la cola del limitador", ge=0)
+    rate_limit_rejected: int = Field(0, description="Peticiones rechazadas por superar la espera máxima", ge=0)
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "name": "Photon",
+                "preference": 1,
+                "state": "closed",
+                "success_rate": 0.95,
+                "latency_ewma_ms": 412.3,
+                "latency_p95_ms": 880.1,
+                "total_calls": 240,
+                "total_failures": 12,
+                "consecutive_failures": 0,
+                "open_remaining_seconds": None,
+                "rate_limit_per_second": 5.0,
+                "rate_limit_waiting": 0,
+                "rate_limit_rejected": 0
+            }
+        }
+    )
+
+
+class ImageStageTiming(BaseModel):
+    """Tiempos acumulados de una etapa del procesado de imágenes"""
+    
+    count: int = Field(..., description="Imágenes medidas")
+    average_ms: float = Field(..., description="Tiempo medio en milisegundos")
+    max_ms: float = Field(..., description="Tiempo máximo en milisegundos")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "count": 42,
+                "average_ms": 118.4,
+                "max_ms": 512.9
+            }
+        }
+    )
+
+
+class ImageGcReport(BaseModel):
+    """Informe de la última pasada de limpieza de imágenes huérfanas"""
+    
+    started_at: datetime = Field(..., description="Inicio de la pasada")
+    finished_at: datetime | None = Field(None, description="Fin de la pasada (null si sigue en curso o falló)")
+    dry_run: bool = Field(..., description="Si solo se simuló el borrado")
+    backend: str = Field(..., description="Backend de almacenamiento revisado")
+    scanned: int = Field(..., description="Imágenes del almacenamiento fuera del periodo de gracia")
+    referenced: int = Field(..., description="URLs usadas por reseñas, ubicaciones o imágenes con referencias")
+    orphaned: int = Field(..., description="Imágenes sin ninguna referencia")
+    deleted: int = Field(..., description="Imágenes eliminadas")
+    failed: int = Field(..., description="Imágenes que no se pudieron eliminar")
+    released_records: int = Field(..., description="Registros de imágenes sin referencias olvidados (o a olvidar)")
+    sample: list[str] = Field(..., description="Muestra de URLs huérfanas")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "started_at": "2025-12-08T10:30:00Z",
+                "finished_at": "2025-12-08T10:30:12Z",
+                "dry_run": True,
+                "backend": "cloudinary",
+                "scanned": 1250,
+                "referenced": 1190,
+                "orphaned": 60,
+                "deleted": 0,
+                "failed": 0,
+                "released_records": 12,
+                "sample": ["https://res.cloudinary.com/demo/image/upload/v1/reviews/abc.webp"]
+            }
+        }
+    )
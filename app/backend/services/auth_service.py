@@ -1,10 +1,83 @@
-from google.oauth2 import id_token
-from google.auth.transport import requests
+from google.auth import jwt as google_jwt
 from core.config import settings
+from services.google_certs import google_certs
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import hashlib
+import logging
+import time
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
 
+logger = logging.getLogger(__name__)
+
+
+# Emisores válidos de los ID tokens de Google
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+
+class VerifiedTokenCache:
+    """
+    LRU acotado de payloads de JWT ya verificados.
+    La clave es el SHA-256 del token (el token no se guarda en memoria) y
+    cada entrada caduca con el 'exp' del propio token, de modo que un token
+    caducado nunca se acepta desde la caché.
+    """
+
+    def __init__(self, max_entries: int = settings.AUTH_TOKEN_CACHE_MAX_ENTRIES):
+        """
+        :param max_entries: Número máximo de tokens en caché.
+        """
+        self.max_entries = max_entries
+        # hash del token -> (exp en segundos epoch, payload)
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        """Clave de caché de un token."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """
+        Devuelve el payload de un token verificado si sigue vigente.
+
+        :param key: Clave del token.
+        :return: Payload o None si no está o ha caducado.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, key: str, payload: dict) -> None:
+        """
+        Guarda el payload de un token recién verificado.
+        Los tokens sin 'exp' no se guardan.
+
+        :param key: Clave del token.
+        :param payload: Payload decodificado.
+        """
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        self._entries[key] = (float(expires_at), payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+verified_token_cache = VerifiedTokenCache()
+
 
 class AuthService:
     """
@@ -12,19 +85,26 @@ class AuthService:
     Maneja la verificación de tokens de Google y la generación de tokens de sesión.
     """
     
-    def verify_google_token(self, token: str) -> dict | None:
+    async def verify_google_token(self, token: str) -> dict | None:
         """
         Verifica un token de ID de Google.
+        Los certificados de firma se obtienen de la caché asíncrona, así que
+        la verificación es local y no bloquea el event loop.
         
         :param token: El token JWT recibido del frontend.
         :return: Diccionario con info del usuario (email, name, picture) o None.
         """
         try:
-            id_info = id_token.verify_oauth2_token(
-                token, 
-                requests.Request(), 
-                settings.GOOGLE_CLIENT_ID
+            kid = jwt.get_unverified_header(token).get("kid")
+            certs = await google_certs.get_certs(required_kid=kid)
+            id_info = google_jwt.decode(
+                token,
+                certs=certs,
+                audience=settings.GOOGLE_CLIENT_ID,
+                clock_skew_in_seconds=10
             )
+            if id_info.get("iss") not in GOOGLE_ISSUERS:
+                raise ValueError(f"Wrong issuer: {id_info.get('iss')}")
             
             return {
                 "email": id_info.get("email"),
@@ -33,7 +113,7 @@ class AuthService:
                 "google_id": id_info.get("sub")
             }
         except Exception as e:
-            print(f"Google Auth Error: {e}")
+            logger.warning("Google Auth Error: %s", e)
             return None
 
     def create_access_token(self, data: dict, expires_delta: timedelta | None = None) -> str:
@@ -58,26 +138,31 @@ class AuthService:
     def verify_access_token(self, token: str) -> dict | None:
         """
         Verifica un token JWT propio del backend.
+        Los tokens ya verificados se sirven desde la caché hasta su 'exp'
+        sin volver a comprobar la firma.
         
         :param token: Token JWT a verificar.
         :return: Payload del token (con 'sub' = email, 'name' opcional) o None si es inválido.
         """
+        key = verified_token_cache.key(token)
+        payload = verified_token_cache.get(key)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            return payload
-        except JWTError as e:
-            print(f"JWT Verification Error: {e}")
+        except JWTError:
             return None
-    
-    def get_current_user_email(self, authorization_header: str | None) -> str:
+        verified_token_cache.put(key, payload)
+        return payload
+
+    def _bearer_token(self, authorization_header: str | None) -> str:
         """
-        Extrae y valida el email del usuario desde el header de autorización.
+        Extrae el token de un header "Bearer <token>".
         
-        :param authorization_header: Header Authorization con formato "Bearer <token>"
-        :return: Email del usuario autenticado
-        :raises HTTPException: Si el token es inválido, falta, o tiene formato incorrecto
+        :param authorization_header: Header Authorization.
+        :return: Token.
+        :raises HTTPException: Si falta el header o tiene formato incorrecto.
         """
-        # Validar que existe el header
         if not authorization_header:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,19 +170,25 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Extraer el token del header "Bearer <token>"
-        try:
-            scheme, token = authorization_header.split()
-            if scheme.lower() != "bearer":
-                raise ValueError("Esquema de autenticación inválido")
-        except ValueError:
+        scheme, _, token = authorization_header.partition(" ")
+        if scheme.lower() != "bearer" or not token.strip() or " " in token.strip():
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Formato de token inválido. Use: Bearer <token>",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        return token.strip()
+
+    def authenticate(self, authorization_header: str | None) -> dict:
+        """
+        Valida el header de autorización y devuelve los datos del usuario.
+        
+        :param authorization_header: Header Authorization con formato "Bearer <token>"
+        :return: Diccionario con email, name, token y exp (fecha de caducidad) del usuario autenticado
+        :raises HTTPException: Si el token es inválido, falta, o tiene formato incorrecto
+        """
+        token = self._bearer_token(authorization_header)
         
-        # Verificar el token
         payload = self.verify_access_token(token)
         if not payload:
             raise HTTPException(
@@ -106,7 +197,7 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Extraer el email del usuario (almacenado en 'sub')
+        # El email del usuario se almacena en 'sub'
         user_email = payload.get("sub")
         if not user_email:
             raise HTTPException(
@@ -114,7 +205,23 @@ class AuthService:
                 detail="Token inválido: no contiene información de usuario",
             )
         
-        return user_email
+        token_exp = payload.get("exp")
+        return {
+            "email": user_email,
+            "name": payload.get("name", user_email.split("@")[0]),
+            "token": token,
+            "expires_at": datetime.fromtimestamp(token_exp) if token_exp else None
+        }
+    
+    def get_current_user_email(self, authorization_header: str | None) -> str:
+        """
+        Extrae y valida el email del usuario desde el header de autorización.
+        
+        :param authorization_header: Header Authorization con formato "Bearer <token>"
+        :return: Email del usuario autenticado
+        :raises HTTPException: Si el token es inválido, falta, o tiene formato incorrecto
+        """
+        return self.authenticate(authorization_header)["email"]
     
     def get_current_user_info(self, authorization_header: str | None) -> dict:
         """
@@ -124,30 +231,5 @@ class AuthService:
         :return: Diccionario con email y nombre del usuario autenticado
         :raises HTTPException: Si el token es inválido
         """
-        if not authorization_header:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token de autorización requerido",
-            )
-        
-        try:
-            scheme, token = authorization_header.split()
-            if scheme.lower() != "bearer":
-                raise ValueError("Esquema inválido")
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Formato de token inválido",
-            )
-        
-        payload = self.verify_access_token(token)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido o expirado",
-            )
-        
-        return {
-            "email": payload.get("sub"),
-            "name": payload.get("name", payload.get("sub", "").split("@")[0])
-        }
+        user = self.authenticate(authorization_header)
+        return {"email": user["email"], "name": user["name"]}
@@ -0,0 +1,212 @@
+"""Geocodificador local (gazetteer) cargado desde un extracto de OSM o GeoNames"""
+import csv
+import logging
+import time
+from pathlib import Path
+from services.geocode_cache import normalize_address
+
+logger = logging.getLogger(__name__)
+
+Coordinates = tuple[float, float]
+
+# Columnas aceptadas en los CSV (la primera que exista en la cabecera)
+_NAME_COLUMNS = ("name", "address", "street", "nombre", "direccion")
+_LATITUDE_COLUMNS = ("latitude", "lat")
+_LONGITUDE_COLUMNS = ("longitude", "lon", "lng")
+_CITY_COLUMNS = ("city", "ciudad", "municipality")
+_COUNTRY_COLUMNS = ("country", "pais", "country_code")
+
+# Índices de las columnas del volcado de GeoNames (allCountries.txt, ES.txt...)
+_GEONAMES_NAME = 1
+_GEONAMES_ASCII_NAME = 2
+_GEONAMES_LATITUDE = 4
+_GEONAMES_LONGITUDE = 5
+_GEONAMES_FEATURE_CLASS = 6
+_GEONAMES_COUNTRY = 8
+_GEONAMES_POPULATION = 14
+# Clase de entidad de GeoNames de los lugares poblados (ciudades, pueblos...)
+_GEONAMES_POPULATED_PLACE = "P"
+
+
+class Gazetteer:
+    """
+    Índice en memoria de direcciones y lugares conocidos.
+
+    Se carga al arrancar desde un CSV (name, latitude, longitude, city y
+    opcionalmente country) o desde un volcado de GeoNames (.txt separado
+    por tabuladores). Cada entrada se indexa por su nombre normalizado
+    combinado con la ciudad y el país, de modo que una búsqueda es una
+    consulta a un diccionario sin acceso a red. El nombre sin calificar se indexa
+    únicamente para los lugares poblados de GeoNames con población: un
+    nombre de calle como "Calle Mayor" existe en muchas ciudades y debe
+    resolverlo un proveedor externo. Solo se aceptan coincidencias exactas.
+    """
+
+    def __init__(self):
+        """Inicializa un gazetteer vacío."""
+        # clave normalizada -> (coordenadas, población para desempatar)
+        self._index: dict[str, tuple[Coordinates, int]] = {}
+        self.path: str | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def load(self, path: str) -> int:
+        """
+        Carga el fichero de datos y sustituye el índice actual.
+        Es una operación bloqueante; al arrancar se ejecuta en un hilo.
+
+        :param path: Ruta al CSV o al volcado de GeoNames (.txt).
+        :return: Número de claves indexadas.
+        :raises FileNotFoundError: Si el fichero no existe.
+        :raises ValueError: Si el CSV no tiene columnas de nombre y coordenadas.
+        """
+        start = time.perf_counter()
+        index: dict[str, tuple[Coordinates, int]] = {}
+        file_path = Path(path)
+        with file_path.open(encoding="utf-8", newline="") as handle:
+            if file_path.suffix.lower() == ".txt":
+                self._load_geonames(handle, index)
+            else:
+                self._load_csv(handle, index)
+
+        self._index = index
+        self.path = path
+        logger.info(
+            "Loaded %s keys from %s in %.0fms",
+            len(index), path, (time.perf_counter() - start) * 1000
+        )
+        return len(index)
+
+    @staticmethod
+    def _add(
+        index: dict,
+        names: list[str],
+        qualifiers: list[str],
+        coordinates: Coordinates,
+        population: int,
+        bare_name: bool = False
+    ) -> None:
+        """
+        Añade una entrada al índice con todas sus claves.
+        Ante claves repetidas se queda con el lugar de mayor población.
+
+        :param index: Índice en construcción.
+        :param names: Nombres del lugar (nombre y variantes).
+        :param qualifiers: Ciudad y país, en ese orden, si se conocen.
+        :param coordinates: Tupla (lat, lng).
+        :param population: Población o peso de la entrada.
+        :param bare_name: Si es True también se indexa el nombre sin calificar.
+        """
+        for name in names:
+            parts = [name]
+            keys = [normalize_address(name)] if bare_name else []
+            for qualifier in qualifiers:
+                parts.append(qualifier)
+                keys.append(normalize_address(" ".join(parts)))
+            for key in keys:
+                current = index.get(key)
+                if key and (current is None or population > current[1]):
+                    index[key] = (coordinates, population)
+
+    @classmethod
+    def _load_csv(cls, handle, index: dict) -> None:
+        """
+        Carga un CSV con cabecera (extracto de OSM u otra fuente).
+        Las filas sin ciudad se descartan: un nombre de calle sin ciudad es ambiguo.
+        """
+        reader = csv.DictReader(handle)
+        header = {column.strip().lower(): column for column in reader.fieldnames or []}
+
+        def column(candidates: tuple[str, ...]) -> str | None:
+            return next((header[name] for name in candidates if name in header), None)
+
+        name_column = column(_NAME_COLUMNS)
+        latitude_column = column(_LATITUDE_COLUMNS)
+        longitude_column = column(_LONGITUDE_COLUMNS)
+        city_column = column(_CITY_COLUMNS)
+        if not (name_column and latitude_column and longitude_column and city_column):
+            raise ValueError("Gazetteer CSV must have name, latitude, longitude and city columns")
+        country_column = column(_COUNTRY_COLUMNS)
+
+        skipped = 0
+        for row in reader:
+            try:
+                coordinates = (float(row[latitude_column]), float(row[longitude_column]))
+            except (TypeError, ValueError):
+                continue
+            city = (row.get(city_column) or "").strip()
+            if not city:
+                skipped += 1
+                continue
+            qualifiers = [city]
+            if country_column and (row.get(country_column) or "").strip():
+                qualifiers.append(row[country_column].strip())
+            cls._add(index, [row[name_column]], qualifiers, coordinates, 0)
+        if skipped:
+            logger.warning("Skipped %s gazetteer rows without city", skipped)
+
+    @classmethod
+    def _load_geonames(cls, handle, index: dict) -> None:
+        """
+        Carga un volcado de GeoNames (formato geoname, separado por tabuladores).
+        El nombre sin país solo se indexa para lugares poblados con población.
+        """
+        for line in handle:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) <= _GEONAMES_POPULATION:
+                continue
+            try:
+                coordinates = (float(fields[_GEONAMES_LATITUDE]), float(fields[_GEONAMES_LONGITUDE]))
+                population = int(fields[_GEONAMES_POPULATION] or 0)
+            except ValueError:
+                continue
+            names = [fields[_GEONAMES_NAME]]
+            if fields[_GEONAMES_ASCII_NAME] != fields[_GEONAMES_NAME]:
+                names.append(fields[_GEONAMES_ASCII_NAME])
+            qualifiers = [fields[_GEONAMES_COUNTRY]] if fields[_GEONAMES_COUNTRY] else []
+            populated = fields[_GEONAMES_FEATURE_CLASS] == _GEONAMES_POPULATED_PLACE and population > 0
+            cls._add(index, names, qualifiers, coordinates, population, bare_name=populated)
+
+    def lookup(self, address: str) -> Coordinates | None:
+        """
+        Busca una dirección en el índice.
+        Prueba la dirección completa y, si tiene varias partes separadas por
+        comas, también sin la última (normalmente el país).
+
+        :param address: Dirección en formato texto.
+        :return: Tupla (lat, lng) o None si no está en el índice.
+        """
+        if not self._index:
+            return None
+
+        candidates = [address]
+        segments = [segment for segment in address.split(",") if segment.strip()]
+        if len(segments) > 2:
+            candidates.append(",".join(segments[:-1]))
+
+        for candidate in candidates:
+            entry = self._index.get(normalize_address(candidate))
+            if entry:
+                self.hits += 1
+                return entry[0]
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        """
+        Devuelve el tamaño del índice y sus contadores de uso.
+
+        :return: Diccionario con path, entries, hits y misses.
+        """
+        return {
+            "path": self.path,
+            "entries": len(self._index),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+gazetteer = Gazetteer()
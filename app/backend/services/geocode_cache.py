@@ -0,0 +1,162 @@
+"""Caché de geocodificación en dos niveles: memoria (LRU con TTL) y MongoDB"""
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from core.config import settings
+from core.database import db
+
+logger = logging.getLogger(__name__)
+
+Coordinates = tuple[float, float]
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_address(address: str) -> str:
+    """
+    Normaliza una dirección para usarla como clave de caché.
+    Ignora mayúsculas, signos de puntuación y espacios repetidos.
+
+    :param address: Dirección tal y como la escribe el usuario.
+    :return: Clave normalizada.
+    """
+    text = unicodedata.normalize("NFKC", address).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return " ".join(text.split())
+
+
+class GeocodeCache:
+    """
+    Caché de resultados de geocodificación.
+
+    El primer nivel es un LRU en memoria con TTL (aciertos en microsegundos);
+    el segundo es la colección `geocode_cache` de MongoDB, que sobrevive a los
+    reinicios y se comparte entre procesos. También guarda los resultados
+    negativos ("dirección no encontrada") durante un tiempo más corto.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.GEOCODE_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.GEOCODE_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: int = settings.GEOCODE_CACHE_NEGATIVE_TTL_SECONDS
+    ):
+        """
+        Inicializa la caché.
+
+        :param max_entries: Número máximo de entradas en memoria.
+        :param ttl_seconds: Validez de un resultado positivo.
+        :param negative_ttl_seconds: Validez de un resultado negativo.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        # clave -> (instante de caducidad en time.monotonic(), coordenadas o None)
+        self._entries: OrderedDict[str, tuple[float, Coordinates | None]] = OrderedDict()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @property
+    def collection(self):
+        """Colección de MongoDB del segundo nivel."""
+        return db.get_db().geocode_cache
+
+    async def lookup(self, address: str) -> tuple[bool, Coordinates | None]:
+        """
+        Busca una dirección en la caché.
+
+        :param address: Dirección a buscar.
+        :return: Tupla (encontrada, coordenadas). Si la entrada es negativa
+            devuelve (True, None); si no hay entrada, (False, None).
+        """
+        key = normalize_address(address)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, coordinates = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                if coordinates is None:
+                    self.negative_hits += 1
+                return True, coordinates
+            del self._entries[key]
+
+        try:
+            document = await self.collection.find_one({"_id": key})
+        except Exception as e:
+            logger.warning("MongoDB lookup error: %s", e)
+            document = None
+
+        if document:
+            remaining = (document["expires_at"] - datetime.utcnow()).total_seconds()
+            if remaining > 0:
+                coordinates = (
+                    (document["latitude"], document["longitude"])
+                    if document.get("found") else None
+                )
+                self._remember(key, coordinates, remaining)
+                self.persistent_hits += 1
+                if coordinates is None:
+                    self.negative_hits += 1
+                return True, coordinates
+
+        self.misses += 1
+        return False, None
+
+    async def store(self, address: str, coordinates: Coordinates | None) -> None:
+        """
+        Guarda el resultado de una geocodificación en ambos niveles.
+
+        :param address: Dirección geocodificada.
+        :param coordinates: Coordenadas obtenidas o None si no se encontró.
+        """
+        key = normalize_address(address)
+        ttl = self.ttl_seconds if coordinates else self.negative_ttl_seconds
+        self._remember(key, coordinates, ttl)
+
+        now = datetime.utcnow()
+        document = {
+            "found": coordinates is not None,
+            "latitude": coordinates[0] if coordinates else None,
+            "longitude": coordinates[1] if coordinates else None,
+            "updated_at": now,
+            "expires_at": now + timedelta(seconds=ttl)
+        }
+        try:
+            await self.collection.update_one({"_id": key}, {"$set": document}, upsert=True)
+        except Exception as e:
+            logger.warning("MongoDB store error: %s", e)
+
+    def _remember(self, key: str, coordinates: Coordinates | None, ttl: float) -> None:
+        """Guarda una entrada en memoria expulsando la menos usada si está llena."""
+        self._entries[key] = (time.monotonic() + ttl, coordinates)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché.
+
+        :return: Diccionario con aciertos, fallos y tamaño en memoria.
+        """
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries
+        }
+
+
+geocode_cache = GeocodeCache()
@@ -0,0 +1,198 @@
+"""Certificados públicos de Google para verificar ID tokens sin bloquear el event loop"""
+import asyncio
+import logging
+import re
+import time
+import httpx
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+# Validez por defecto si la respuesta no indica max-age
+DEFAULT_MAX_AGE_SECONDS = 300
+# Los certificados se renuevan al consumir esta fracción de su validez
+REFRESH_AT_FRACTION = 0.8
+# Espera antes de reintentar una descarga fallida
+RETRY_SECONDS = 30
+# Intervalo mínimo entre descargas forzadas por un 'kid' desconocido
+MIN_FORCED_REFRESH_SECONDS = 30
+
+
+class GoogleCertsProvider:
+    """
+    Caché de los certificados con los que Google firma los ID tokens.
+
+    Los certificados se descargan con un cliente HTTP asíncrono, se guardan
+    durante el max-age de su Cache-Control y una tarea en segundo plano los
+    renueva antes de que caduquen. Así verificar un token es solo trabajo de
+    CPU local. Si una descarga falla se siguen usando los últimos certificados.
+    """
+
+    def __init__(self, url: str = settings.GOOGLE_CERTS_URL):
+        """
+        :param url: URL del endpoint de certificados (formato PEM por kid).
+        """
+        self.url = url
+        self._certs: dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._client: httpx.AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Arranca la renovación en segundo plano. La primera descarga no se
+        espera, para no retrasar el arranque (y para que el endpoint local de
+        desarrollo pueda servir los certificados de la propia API).
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop(), name="google-certs-refresh")
+
+    async def close(self) -> None:
+        """Detiene la renovación y cierra el cliente HTTP."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_certs(self, required_kid: str | None = None) -> dict[str, str]:
+        """
+        Devuelve los certificados vigentes, descargándolos solo si no hay o han caducado.
+
+        :param required_kid: 'kid' del token a verificar; si no está en caché
+                             (rotación de claves) se fuerza una descarga.
+        :return: Diccionario kid -> certificado PEM.
+        """
+        missing_kid = required_kid is not None and required_kid not in self._certs
+        if self._certs and time.monotonic() < self._expires_at and not missing_kid:
+            return self._certs
+
+        async with self._lock:
+            # Otra petición pudo descargarlos mientras se esperaba el lock
+            missing_kid = required_kid is not None and required_kid not in self._certs
+            recently_fetched = time.monotonic() - self._fetched_at < MIN_FORCED_REFRESH_SECONDS
+            if self._certs and time.monotonic() < self._expires_at and (not missing_kid or recently_fetched):
+                return self._certs
+            try:
+                await self._fetch()
+            except Exception as e:
+                if not self._certs:
+                    raise
+                logger.warning("Refresh failed, using cached certificates: %s", e)
+        return self._certs
+
+    async def _fetch(self) -> None:
+        """Descarga los certificados y calcula su caducidad según Cache-Control."""
+        client = self._client or httpx.AsyncClient(timeout=10.0)
+        try:
+            response = await client.get(self.url)
+            response.raise_for_status()
+            certs = response.json()
+        finally:
+            if client is not self._client:
+                await client.aclose()
+
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else DEFAULT_MAX_AGE_SECONDS
+        now = time.monotonic()
+        self._certs = certs
+        self._fetched_at = now
+        self._expires_at = now + max_age
+        logger.info("Loaded %s certificates, valid for %ss", len(certs), max_age)
+
+    async def _refresh_loop(self) -> None:
+        """Renueva los certificados antes de que caduquen."""
+        while True:
+            try:
+                async with self._lock:
+                    await self._fetch()
+                validity = self._expires_at - self._fetched_at
+                await asyncio.sleep(max(RETRY_SECONDS, validity * REFRESH_AT_FRACTION))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Refresh failed, retrying in %ss: %s", RETRY_SECONDS, e)
+                await asyncio.sleep(RETRY_SECONDS)
+
+
+class DevCertificateAuthority:
+    """
+    Sustituto local de Google para desarrollo y pruebas sin red.
+    Genera una clave RSA en memoria, publica su clave pública en el mismo
+    formato que el endpoint de certificados de Google y firma ID tokens con
+    ella. Solo se expone si AUTH_DEV_MODE está activado.
+    """
+
+    KEY_ID = "dev-key"
+    ISSUER = "https://accounts.google.com"
+    MAX_AGE_SECONDS = 3600
+
+    def __init__(self):
+        """Inicializa sin clave; se genera con el primer uso."""
+        self._private_key_pem: bytes | None = None
+        self._public_key_pem: str | None = None
+
+    def _ensure_key(self) -> None:
+        """Genera la clave RSA de desarrollo si no existe."""
+        if self._private_key_pem is not None:
+            return
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._private_key_pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        )
+        self._public_key_pem = key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+    def certs(self) -> dict[str, str]:
+        """
+        Certificados en el formato del endpoint de Google.
+
+        :return: Diccionario kid -> clave pública PEM.
+        """
+        self._ensure_key()
+        return {self.KEY_ID: self._public_key_pem}
+
+    def sign_id_token(self, email: str, name: str, audience: str = settings.GOOGLE_CLIENT_ID) -> str:
+        """
+        Firma un ID token con el formato de Google.
+
+        :param email: Email del usuario.
+        :param name: Nombre del usuario.
+        :param audience: Client ID al que va dirigido.
+        :return: ID token firmado.
+        """
+        from google.auth import crypt, jwt as google_jwt
+
+        self._ensure_key()
+        now = int(time.time())
+        signer = crypt.RSASigner.from_string(self._private_key_pem, key_id=self.KEY_ID)
+        payload = {
+            "iss": self.ISSUER,
+            "aud": audience,
+            "sub": f"dev-{email}",
+            "email": email,
+            "email_verified": True,
+            "name": name,
+            "iat": now,
+            "exp": now + 3600
+        }
+        return google_jwt.encode(signer, payload).decode()
+
+
+google_certs = GoogleCertsProvider()
+dev_certificate_authority = DevCertificateAuthority()
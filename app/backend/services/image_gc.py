@@ -0,0 +1,160 @@
+"""Limpieza en segundo plano de imágenes huérfanas del almacenamiento"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from core.config import settings
+from repositories.image_repository import ImageRepository
+from repositories.location_repository import LocationRepository
+from repositories.review_repository import ReviewRepository
+from services.rate_limit import TokenBucket
+from services.storage import StorageBackend, get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+# URLs huérfanas incluidas en el informe como muestra
+REPORT_SAMPLE_SIZE = 20
+
+
+class ImageGarbageCollector:
+    """
+    Elimina del almacenamiento las imágenes que ya no usa ninguna reseña ni ubicación.
+
+    Cada pasada:
+      1. Olvida los registros de `images` sin referencias (salvo en modo simulación).
+      2. Lista las imágenes del almacenamiento más antiguas que el periodo de gracia.
+      3. Calcula las URLs referenciadas (reseñas, ubicaciones e `images` con
+         referencias o liberadas dentro del periodo de gracia).
+      4. Borra la diferencia por lotes con la API de borrado masivo y un límite de lotes por segundo.
+
+    Borrar una reseña nunca espera al almacenamiento: solo libera referencias
+    y esta tarea se encarga del resto. En modo simulación (IMAGE_GC_DRY_RUN)
+    solo se genera el informe.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = settings.IMAGE_GC_INTERVAL_SECONDS,
+        grace_seconds: float = settings.IMAGE_GC_GRACE_SECONDS,
+        batch_size: int = settings.IMAGE_GC_BATCH_SIZE,
+        batches_per_second: float = settings.IMAGE_GC_BATCHES_PER_SECOND,
+        dry_run: bool = settings.IMAGE_GC_DRY_RUN
+    ):
+        """
+        Inicializa el recolector sin arrancarlo.
+
+        :param interval_seconds: Segundos entre pasadas.
+        :param grace_seconds: Antigüedad mínima de una imagen para poder borrarla.
+        :param batch_size: Imágenes por llamada de borrado.
+        :param batches_per_second: Límite de llamadas de borrado por segundo.
+        :param dry_run: Si solo se informa sin borrar nada.
+        """
+        self.interval_seconds = interval_seconds
+        self.grace_seconds = grace_seconds
+        self.batch_size = batch_size
+        self.batches_per_second = batches_per_second
+        self.dry_run = dry_run
+        self.last_report: dict | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Arranca las pasadas periódicas; la primera se hace al arrancar la aplicación
+        y las siguientes cada interval_seconds.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="image-gc")
+
+    async def stop(self) -> None:
+        """Detiene las pasadas periódicas."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        """Bucle de pasadas; un fallo se registra en el informe y se reintenta en la siguiente."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Sweep error")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def sweep(self, dry_run: bool | None = None, storage: StorageBackend | None = None) -> dict:
+        """
+        Ejecuta una pasada de limpieza.
+
+        :param dry_run: Sobrescribe el modo simulación configurado.
+        :param storage: Backend a limpiar; por defecto, el configurado.
+        :return: Informe de la pasada.
+        """
+        dry_run = self.dry_run if dry_run is None else dry_run
+        storage = storage or get_storage_backend()
+        loop = asyncio.get_running_loop()
+        started_at = datetime.utcnow()
+        cutoff = started_at - timedelta(seconds=self.grace_seconds)
+        image_repository = ImageRepository()
+
+        report = {
+            "started_at": started_at,
+            "finished_at": None,
+            "dry_run": dry_run,
+            "backend": storage.name,
+            "scanned": 0,
+            "referenced": 0,
+            "orphaned": 0,
+            "deleted": 0,
+            "failed": 0,
+            "released_records": 0,
+            "sample": []
+        }
+        self.last_report = report
+
+        # 1. Registros sin referencias: se olvidan antes de listar, así una
+        #    subida que los reutilice ahora mismo vuelve a crearlos con su URL
+        if dry_run:
+            report["released_records"] = await image_repository.count_unreferenced(cutoff)
+        else:
+            report["released_records"] = await image_repository.delete_unreferenced(cutoff)
+
+        # 2. Listado del almacenamiento (bloqueante, en un hilo)
+        aware_cutoff = cutoff.replace(tzinfo=timezone.utc)
+        assets = await loop.run_in_executor(
+            None,
+            lambda: [url for url, created_at in storage.list_assets(settings.IMAGE_GC_FOLDER)
+                     if created_at < aware_cutoff]
+        )
+        report["scanned"] = len(assets)
+
+        # 3. Referencias actuales, leídas después del listado
+        referenced = await ReviewRepository().get_image_urls()
+        referenced |= await LocationRepository().get_image_urls()
+        # Un registro liberado hace poco no se ha olvidado en el paso 1 y acquire()
+        # puede reutilizarlo: su fichero se conserva aunque sea antiguo
+        referenced |= await image_repository.get_referenced_urls(cutoff)
+        report["referenced"] = len(referenced)
+
+        orphans = [url for url in assets if url not in referenced]
+        report["orphaned"] = len(orphans)
+        report["sample"] = orphans[:REPORT_SAMPLE_SIZE]
+
+        # 4. Borrado por lotes con límite de lotes por segundo
+        if not dry_run and orphans:
+            limiter = TokenBucket(self.batches_per_second, max_wait=2 / self.batches_per_second + 1)
+            for index in range(0, len(orphans), self.batch_size):
+                batch = orphans[index:index + self.batch_size]
+                await limiter.acquire()
+                deleted = await loop.run_in_executor(None, storage.delete_many, batch)
+                report["deleted"] += len(deleted)
+                report["failed"] += len(batch) - len(deleted)
+
+        report["finished_at"] = datetime.utcnow()
+        logger.info(
+            "%s on %s: scanned=%s orphaned=%s deleted=%s failed=%s released_records=%s",
+            "Dry run" if dry_run else "Sweep", storage.name, report["scanned"], report["orphaned"],
+            report["deleted"], report["failed"], report["released_records"]
+        )
+        return report
+
+
+image_garbage_collector = ImageGarbageCollector()
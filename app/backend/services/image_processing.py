@@ -0,0 +1,133 @@
+"""
+Preprocesado de imágenes para ejecutar en un pool de procesos.
+
+Este módulo no importa nada de la aplicación: los procesos del pool lo
+cargan por separado y solo necesitan Pillow.
+"""
+import os
+import time
+from dataclasses import dataclass, field
+
+# Formato de salida -> (formato de Pillow, extensión)
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+}
+
+
+@dataclass
+class ProcessedImage:
+    """Resultado del preprocesado de una imagen."""
+    path: str
+    thumbnail_path: str | None
+    width: int
+    height: int
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milisegundos transcurridos desde start (time.perf_counter)."""
+    return (time.perf_counter() - start) * 1000
+
+
+def _prepare_mode(image, output_format: str):
+    """
+    Convierte la imagen a un modo que admita el formato de salida.
+
+    :param image: Imagen de Pillow.
+    :param output_format: Formato de Pillow (WEBP o JPEG).
+    :return: Imagen en modo RGB o RGBA.
+    """
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    if output_format == "WEBP" and has_alpha:
+        return image if image.mode == "RGBA" else image.convert("RGBA")
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def _save(image, path: str, output_format: str, quality: int, icc_profile: bytes | None) -> None:
+    """
+    Codifica la imagen sin EXIF ni otros metadatos (solo se conserva el perfil de color).
+
+    :param image: Imagen de Pillow.
+    :param path: Ruta de salida.
+    :param output_format: Formato de Pillow (WEBP o JPEG).
+    :param quality: Calidad de compresión (1-100).
+    :param icc_profile: Perfil ICC original, si lo tenía.
+    """
+    options = {"quality": quality, "exif": b""}
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    if output_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=4)
+    image.save(path, format=output_format, **options)
+
+
+def process_image(
+    source_path: str,
+    output_dir: str,
+    max_dimension: int,
+    thumbnail_size: int | None,
+    quality: int,
+    output_format: str
+) -> ProcessedImage:
+    """
+    Orienta la imagen según su EXIF, elimina los metadatos, la reduce a
+    max_dimension, la recodifica y genera una miniatura.
+
+    :param source_path: Ruta de la imagen original.
+    :param output_dir: Directorio donde escribir los resultados.
+    :param max_dimension: Tamaño máximo del lado mayor, en píxeles.
+    :param thumbnail_size: Lado mayor de la miniatura, o None para no generarla.
+    :param quality: Calidad de compresión (1-100).
+    :param output_format: Formato de salida (webp o jpeg).
+    :return: Rutas de la imagen procesada y de la miniatura, dimensiones y tiempos por etapa.
+    :raises ValueError: Si el formato de salida no está soportado.
+    :raises OSError: Si Pillow no puede decodificar la imagen.
+    """
+    from PIL import Image, ImageOps
+
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}'")
+    pillow_format, extension = OUTPUT_FORMATS[output_format]
+    timings: dict[str, float] = {}
+
+    start = time.perf_counter()
+    with Image.open(source_path) as original:
+        # draft() permite a los JPEG decodificarse ya reducidos (mucho más rápido)
+        original.draft("RGB", (max_dimension, max_dimension))
+        original.load()
+        icc_profile = original.info.get("icc_profile")
+        timings["decode_ms"] = _elapsed_ms(start)
+
+        start = time.perf_counter()
+        image = ImageOps.exif_transpose(original)
+        timings["orient_ms"] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    image = _prepare_mode(image, pillow_format)
+    timings["resize_ms"] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    path = os.path.join(output_dir, f"image{extension}")
+    _save(image, path, pillow_format, quality, icc_profile)
+    timings["encode_ms"] = _elapsed_ms(start)
+
+    thumbnail_path = None
+    if thumbnail_size:
+        start = time.perf_counter()
+        thumbnail = image.copy()
+        thumbnail.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+        thumbnail_path = os.path.join(output_dir, f"thumbnail{extension}")
+        _save(thumbnail, thumbnail_path, pillow_format, quality, icc_profile)
+        timings["thumbnail_ms"] = _elapsed_ms(start)
+
+    return ProcessedImage(
+        path=path,
+        thumbnail_path=thumbnail_path,
+        width=image.width,
+        height=image.height,
+        timings=timings
+    )
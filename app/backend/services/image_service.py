@@ -1,64 +1,308 @@
-import cloudinary
-import cloudinary.uploader
+import asyncio
+import contextlib
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO
 from core.config import settings
+from core.metrics import IMAGE_STAGE_DURATION, IMAGE_UPLOAD_DURATION
+from repositories.image_repository import ImageRepository
+from services.image_processing import process_image
+from services.storage import StorageBackend, get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+# Hilos compartidos por todas las peticiones para las llamadas bloqueantes al SDK
+_upload_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_UPLOAD_WORKERS,
+    thread_name_prefix="image-upload"
+)
+# Un lock por hash de contenido en curso; desaparece cuando nadie lo usa
+_content_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+# Procesos para decodificar y recodificar imágenes (se crean con el primer uso)
+_process_executor: ProcessPoolExecutor | None = None
+
+
+def _get_process_executor() -> ProcessPoolExecutor:
+    """
+    Devuelve el pool de procesos de preprocesado, creándolo si no existe.
+    Se usa 'spawn' para no duplicar con fork los hilos del servidor.
+    
+    :return: Pool de procesos compartido.
+    """
+    global _process_executor
+    if _process_executor is None:
+        _process_executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_executor
+
+
+def shutdown_upload_executor() -> None:
+    """Espera a que terminen las subidas y preprocesados en curso y libera hilos y procesos. Se llama al detener la aplicación."""
+    _upload_executor.shutdown(wait=True)
+    if _process_executor is not None:
+        _process_executor.shutdown(wait=True)
+
+
+class StageTimings:
+    """Acumula los tiempos de cada etapa del procesado de imágenes."""
+
+    def __init__(self):
+        """Inicializa los contadores vacíos."""
+        # etapa -> [número de muestras, total en ms, máximo en ms]
+        self._stages: dict[str, list[float]] = {}
+
+    def record(self, timings: dict[str, float]) -> None:
+        """
+        Registra los tiempos de una imagen.
+        
+        :param timings: Milisegundos por etapa.
+        """
+        for stage, elapsed in timings.items():
+            IMAGE_STAGE_DURATION.labels(stage.removesuffix("_ms")).observe(elapsed / 1000)
+            entry = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Devuelve las estadísticas acumuladas.
+        
+        :return: Diccionario etapa -> {count, average_ms, max_ms}.
+        """
+        return {
+            stage: {
+                "count": int(count),
+                "average_ms": round(total / count, 2) if count else 0.0,
+                "max_ms": round(maximum, 2)
+            }
+            for stage, (count, total, maximum) in self._stages.items()
+        }
+
+
+image_stage_timings = StageTimings()
 
 
 class ImageService:
     """
-    Servicio para gestionar imágenes con Cloudinary.
-    Permite subir una o múltiples imágenes.
+    Servicio para gestionar imágenes.
+    Preprocesa y sube las imágenes al backend de almacenamiento
+    configurado (Cloudinary o disco local).
     """
     
-    def __init__(self):
-        """Inicializa la configuración de Cloudinary."""
-        cloudinary.config(
-            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-            api_key=settings.CLOUDINARY_API_KEY,
-            api_secret=settings.CLOUDINARY_API_SECRET
+    def __init__(self, storage: StorageBackend | None = None):
+        """
+        Inicializa el servicio con el backend de almacenamiento.
+        
+        :param storage: Backend a usar; por defecto, el configurado en IMAGE_STORAGE_BACKEND.
+        """
+        self.storage = storage or get_storage_backend()
+
+    def upload_image(self, file_content: bytes | BinaryIO, folder: str = "reviews") -> str | None:
+        """
+        Sube una imagen al backend de almacenamiento.
+        
+        :param file_content: Contenido binario o fichero abierto en modo binario.
+        :param folder: Carpeta de destino.
+        :return: URL pública de la imagen o None si falla.
+        """
+        start = time.perf_counter()
+        url = self.storage.upload(file_content, folder)
+        IMAGE_UPLOAD_DURATION.labels(self.storage.name, "success" if url else "error").observe(
+            time.perf_counter() - start
         )
+        return url
 
-    def upload_image(self, file_content: bytes) -> str | None:
+    async def upload_image_async(self, file_content: bytes | BinaryIO) -> str | None:
         """
-        Sube una imagen a Cloudinary.
+        Sube una imagen al almacenamiento sin bloquear el event loop.
+        La llamada al SDK se ejecuta en el pool de hilos de subida.
         
-        :param file_content: Contenido binario del archivo.
+        :param file_content: Contenido binario o fichero abierto en modo binario.
         :return: URL segura de la imagen o None si falla.
         """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_upload_executor, self.upload_image, file_content)
+
+    def _upload_path(self, path: str, folder: str) -> str | None:
+        """
+        Sube al almacenamiento un fichero del disco.
+        
+        :param path: Ruta del fichero.
+        :param folder: Carpeta de destino.
+        :return: URL segura de la imagen o None si falla.
+        """
+        with open(path, "rb") as file:
+            return self.upload_image(file, folder)
+
+    @staticmethod
+    def _spool(file_content: BinaryIO, directory: str | None) -> tuple[str | None, str]:
+        """
+        Calcula el SHA-256 de una imagen recibida leyéndola por trozos y, si se
+        indica un directorio, la copia a un fichero con nombre para que el pool
+        de procesos pueda abrirla.
+        
+        :param file_content: Fichero recibido.
+        :param directory: Directorio temporal de trabajo, o None para solo calcular el hash.
+        :return: Tupla (ruta de la copia o None, hash hexadecimal).
+        """
+        digest = hashlib.sha256()
+        path = os.path.join(directory, "source") if directory else None
+        file_content.seek(0)
+        with open(path, "wb") if path else contextlib.nullcontext() as output:
+            while chunk := file_content.read(1024 * 1024):
+                digest.update(chunk)
+                if output:
+                    output.write(chunk)
+        file_content.seek(0)
+        return path, digest.hexdigest()
+
+    async def process_and_upload(self, file_content: BinaryIO) -> tuple[str | None, str | None]:
+        """
+        Sube una imagen evitando duplicados: si ya se subió el mismo contenido
+        (mismo SHA-256) se reutiliza su URL y solo se suma una referencia.
+        Si no, se preprocesa (orientación, sin metadatos, tamaño máximo y
+        recodificación) en el pool de procesos y se suben el resultado y su
+        miniatura. Si la imagen no se puede procesar se sube el original.
+        La miniatura se genera siempre: el registro es compartido y otra
+        subida del mismo contenido puede necesitarla.
+        
+        :param file_content: Fichero de imagen recibido.
+        :return: Tupla (URL de la imagen, URL de la miniatura); cada una es None si su subida falló.
+        """
+        loop = asyncio.get_running_loop()
+        timings: dict[str, float] = {}
+        workdir = tempfile.mkdtemp(prefix="review-image-")
         try:
-            response = cloudinary.uploader.upload(
+            start = time.perf_counter()
+            source, content_hash = await loop.run_in_executor(
+                _upload_executor,
+                self._spool,
                 file_content,
-                folder="reviews"
+                workdir if settings.IMAGE_PREPROCESSING else None
+            )
+            timings["spool_ms"] = (time.perf_counter() - start) * 1000
+
+            # Las subidas simultáneas del mismo contenido en este proceso esperan a la primera
+            lock = _content_locks.get(content_hash)
+            if lock is None:
+                lock = _content_locks[content_hash] = asyncio.Lock()
+            async with lock:
+                image_repository = ImageRepository()
+                existing = await image_repository.acquire(content_hash)
+                if existing:
+                    logger.debug("Image %s already stored, reusing %s", content_hash[:12], existing.url)
+                    return existing.url, existing.thumbnail_url
+
+                if source:
+                    url, thumbnail_url = await self._process_and_store(
+                        file_content, source, workdir, timings
+                    )
+                else:
+                    url, thumbnail_url = await self.upload_image_async(file_content), None
+                if not url:
+                    return None, None
+
+                # Otro proceso pudo registrar el mismo contenido a la vez: prevalece su URL
+                image = await image_repository.register(content_hash, url, thumbnail_url)
+                return image.url, image.thumbnail_url
+        finally:
+            await loop.run_in_executor(_upload_executor, shutil.rmtree, workdir, True)
+
+    async def _process_and_store(
+        self,
+        file_content: BinaryIO,
+        source: str,
+        workdir: str,
+        timings: dict[str, float]
+    ) -> tuple[str | None, str | None]:
+        """
+        Preprocesa una imagen en el pool de procesos y sube el resultado y su miniatura.
+        
+        :param file_content: Fichero de imagen recibido (se sube tal cual si no se puede procesar).
+        :param source: Ruta de la copia de la imagen.
+        :param workdir: Directorio temporal de trabajo.
+        :param timings: Tiempos por etapa de esta imagen (se completan aquí).
+        :return: Tupla (URL de la imagen, URL de la miniatura).
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            processed = await loop.run_in_executor(
+                _get_process_executor(),
+                process_image,
+                source,
+                workdir,
+                settings.IMAGE_MAX_DIMENSION,
+                settings.IMAGE_THUMBNAIL_SIZE,
+                settings.IMAGE_QUALITY,
+                settings.IMAGE_OUTPUT_FORMAT
             )
-            return response.get("secure_url")
         except Exception as e:
-            print(f"Cloudinary upload error: {e}")
-            return None
+            logger.warning("Image preprocessing error, uploading original: %s: %s", type(e).__name__, e)
+            return await self.upload_image_async(file_content), None
+        timings.update(processed.timings)
+
+        start = time.perf_counter()
+        uploads = [loop.run_in_executor(_upload_executor, self._upload_path, processed.path, "reviews")]
+        if processed.thumbnail_path:
+            uploads.append(loop.run_in_executor(
+                _upload_executor, self._upload_path, processed.thumbnail_path, "reviews/thumbnails"
+            ))
+        urls = await asyncio.gather(*uploads)
+        timings["upload_ms"] = (time.perf_counter() - start) * 1000
+
+        image_stage_timings.record(timings)
+        logger.debug(
+            "Image processed %sx%s", processed.width, processed.height,
+            extra={"timings_ms": {stage: round(elapsed) for stage, elapsed in timings.items()}}
+        )
+        return urls[0], urls[1] if len(urls) > 1 else None
 
-    def upload_multiple_images(self, files_content: list[bytes]) -> list[str]:
+    async def process_and_upload_images(
+        self,
+        files_content: list[BinaryIO],
+        concurrency: int = settings.IMAGE_UPLOAD_CONCURRENCY
+    ) -> list[tuple[str | None, str | None]]:
         """
-        Sube múltiples imágenes a Cloudinary.
+        Preprocesa y sube varias imágenes en paralelo.
         
-        :param files_content: Lista de contenidos binarios de archivos.
-        :return: Lista de URLs de las imágenes subidas exitosamente.
+        :param files_content: Ficheros de imagen recibidos.
+        :param concurrency: Máximo de imágenes en curso para esta llamada.
+        :return: Tupla (URL, URL de la miniatura) por imagen, en el mismo orden.
         """
-        urls = []
-        for content in files_content:
-            url = self.upload_image(content)
-            if url:
-                urls.append(url)
-        return urls
+        semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    def delete_image(self, public_id: str) -> bool:
+        async def process(content: BinaryIO) -> tuple[str | None, str | None]:
+            async with semaphore:
+                return await self.process_and_upload(content)
+
+        return await asyncio.gather(*(process(content) for content in files_content))
+
+    def delete_image(self, url: str) -> bool:
         """
-        Elimina una imagen de Cloudinary por su public_id.
+        Elimina una imagen del backend de almacenamiento.
         
-        :param public_id: ID público de la imagen en Cloudinary.
+        :param url: URL de la imagen.
         :return: True si se eliminó correctamente, False en caso contrario.
         """
-        try:
-            result = cloudinary.uploader.destroy(public_id)
-            return result.get("result") == "ok"
-        except Exception as e:
-            print(f"Cloudinary delete error: {e}")
-            return False
+        return self.storage.delete(url)
 
+
+def get_image_service() -> ImageService:
+    """
+    Dependency que devuelve el servicio de imágenes con el backend configurado.
+    El backend no puede inyectarse como parámetro de ImageService: FastAPI lo
+    interpretaría como parámetro de la petición.
+    
+    :return: Servicio de imágenes.
+    """
+    return ImageService()
@@ -0,0 +1,71 @@
+"""Revisión en segundo plano de los contadores de interacciones por ubicación"""
+import asyncio
+import logging
+from datetime import datetime
+from core.config import settings
+from repositories.interaction_repository import InteractionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionCounterReconciler:
+    """
+    Corrige periódicamente los contadores de interaction_counters.
+
+    Los contadores se actualizan con $inc al crear cada interacción; si una
+    escritura falla entre la inserción y el $inc (o se modifican interacciones
+    a mano) quedan desviados. Cada pasada recuenta las interacciones con el
+    índice (location_id, type) y corrige las diferencias. La primera pasada se
+    ejecuta al arrancar, lo que también crea los contadores que no existan.
+    """
+
+    def __init__(self, interval_seconds: float = settings.INTERACTION_COUNTERS_RECONCILE_SECONDS):
+        """
+        Inicializa el revisor sin arrancarlo.
+
+        :param interval_seconds: Segundos entre pasadas.
+        """
+        self.interval_seconds = interval_seconds
+        self.last_report: dict | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Arranca las pasadas periódicas. Se llama al arrancar la aplicación."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="interaction-counters")
+
+    async def stop(self) -> None:
+        """Detiene las pasadas periódicas."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        """Bucle de pasadas; un fallo se registra y se reintenta en la siguiente."""
+        while True:
+            try:
+                await self.reconcile()
+            except Exception:
+                logger.exception("Reconciliation error")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def reconcile(self) -> dict:
+        """
+        Ejecuta una pasada de revisión.
+
+        :return: Informe con ubicaciones revisadas y contadores corregidos.
+        """
+        started_at = datetime.utcnow()
+        report = await InteractionRepository().reconcile_counters(started_at)
+        report["started_at"] = started_at
+        report["finished_at"] = datetime.utcnow()
+        self.last_report = report
+        if report["corrected"]:
+            logger.warning("Corrected %s of %s interaction counters", report["corrected"], report["checked"])
+        else:
+            logger.info("Checked %s interaction counters, no drift", report["checked"])
+        return report
+
+
+interaction_counter_reconciler = InteractionCounterReconciler()
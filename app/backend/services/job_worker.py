@@ -0,0 +1,160 @@
+"""Pool de workers en proceso para la cola de trabajos de MongoDB"""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from core.config import settings
+from models.job import JobModel
+from repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[JobModel], Awaitable[None]]
+
+
+class JobWorkerPool:
+    """
+    Ejecuta en segundo plano los trabajos de la colección `jobs`.
+
+    Cada worker reclama trabajos de forma atómica, ejecuta el handler
+    registrado para su tipo y, si falla, lo reprograma con backoff exponencial
+    hasta agotar los intentos. Encolar un trabajo desde este proceso despierta
+    a los workers de inmediato; los encolados por otros procesos se recogen en
+    el siguiente sondeo.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.JOB_WORKERS,
+        poll_interval: float = settings.JOB_POLL_INTERVAL_SECONDS,
+        lease_seconds: float = settings.JOB_LEASE_SECONDS,
+        retry_base_seconds: float = settings.JOB_RETRY_BASE_SECONDS,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS
+    ):
+        """
+        Inicializa el pool sin arrancar los workers.
+
+        :param workers: Número de workers concurrentes.
+        :param poll_interval: Segundos entre sondeos cuando la cola está vacía.
+        :param lease_seconds: Duración de la reserva de un trabajo.
+        :param retry_base_seconds: Retardo del primer reintento (se duplica en cada uno).
+        :param max_attempts: Intentos por defecto de los trabajos nuevos.
+        """
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.max_attempts = max_attempts
+        self._handlers: dict[str, tuple[JobHandler, JobHandler | None]] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def register(
+        self,
+        job_type: str,
+        handler: JobHandler,
+        on_exhausted: JobHandler | None = None
+    ) -> None:
+        """
+        Registra el handler de un tipo de trabajo.
+
+        :param job_type: Tipo de trabajo.
+        :param handler: Corrutina que procesa el trabajo; si lanza una excepción se reintenta.
+        :param on_exhausted: Corrutina opcional que se ejecuta al agotar los intentos.
+        """
+        self._handlers[job_type] = (handler, on_exhausted)
+
+    async def enqueue(self, job_type: str, payload: dict, key: str | None = None) -> JobModel:
+        """
+        Encola un trabajo y despierta a los workers.
+
+        :param job_type: Tipo de trabajo.
+        :param payload: Datos del trabajo.
+        :param key: Clave única opcional; si ya hay un trabajo con ella no se crea otro.
+        :return: Trabajo creado o existente.
+        """
+        job = await JobRepository().enqueue(job_type, payload, self.max_attempts, key=key)
+        self._wakeup.set()
+        return job
+
+    async def start(self) -> None:
+        """Arranca los workers. Se llama al arrancar la aplicación."""
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(index), name=f"job-worker-{index}")
+            for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Detiene los workers. Los trabajos en curso se cancelan y su reserva
+        caducará para que otro proceso los recoja.
+        """
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, index: int) -> None:
+        """Bucle de un worker: reclamar, ejecutar y esperar si la cola está vacía."""
+        repository = JobRepository()
+        while not self._stopping:
+            # Limpiar antes de reclamar para no perder un aviso de enqueue()
+            self._wakeup.clear()
+            try:
+                job = await repository.claim(self.lease_seconds)
+            except Exception:
+                logger.exception("Worker %s claim error", index)
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._execute(repository, job)
+            except Exception:
+                # Error al registrar el resultado: la reserva caducará y se reintentará
+                logger.exception("Worker %s error finishing job %s", index, job.id)
+
+    async def _execute(self, repository: JobRepository, job: JobModel) -> None:
+        """
+        Ejecuta un trabajo y registra su resultado en la cola.
+
+        :param repository: Repositorio de trabajos.
+        :param job: Trabajo reclamado.
+        """
+        handler, on_exhausted = self._handlers.get(job.type, (None, None))
+        if handler is None:
+            await repository.fail(job.id, f"No handler registered for job type '{job.type}'")
+            return
+
+        try:
+            await handler(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts >= job.max_attempts:
+                logger.error("%s %s failed after %s attempts: %s", job.type, job.id, job.attempts, error)
+                await repository.fail(job.id, error)
+                if on_exhausted:
+                    try:
+                        await on_exhausted(job)
+                    except Exception:
+                        logger.exception("%s %s exhausted handler error", job.type, job.id)
+                return
+            delay = self.retry_base_seconds * 2 ** (job.attempts - 1)
+            logger.warning("%s %s attempt %s failed, retrying in %.0fs: %s", job.type, job.id, job.attempts, delay, error)
+            await repository.retry(job.id, datetime.utcnow() + timedelta(seconds=delay), error)
+            return
+
+        await repository.complete(job.id)
+
+
+job_worker_pool = JobWorkerPool()
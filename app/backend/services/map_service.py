@@ -1,11 +1,39 @@
 import httpx
 import asyncio
+import logging
+import time
+from collections.abc import Callable
+from urllib.parse import urlsplit
+from core.config import settings
+from core.metrics import GEOCODING_LOOKUPS, GEOCODING_PROVIDER_DURATION, GEOCODING_PROVIDER_REQUESTS
+from services.geocode_cache import geocode_cache, normalize_address
+from services.gazetteer import gazetteer
+from services.provider_health import ProviderHealth
+from services.rate_limit import TokenBucket, MongoTokenBucket, RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+# Coordenadas por defecto (Málaga, España) cuando falla el geocoding
+DEFAULT_LATITUDE = 36.7213028
+DEFAULT_LONGITUDE = -4.4216366
 
 
 class GeocodingService:
     """
     Servicio de geocodificación con múltiples proveedores.
-    Intenta en orden: Nominatim -> Photon -> Geocode.maps.co -> Open-Meteo.
+    Orden de preferencia inicial: Nominatim -> Photon -> Geocode.maps.co -> Open-Meteo.
+    
+    Las geocodificaciones simultáneas de la misma dirección se agrupan en una
+    sola llamada (singleflight) y cada proveedor tiene un token bucket para
+    respetar su cuota de uso (Nominatim: 1 petición por segundo).
+    
+    Cada proveedor tiene su propio circuit breaker y seguimiento de latencia;
+    los proveedores con el circuito abierto se saltan y el resto se ordena
+    dinámicamente poniendo primero el más rápido y fiable.
+    
+    En modo hedged el siguiente proveedor se lanza cuando el anterior supera
+    su latencia p95 (o falla), sin esperar a que termine; gana la primera
+    respuesta válida y el resto de peticiones se cancelan.
     """
     
     # Servicios de geocodificación gratuitos
@@ -17,9 +45,93 @@ class GeocodingService:
     MAX_RETRIES = 2
     TIMEOUT_SECONDS = 15
 
+    def __init__(self):
+        """
+        Inicializa el servicio sin cliente HTTP.
+        El cliente compartido se crea en start() al arrancar la aplicación.
+        """
+        self._client: httpx.AsyncClient | None = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._health: dict[str, ProviderHealth] = {
+            service_name: ProviderHealth(service_name, preference)
+            for preference, (service_name, _) in enumerate(self._provider_table())
+        }
+        self._limiters: dict[str, TokenBucket] = {
+            service_name: self._build_limiter(service_name)
+            for service_name, _ in self._provider_table()
+        }
+        self._inflight: dict[tuple[str, bool], asyncio.Task] = {}
+
+    def _build_limiter(self, service_name: str) -> TokenBucket | None:
+        """
+        Crea el limitador de tasa configurado para un proveedor.
+        
+        :param service_name: Nombre del proveedor.
+        :return: Token bucket local o compartido, o None si no tiene límite.
+        """
+        rate = settings.geocoding_rate_limits.get(service_name)
+        if not rate:
+            return None
+        max_wait = settings.GEOCODING_RATE_LIMIT_MAX_WAIT_SECONDS
+        if settings.GEOCODING_RATE_LIMIT_SHARED:
+            return MongoTokenBucket(f"geocoding:{service_name}", rate, max_wait=max_wait)
+        return TokenBucket(rate, max_wait=max_wait)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """
+        Crea un cliente HTTP con pool de conexiones y keep-alive.
+        
+        :return: Cliente HTTP asíncrono configurado.
+        """
+        http2 = settings.GEOCODING_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+                http2 = False
+        
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.TIMEOUT_SECONDS, connect=10.0),
+            follow_redirects=True,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.GEOCODING_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GEOCODING_MAX_CONNECTIONS,
+                keepalive_expiry=settings.GEOCODING_KEEPALIVE_SECONDS
+            )
+        )
+
+    async def start(self) -> None:
+        """Crea el cliente HTTP compartido. Se llama al arrancar la aplicación."""
+        if self._client is None:
+            self._client = self._build_client()
+
+    async def close(self) -> None:
+        """Cierra el cliente HTTP compartido y sus conexiones abiertas."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        """
+        Hace un GET limitando las peticiones simultáneas contra cada host.
+        
+        :param client: Cliente HTTP a usar.
+        :param url: URL de destino.
+        :return: Respuesta HTTP.
+        """
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.GEOCODING_MAX_CONNECTIONS_PER_HOST)
+            self._host_semaphores[host] = semaphore
+        async with semaphore:
+            return await client.get(url, **kwargs)
+
     async def _try_nominatim(self, address: str, client: httpx.AsyncClient) -> tuple[float, float] | None:
         """Intenta geocodificar usando Nominatim (OpenStreetMap)."""
-        print(f"[Geocoding] Trying Nominatim for: {address}")
+        logger.debug("Trying Nominatim for: %s", address)
         params = {
             'q': address, 
             'format': 'json', 
@@ -32,21 +144,22 @@ class GeocodingService:
             'Accept-Language': 'es,en'
         }
         
-        response = await client.get(self.NOMINATIM_URL, params=params, headers=headers)
-        print(f"[Geocoding] Nominatim response status: {response.status_code}")
+        response = await self._get(client, self.NOMINATIM_URL, params=params, headers=headers)
+        logger.debug("Nominatim response status: %s", response.status_code)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
             if data and len(data) > 0:
                 lat, lon = float(data[0]['lat']), float(data[0]['lon'])
-                print(f"[Geocoding] Nominatim found: ({lat}, {lon})")
+                logger.debug("Nominatim found: (%s, %s)", lat, lon)
                 return lat, lon
-            print("[Geocoding] Nominatim: No results found")
+            logger.debug("Nominatim: No results found")
         return None
 
     async def _try_photon(self, address: str, client: httpx.AsyncClient) -> tuple[float, float] | None:
         """Intenta geocodificar usando Photon (Komoot)."""
-        print(f"[Geocoding] Trying Photon for: {address}")
+        logger.debug("Trying Photon for: %s", address)
         params = {
             'q': address,
             'limit': 1,
@@ -57,8 +170,9 @@ class GeocodingService:
             'Accept': 'application/json'
         }
         
-        response = await client.get(self.PHOTON_URL, params=params, headers=headers)
-        print(f"[Geocoding] Photon response status: {response.status_code}")
+        response = await self._get(client, self.PHOTON_URL, params=params, headers=headers)
+        logger.debug("Photon response status: %s", response.status_code)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
@@ -68,14 +182,14 @@ class GeocodingService:
                 if len(coords) >= 2:
                     # Photon devuelve [lon, lat], nosotros queremos (lat, lon)
                     lat, lon = float(coords[1]), float(coords[0])
-                    print(f"[Geocoding] Photon found: ({lat}, {lon})")
+                    logger.debug("Photon found: (%s, %s)", lat, lon)
                     return lat, lon
-            print("[Geocoding] Photon: No results found")
+            logger.debug("Photon: No results found")
         return None
 
     async def _try_geocode_maps(self, address: str, client: httpx.AsyncClient) -> tuple[float, float] | None:
         """Intenta geocodificar usando Geocode.maps.co (tercer fallback)."""
-        print(f"[Geocoding] Trying Geocode.maps.co for: {address}")
+        logger.debug("Trying Geocode.maps.co for: %s", address)
         params = {
             'q': address,
             'format': 'json'
@@ -85,21 +199,22 @@ class GeocodingService:
             'Accept': 'application/json'
         }
         
-        response = await client.get(self.GEOCODE_MAPS_URL, params=params, headers=headers)
-        print(f"[Geocoding] Geocode.maps.co response status: {response.status_code}")
+        response = await self._get(client, self.GEOCODE_MAPS_URL, params=params, headers=headers)
+        logger.debug("Geocode.maps.co response status: %s", response.status_code)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
             if data and len(data) > 0:
                 lat, lon = float(data[0]['lat']), float(data[0]['lon'])
-                print(f"[Geocoding] Geocode.maps.co found: ({lat}, {lon})")
+                logger.debug("Geocode.maps.co found: (%s, %s)", lat, lon)
                 return lat, lon
-            print("[Geocoding] Geocode.maps.co: No results found")
+            logger.debug("Geocode.maps.co: No results found")
         return None
 
     async def _try_openmeteo(self, address: str, client: httpx.AsyncClient) -> tuple[float, float] | None:
         """Intenta geocodificar usando Open-Meteo (cuarto fallback)."""
-        print(f"[Geocoding] Trying Open-Meteo for: {address}")
+        logger.debug("Trying Open-Meteo for: %s", address)
         params = {
             'name': address,
             'count': 1,
@@ -111,8 +226,9 @@ class GeocodingService:
             'Accept': 'application/json'
         }
         
-        response = await client.get(self.OPENMETEO_URL, params=params, headers=headers)
-        print(f"[Geocoding] Open-Meteo response status: {response.status_code}")
+        response = await self._get(client, self.OPENMETEO_URL, params=params, headers=headers)
+        logger.debug("Open-Meteo response status: %s", response.status_code)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
@@ -120,9 +236,9 @@ class GeocodingService:
             if results and len(results) > 0:
                 lat = float(results[0]['latitude'])
                 lon = float(results[0]['longitude'])
-                print(f"[Geocoding] Open-Meteo found: ({lat}, {lon})")
+                logger.debug("Open-Meteo found: (%s, %s)", lat, lon)
                 return lat, lon
-            print("[Geocoding] Open-Meteo: No results found")
+            logger.debug("Open-Meteo: No results found")
         return None
 
     async def _try_service(
@@ -134,63 +250,375 @@ class GeocodingService:
     ) -> tuple[float, float] | None:
         """
         Intenta un servicio de geocodificación con reintentos.
+        Devuelve None si el proveedor responde sin resultados y propaga la
+        excepción si no responde correctamente, para que cuente como fallo.
         """
+        limiter = self._limiters.get(service_name)
         for attempt in range(self.MAX_RETRIES):
+            if limiter:
+                # Cada intento consume un token; RateLimitExceeded se propaga
+                await limiter.acquire()
             try:
-                result = await service_func(address, client)
-                if result:
-                    return result
-                # Sin resultado pero sin error -> no reintentar
-                return None
+                return await service_func(address, client)
             except httpx.TimeoutException:
-                print(f"[Geocoding] {service_name} timeout (attempt {attempt + 1}/{self.MAX_RETRIES})")
-                if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(1)
+                logger.info("%s timeout (attempt %s/%s)", service_name, attempt + 1, self.MAX_RETRIES)
+                if attempt == self.MAX_RETRIES - 1:
+                    raise
+                await asyncio.sleep(1)
             except httpx.ConnectError as e:
-                print(f"[Geocoding] {service_name} connection error: {e}")
-                return None  # No reintentar errores de conexión
+                logger.info("%s connection error: %s", service_name, e)
+                raise  # No reintentar errores de conexión
             except Exception as e:
-                print(f"[Geocoding] {service_name} error: {type(e).__name__}: {e}")
-                return None
+                logger.info("%s error: %s: %s", service_name, type(e).__name__, e)
+                raise
         return None
 
-    async def get_coordinates(self, address: str) -> tuple[float, float] | None:
+    async def get_coordinates(
+        self,
+        address: str,
+        skip_negative_cache: bool = False
+    ) -> tuple[float, float] | None:
         """
         Obtiene latitud y longitud a partir de una dirección.
-        Intenta múltiples servicios en cascada: Nominatim -> Photon -> Geocode.maps.co -> Open-Meteo
+        Consulta primero el gazetteer local y la caché de geocodificación y,
+        si no hay entrada, resuelve la dirección con los proveedores externos.
+        Las peticiones concurrentes para la misma dirección normalizada
+        comparten una única resolución.
         
         :param address: Dirección en formato texto.
+        :param skip_negative_cache: Si es True, una entrada negativa de la caché
+                                    no se usa y se vuelve a consultar a los proveedores.
         :return: Tupla (lat, lng) o None si todos los servicios fallan.
         """
-        print(f"\n[Geocoding] === Starting geocoding for: {address} ===")
+        coordinates = gazetteer.lookup(address)
+        if coordinates:
+            logger.debug("Gazetteer hit for: %s -> %s", address, coordinates)
+            GEOCODING_LOOKUPS.labels("gazetteer").inc()
+            return coordinates
+        
+        key = (normalize_address(address), skip_negative_cache)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup_or_resolve(address, skip_negative_cache))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.debug("Joining in-flight geocoding for: %s", address)
+        # shield: si un cliente cancela, el resto sigue esperando el mismo resultado
+        return await asyncio.shield(task)
+
+    async def lookup_local(self, address: str) -> tuple[bool, tuple[float, float] | None]:
+        """
+        Busca una dirección sin consultar proveedores externos
+        (gazetteer local y caché de geocodificación).
+        
+        :param address: Dirección en formato texto.
+        :return: Tupla (encontrada, coordenadas); coordenadas es None si la
+                 caché guarda que la dirección no existe.
+        """
+        coordinates = gazetteer.lookup(address)
+        if coordinates:
+            return True, coordinates
+        return await geocode_cache.lookup(address)
+
+    async def _lookup_or_resolve(
+        self,
+        address: str,
+        skip_negative_cache: bool = False
+    ) -> tuple[float, float] | None:
+        """
+        Consulta la caché y, si no hay entrada, resuelve con los proveedores
+        y guarda el resultado.
+        
+        :param address: Dirección en formato texto.
+        :param skip_negative_cache: Si es True, se ignoran las entradas negativas.
+        :return: Tupla (lat, lng) o None si todos los servicios fallan.
+        """
+        found, coordinates = await geocode_cache.lookup(address)
+        if found and (coordinates or not skip_negative_cache):
+            logger.debug("Cache hit for: %s -> %s", address, coordinates)
+            GEOCODING_LOOKUPS.labels("cache").inc()
+            return coordinates
+        
+        coordinates, conclusive = await self._resolve_coordinates(address)
+        if coordinates:
+            GEOCODING_LOOKUPS.labels("providers").inc()
+        else:
+            GEOCODING_LOOKUPS.labels("not_found" if conclusive else "failed").inc()
+        # Un fallo temporal (timeouts, errores HTTP, circuitos abiertos) no se
+        # guarda como negativo: la siguiente petición vuelve a intentarlo
+        if coordinates or conclusive:
+            await geocode_cache.store(address, coordinates)
+        return coordinates
+
+    async def _resolve_coordinates(self, address: str) -> tuple[tuple[float, float] | None, bool]:
+        """
+        Resuelve una dirección con los proveedores externos dentro del
+        presupuesto de latencia configurado.
+        
+        :param address: Dirección en formato texto.
+        :return: Tupla (coordenadas, concluyente). Sin coordenadas, concluyente
+                 indica que los proveedores respondieron sin resultados; si es
+                 False no hubo una respuesta utilizable (fallos o presupuesto agotado).
+        """
+        logger.debug("Starting geocoding for: %s", address)
+        
+        if self._client is not None:
+            return await self._within_budget(address, self._client)
+        
+        # Sin cliente compartido (p. ej. fuera de la aplicación): cliente temporal
+        async with self._build_client() as client:
+            return await self._within_budget(address, client)
+
+    async def _within_budget(
+        self,
+        address: str,
+        client: httpx.AsyncClient
+    ) -> tuple[tuple[float, float] | None, bool]:
+        """
+        Ejecuta la estrategia configurada (hedged o secuencial) con un límite de tiempo total.
+        
+        :param address: Dirección en formato texto.
+        :param client: Cliente HTTP a usar.
+        :return: Tupla (coordenadas, concluyente); agotar el presupuesto no es concluyente.
+        """
+        strategy = self._hedged if settings.GEOCODING_HEDGED else self._cascade
+        try:
+            return await asyncio.wait_for(
+                strategy(address, client),
+                timeout=settings.GEOCODING_LATENCY_BUDGET_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Latency budget exceeded for: %s", address)
+            return None, False
+
+    def _provider_table(self) -> list[tuple[str, Callable]]:
+        """
+        Devuelve todos los proveedores en su orden de preferencia estático.
         
-        # Lista de servicios a probar en orden
-        services = [
+        :return: Lista de tuplas (nombre, función de geocodificación).
+        """
+        return [
             ("Nominatim", self._try_nominatim),
             ("Photon", self._try_photon),
             ("Geocode.maps.co", self._try_geocode_maps),
             ("Open-Meteo", self._try_openmeteo),
         ]
+
+    def _providers(self) -> list[tuple[str, Callable]]:
+        """
+        Devuelve los proveedores disponibles ordenados por coste estimado
+        (latencia media penalizada por la tasa de fallos). Los que tienen el
+        circuito abierto se omiten; el orden estático desempata.
         
-        # Crear cliente HTTP con configuración robusta
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(self.TIMEOUT_SECONDS, connect=10.0),
-            follow_redirects=True,
-            limits=httpx.Limits(max_connections=10)
-        ) as client:
-            
-            for service_name, service_func in services:
-                print(f"[Geocoding] Attempting {service_name}...")
-                try:
-                    result = await self._try_service(service_name, service_func, address, client)
-                    if result:
-                        print(f"[Geocoding] === SUCCESS with {service_name}: {result} ===\n")
-                        return result
-                    print(f"[Geocoding] {service_name} returned no results, trying next...")
-                except Exception as e:
-                    print(f"[Geocoding] {service_name} failed with exception: {e}")
+        :return: Lista de tuplas (nombre, función de geocodificación).
+        """
+        default_latency = settings.GEOCODING_HEDGE_DELAY_SECONDS
+        available = [
+            (service_name, service_func)
+            for service_name, service_func in self._provider_table()
+            if self._health[service_name].available()
+        ]
+        return sorted(
+            available,
+            key=lambda provider: (
+                self._health[provider[0]].score(default_latency),
+                self._health[provider[0]].preference
+            )
+        )
+
+    def provider_status(self) -> list[dict]:
+        """
+        Devuelve el estado de salud de cada proveedor en el orden en que se probarían.
+        Los proveedores no disponibles aparecen al final.
+        
+        :return: Lista de diccionarios con estado del circuito, tasa de éxito, latencias y cuota.
+        """
+        ordered = [service_name for service_name, _ in self._providers()]
+        ordered += [name for name in self._health if name not in ordered]
+        status = []
+        for name in ordered:
+            snapshot = self._health[name].snapshot()
+            limiter = self._limiters.get(name)
+            snapshot.update({
+                "rate_limit_per_second": limiter.rate if limiter else None,
+                "rate_limit_waiting": limiter.waiting if limiter else 0,
+                "rate_limit_rejected": limiter.rejected if limiter else 0
+            })
+            status.append(snapshot)
+        return status
+
+    async def _timed_service(
+        self,
+        service_name: str,
+        service_func,
+        address: str,
+        client: httpx.AsyncClient
+    ) -> tuple[float, float] | None:
+        """
+        Ejecuta un proveedor con reintentos a través de su circuit breaker,
+        registrando el resultado y la latencia en su estado de salud.
+        
+        :raises CircuitOpenError: Si el circuito del proveedor está abierto.
+        """
+        health = self._health[service_name]
+        health.acquire()
+        started = time.perf_counter()
+        try:
+            result = await self._try_service(service_name, service_func, address, client)
+        except asyncio.CancelledError:
+            # Ni la cancelación ni nuestra propia cuota son fallos del proveedor
+            health.release()
+            GEOCODING_PROVIDER_REQUESTS.labels(service_name, "cancelled").inc()
+            raise
+        except RateLimitExceeded:
+            health.release()
+            GEOCODING_PROVIDER_REQUESTS.labels(service_name, "rate_limited").inc()
+            raise
+        except Exception:
+            health.record_failure()
+            GEOCODING_PROVIDER_DURATION.labels(service_name).observe(time.perf_counter() - started)
+            GEOCODING_PROVIDER_REQUESTS.labels(service_name, "error").inc()
+            raise
+        elapsed = time.perf_counter() - started
+        health.record_success(elapsed)
+        GEOCODING_PROVIDER_DURATION.labels(service_name).observe(elapsed)
+        GEOCODING_PROVIDER_REQUESTS.labels(service_name, "found" if result else "empty").inc()
+        return result
+
+    def _hedge_delay(self, service_name: str) -> float:
+        """
+        Calcula cuánto esperar a un proveedor antes de lanzar el siguiente.
+        Usa su latencia p95 observada o el retardo configurado si aún no hay
+        suficientes muestras.
+        
+        :param service_name: Nombre del proveedor en curso.
+        :return: Retardo en segundos.
+        """
+        p95 = self._health[service_name].p95()
+        return p95 if p95 is not None else settings.GEOCODING_HEDGE_DELAY_SECONDS
+
+    async def _cascade(
+        self,
+        address: str,
+        client: httpx.AsyncClient
+    ) -> tuple[tuple[float, float] | None, bool]:
+        """
+        Prueba los proveedores en orden hasta que uno devuelva coordenadas.
+        
+        :param address: Dirección en formato texto.
+        :param client: Cliente HTTP a usar.
+        :return: Tupla (coordenadas, concluyente). Sin coordenadas es concluyente
+                 solo si algún proveedor respondió sin resultados y ninguno falló.
+        """
+        answered = failed = False
+        for service_name, service_func in self._providers():
+            logger.debug("Attempting %s...", service_name)
+            try:
+                result = await self._timed_service(service_name, service_func, address, client)
+                if result:
+                    logger.info("Geocoded with %s: %s", service_name, result)
+                    return result, True
+                answered = True
+                logger.debug("%s returned no results, trying next...", service_name)
+            except Exception as e:
+                failed = True
+                logger.info("%s failed with exception: %s", service_name, e)
+                continue
+        
+        logger.warning("All providers failed for: %s", address)
+        return None, answered and not failed
+
+    async def _hedged(
+        self,
+        address: str,
+        client: httpx.AsyncClient
+    ) -> tuple[tuple[float, float] | None, bool]:
+        """
+        Prueba los proveedores de forma escalonada (hedged requests).
+        
+        Se lanza el primer proveedor y, si no ha respondido tras su retardo de
+        cobertura (p95), se lanza también el siguiente sin cancelar el anterior.
+        Si un proveedor falla se lanza el siguiente de inmediato. Cuando varios
+        responden a la vez se respeta el orden de preferencia.
+        
+        :param address: Dirección en formato texto.
+        :param client: Cliente HTTP a usar.
+        :return: Tupla (coordenadas, concluyente). Sin coordenadas es concluyente
+                 solo si algún proveedor respondió sin resultados y ninguno falló.
+        """
+        providers = self._providers()
+        if not providers:
+            logger.warning("No providers available for: %s", address)
+            return None, False
+        pending: dict[asyncio.Task, int] = {}
+        next_index = 0
+        answered = failed = False
+
+        def launch() -> float:
+            """Lanza el siguiente proveedor y devuelve su retardo de cobertura."""
+            nonlocal next_index
+            service_name, service_func = providers[next_index]
+            logger.debug("Attempting %s...", service_name)
+            task = asyncio.create_task(
+                self._timed_service(service_name, service_func, address, client)
+            )
+            pending[task] = next_index
+            next_index += 1
+            return self._hedge_delay(service_name)
+
+        try:
+            hedge_delay = launch()
+            while pending:
+                timeout = hedge_delay if next_index < len(providers) else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # El proveedor en curso supera su p95: cubrirlo con el siguiente
+                    hedge_delay = launch()
                     continue
+                
+                answers = {}
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        failed = True
+                        logger.info("%s failed with exception: %s", providers[index][0], e)
+                        continue
+                    if result:
+                        answers[index] = result
+                    else:
+                        answered = True
+                        logger.debug("%s returned no results", providers[index][0])
+                
+                if answers:
+                    best = min(answers)
+                    logger.info("Geocoded with %s: %s", providers[best][0], answers[best])
+                    return answers[best], True
+                
+                # Algún proveedor ha fallado: no esperar al retardo para lanzar el siguiente
+                if next_index < len(providers):
+                    hedge_delay = launch()
+        finally:
+            for task in pending:
+                task.cancel()
         
-        print(f"[Geocoding] === ALL SERVICES FAILED for: {address} ===\n")
-        return None
+        logger.warning("All providers failed for: %s", address)
+        return None, answered and not failed
 
+
+geocoding_service = GeocodingService()
+
+
+def get_geocoding_service() -> GeocodingService:
+    """
+    Dependency que devuelve el servicio de geocodificación de la aplicación.
+    Todas las peticiones comparten la misma instancia y su pool de conexiones.
+    
+    :return: Servicio de geocodificación compartido.
+    """
+    return geocoding_service
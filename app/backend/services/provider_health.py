@@ -0,0 +1,189 @@
+"""Seguimiento de salud y circuit breaker por proveedor de geocodificación"""
+import time
+from collections import deque
+from core.config import settings
+
+
+class CircuitOpenError(Exception):
+    """El circuit breaker del proveedor está abierto y no admite peticiones."""
+
+
+class ProviderHealth:
+    """
+    Estado de salud de un proveedor externo.
+
+    Mantiene una ventana deslizante de resultados (tasa de éxito), una media
+    exponencial (EWMA) y el p95 de la latencia, y un circuit breaker con tres
+    estados:
+
+    * closed: se admiten peticiones.
+    * open: demasiados fallos recientes; se rechazan sin llamar al proveedor.
+    * half_open: pasado el tiempo de enfriamiento se deja pasar una única
+      petición de prueba que decide si el circuito se cierra o se vuelve a abrir.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    LATENCY_SAMPLES = 100
+    MIN_LATENCY_SAMPLES = 20
+
+    def __init__(
+        self,
+        name: str,
+        preference: int,
+        window: int = settings.GEOCODING_BREAKER_WINDOW,
+        failure_rate_threshold: float = settings.GEOCODING_BREAKER_FAILURE_RATE,
+        min_calls: int = settings.GEOCODING_BREAKER_MIN_CALLS,
+        open_seconds: float = settings.GEOCODING_BREAKER_OPEN_SECONDS,
+        ewma_alpha: float = settings.GEOCODING_LATENCY_EWMA_ALPHA
+    ):
+        """
+        Inicializa el estado del proveedor.
+
+        :param name: Nombre del proveedor.
+        :param preference: Posición en el orden de preferencia estático (0 = preferido).
+        :param window: Número de resultados recientes considerados.
+        :param failure_rate_threshold: Tasa de fallos que abre el circuito.
+        :param min_calls: Resultados mínimos en la ventana antes de poder abrirlo.
+        :param open_seconds: Tiempo que permanece abierto antes de la prueba.
+        :param ewma_alpha: Peso de la última muestra en la media de latencia.
+        """
+        self.name = name
+        self.preference = preference
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.ewma_alpha = ewma_alpha
+        self.state = self.CLOSED
+        self.opened_at: float | None = None
+        self.latency_ewma: float | None = None
+        self.total_calls = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._latencies: deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+        self._probe_in_flight = False
+
+    @property
+    def success_rate(self) -> float:
+        """Proporción de éxitos en la ventana reciente (1.0 sin datos)."""
+        if not self._outcomes:
+            return 1.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def available(self) -> bool:
+        """
+        Indica si el proveedor puede recibir una petición ahora, sin modificar su estado.
+
+        :return: True si el circuito está cerrado o admite una prueba.
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        return not self._probe_in_flight
+
+    def acquire(self) -> None:
+        """
+        Reserva una petición al proveedor.
+
+        :raises CircuitOpenError: Si el circuito no admite peticiones.
+        """
+        if self.state == self.CLOSED:
+            return
+        if not self.available():
+            raise CircuitOpenError(f"{self.name} circuit is {self.state}")
+        self.state = self.HALF_OPEN
+        self._probe_in_flight = True
+
+    def release(self) -> None:
+        """Libera la prueba en curso si la petición se canceló sin resultado."""
+        self._probe_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        """
+        Registra una respuesta correcta del proveedor.
+
+        :param latency: Latencia de la petición en segundos.
+        """
+        self.total_calls += 1
+        self.consecutive_failures = 0
+        self._outcomes.append(True)
+        self._latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.ewma_alpha * (latency - self.latency_ewma)
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self.opened_at = None
+            self._outcomes.clear()
+            self._outcomes.append(True)
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Registra un error, timeout o respuesta no válida del proveedor."""
+        self.total_calls += 1
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self._outcomes.append(False)
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            self._open()
+        elif (
+            len(self._outcomes) >= self.min_calls
+            and 1 - self.success_rate >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Abre el circuito."""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def p95(self) -> float | None:
+        """
+        Latencia p95 de las respuestas correctas recientes.
+
+        :return: Latencia en segundos o None si no hay suficientes muestras.
+        """
+        if len(self._latencies) < self.MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def score(self, default_latency: float) -> float:
+        """
+        Coste estimado de usar el proveedor: latencia esperada penalizada por
+        su tasa de fallos. Menor es mejor.
+
+        :param default_latency: Latencia supuesta mientras no hay muestras.
+        :return: Coste en segundos.
+        """
+        latency = self.latency_ewma if self.latency_ewma is not None else default_latency
+        return latency / max(self.success_rate, 0.1)
+
+    def snapshot(self) -> dict:
+        """
+        Devuelve el estado del proveedor para introspección.
+
+        :return: Diccionario con estado, tasas y latencias.
+        """
+        p95 = self.p95()
+        open_remaining = None
+        if self.state == self.OPEN:
+            open_remaining = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "name": self.name,
+            "preference": self.preference,
+            "state": self.state,
+            "success_rate": round(self.success_rate, 4),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "open_remaining_seconds": round(open_remaining, 1) if open_remaining is not None else None
+        }
@@ -0,0 +1,167 @@
+"""Limitadores de tasa (token bucket) para llamadas a servicios externos"""
+import asyncio
+import logging
+import time
+from pymongo import ReturnDocument
+from core.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """No se pudo obtener un token dentro del tiempo máximo de espera."""
+
+
+class TokenBucket:
+    """
+    Token bucket en memoria con cola FIFO y espera máxima.
+
+    Se rellena a `rate` tokens por segundo hasta `capacity`. Las peticiones
+    esperan su turno en orden de llegada; si el token no estaría disponible
+    antes de `max_wait` segundos se rechazan en lugar de seguir en cola.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, max_wait: float = 5.0):
+        """
+        Inicializa el limitador.
+
+        :param rate: Tokens por segundo.
+        :param capacity: Tamaño máximo de ráfaga.
+        :param max_wait: Tiempo máximo de espera en cola (segundos).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.rejected = 0
+
+    def _refill(self) -> None:
+        """Añade los tokens generados desde la última actualización."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        Espera hasta obtener un token.
+
+        :raises RateLimitExceeded: Si la espera superaría max_wait.
+        """
+        deadline = time.monotonic() + self.max_wait
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise RateLimitExceeded("Rate limit queue wait exceeded")
+            try:
+                self._refill()
+                if self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate
+                    if time.monotonic() + wait > deadline:
+                        self.rejected += 1
+                        raise RateLimitExceeded("Rate limit queue wait exceeded")
+                    await asyncio.sleep(wait)
+                    self._refill()
+                self._tokens -= 1
+            finally:
+                self._lock.release()
+        finally:
+            self.waiting -= 1
+
+
+class MongoTokenBucket(TokenBucket):
+    """
+    Token bucket compartido entre procesos a través de MongoDB.
+
+    El estado vive en la colección `rate_limits` (un documento por limitador)
+    y se actualiza con una única operación atómica que rellena los tokens con
+    el reloj del servidor ($$NOW) y consume uno si hay disponible. Dentro de
+    cada proceso las peticiones siguen haciendo cola en orden de llegada.
+    Si MongoDB no responde se aplica el limitador local.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float = 1.0, max_wait: float = 5.0):
+        """
+        Inicializa el limitador compartido.
+
+        :param name: Identificador del limitador en la colección.
+        :param rate: Tokens por segundo (para todos los procesos juntos).
+        :param capacity: Tamaño máximo de ráfaga.
+        :param max_wait: Tiempo máximo de espera en cola (segundos).
+        """
+        super().__init__(rate, capacity, max_wait)
+        self.name = name
+        self._local = TokenBucket(rate, capacity, max_wait)
+
+    async def _take(self) -> float:
+        """
+        Intenta consumir un token del documento compartido.
+
+        :return: 0 si se obtuvo el token, o segundos estimados hasta el siguiente.
+        """
+        elapsed_seconds = {"$divide": [
+            {"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]},
+            1000
+        ]}
+        document = await db.get_db().rate_limits.find_one_and_update(
+            {"_id": self.name},
+            [
+                {"$set": {
+                    "tokens": {"$min": [
+                        self.capacity,
+                        {"$add": [
+                            {"$ifNull": ["$tokens", self.capacity]},
+                            {"$multiply": [elapsed_seconds, self.rate]}
+                        ]}
+                    ]},
+                    "updated_at": "$$NOW"
+                }},
+                {"$set": {"granted": {"$gte": ["$tokens", 1]}}},
+                {"$set": {"tokens": {
+                    "$cond": ["$granted", {"$subtract": ["$tokens", 1]}, "$tokens"]
+                }}}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if document["granted"]:
+            return 0.0
+        return (1 - document["tokens"]) / self.rate
+
+    async def acquire(self) -> None:
+        """
+        Espera hasta obtener un token del limitador compartido.
+
+        :raises RateLimitExceeded: Si la espera superaría max_wait.
+        """
+        deadline = time.monotonic() + self.max_wait
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise RateLimitExceeded("Rate limit queue wait exceeded")
+            try:
+                while True:
+                    try:
+                        wait = await self._take()
+                    except Exception as e:
+                        logger.warning("Shared limiter '%s' unavailable, using local: %s", self.name, e)
+                        await self._local.acquire()
+                        return
+                    if wait <= 0:
+                        return
+                    if time.monotonic() + wait > deadline:
+                        self.rejected += 1
+                        raise RateLimitExceeded("Rate limit queue wait exceeded")
+                    await asyncio.sleep(wait)
+            finally:
+                self._lock.release()
+        finally:
+            self.waiting -= 1
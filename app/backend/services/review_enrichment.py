@@ -0,0 +1,156 @@
+"""Enriquecimiento de reseñas en segundo plano (geocodificación diferida)"""
+import asyncio
+import logging
+from core.config import settings
+from models.job import JobModel
+from repositories.review_repository import ReviewRepository
+from services.job_worker import JobWorkerPool, job_worker_pool
+from services.map_service import geocoding_service, DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+from services.review_events import review_events
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_REVIEW_JOB = "geocode_review"
+# Reseñas pendientes revisadas en cada pasada
+PENDING_SWEEP_BATCH = 500
+
+
+class GeocodingNotResolved(Exception):
+    """Ningún proveedor devolvió coordenadas para la dirección."""
+
+
+async def geocode_review(job: JobModel) -> None:
+    """
+    Geocodifica la dirección de una reseña pendiente y guarda sus coordenadas.
+
+    :param job: Trabajo con review_id y address en el payload.
+    :raises GeocodingNotResolved: Si no se obtienen coordenadas (se reintentará).
+    """
+    review_id = job.payload["review_id"]
+    address = job.payload["address"]
+
+    # Los reintentos llegan antes de que caduque una entrada negativa de la
+    # caché; si se usara, todos fallarían sin consultar a ningún proveedor
+    coordinates = await geocoding_service.get_coordinates(address, skip_negative_cache=True)
+    if not coordinates:
+        raise GeocodingNotResolved(f"No coordinates for '{address}'")
+
+    await _set_coordinates(review_id, coordinates[0], coordinates[1], "done")
+
+
+async def geocode_review_exhausted(job: JobModel) -> None:
+    """
+    Asigna las coordenadas por defecto a una reseña cuya geocodificación
+    ha agotado los reintentos.
+
+    :param job: Trabajo fallido.
+    """
+    await _set_coordinates(job.payload["review_id"], DEFAULT_LATITUDE, DEFAULT_LONGITUDE, "failed")
+
+
+async def _set_coordinates(review_id: str, latitude: float, longitude: float, status: str) -> None:
+    """
+    Actualiza las coordenadas y el estado de geocodificación de una reseña
+    y notifica a los suscriptores.
+
+    :param review_id: ID de la reseña.
+    :param latitude: Latitud.
+    :param longitude: Longitud.
+    :param status: Estado final de la geocodificación (done o failed).
+    """
+    review = await ReviewRepository().update(review_id, {
+        "latitude": latitude,
+        "longitude": longitude,
+        "geocode_status": status
+    })
+    if review:
+        review_events.publish(review_id, {
+            "id": review_id,
+            "latitude": latitude,
+            "longitude": longitude,
+            "geocode_status": status
+        })
+
+
+async def enqueue_geocode_review(review_id: str, address: str, pool: JobWorkerPool = job_worker_pool) -> JobModel:
+    """
+    Encola la geocodificación de una reseña. Es idempotente: la clave del
+    trabajo es el ID de la reseña, así que encolarla otra vez no la duplica.
+
+    :param review_id: ID de la reseña.
+    :param address: Dirección a geocodificar.
+    :param pool: Pool de workers.
+    :return: Trabajo creado o existente.
+    """
+    return await pool.enqueue(
+        GEOCODE_REVIEW_JOB,
+        {"review_id": review_id, "address": address},
+        key=f"{GEOCODE_REVIEW_JOB}:{review_id}"
+    )
+
+
+class PendingGeocodingSweeper:
+    """
+    Encola la geocodificación de las reseñas que siguen pendientes.
+
+    create_review encola el trabajo después de guardar la reseña; si el
+    encolado falla o el proceso se detiene entre ambos pasos, la reseña
+    quedaría pendiente para siempre. Cada pasada vuelve a encolar todas las
+    pendientes: como el trabajo es idempotente, las que ya tienen uno no
+    cambian. La primera pasada se ejecuta al arrancar.
+    """
+
+    def __init__(self, interval_seconds: float = settings.GEOCODE_PENDING_SWEEP_SECONDS):
+        """
+        Inicializa el revisor sin arrancarlo.
+
+        :param interval_seconds: Segundos entre pasadas.
+        """
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Arranca las pasadas periódicas. Se llama al arrancar la aplicación."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pending-geocoding")
+
+    async def stop(self) -> None:
+        """Detiene las pasadas periódicas."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        """Bucle de pasadas; un fallo se registra y se reintenta en la siguiente."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Pending geocoding sweep error")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def sweep(self) -> int:
+        """
+        Ejecuta una pasada.
+
+        :return: Número de reseñas pendientes revisadas.
+        """
+        pending = await ReviewRepository().get_pending_geocoding(PENDING_SWEEP_BATCH)
+        for review in pending:
+            await enqueue_geocode_review(review["id"], review["address"])
+        if pending:
+            logger.info("Checked geocoding jobs of %s pending reviews", len(pending))
+        return len(pending)
+
+
+pending_geocoding_sweeper = PendingGeocodingSweeper()
+
+
+def register_enrichment_jobs(pool: JobWorkerPool) -> None:
+    """
+    Registra los handlers de enriquecimiento de reseñas en el pool de workers.
+
+    :param pool: Pool de workers de la aplicación.
+    """
+    pool.register(GEOCODE_REVIEW_JOB, geocode_review, on_exhausted=geocode_review_exhausted)
@@ -0,0 +1,54 @@
+"""Notificaciones en proceso de cambios en reseñas"""
+import asyncio
+
+
+class ReviewEventBus:
+    """
+    Publicación/suscripción en memoria de actualizaciones de reseñas.
+
+    Permite que un endpoint de streaming espere a que un worker termine de
+    enriquecer una reseña sin consultar la base de datos en bucle. Solo
+    alcanza a los suscriptores del mismo proceso; los demás deben sondear.
+    """
+
+    def __init__(self):
+        """Inicializa el bus sin suscriptores."""
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def subscribe(self, review_id: str) -> asyncio.Queue:
+        """
+        Se suscribe a las actualizaciones de una reseña.
+
+        :param review_id: ID de la reseña.
+        :return: Cola en la que se recibirán los eventos.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+        self._subscribers.setdefault(review_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, review_id: str, queue: asyncio.Queue) -> None:
+        """
+        Cancela una suscripción.
+
+        :param review_id: ID de la reseña.
+        :param queue: Cola devuelta por subscribe().
+        """
+        queues = self._subscribers.get(review_id)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[review_id]
+
+    def publish(self, review_id: str, event: dict) -> None:
+        """
+        Notifica una actualización a los suscriptores de la reseña.
+
+        :param review_id: ID de la reseña.
+        :param event: Datos del evento.
+        """
+        for queue in self._subscribers.get(review_id, ()):
+            if not queue.full():
+                queue.put_nowait(event)
+
+
+review_events = ReviewEventBus()
@@ -0,0 +1,331 @@
+"""Backends de almacenamiento de imágenes (Cloudinary y disco local)"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+from core.config import settings
+from core.uploads import detect_image_type
+
+logger = logging.getLogger(__name__)
+
+# Tipo MIME detectado -> extensión del fichero guardado en disco
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/heic": ".heic",
+    "image/heif": ".heif",
+    "image/avif": ".avif",
+}
+_CLOUDINARY_VERSION = re.compile(r"^v\d+$")
+
+
+def media_type_for(path: Path) -> str:
+    """
+    Tipo MIME de un fichero guardado por LocalStorage según su extensión.
+
+    :param path: Ruta del fichero.
+    :return: Tipo MIME.
+    """
+    for media_type, extension in _EXTENSIONS.items():
+        if path.suffix == extension:
+            return media_type
+    return "application/octet-stream"
+
+
+class StorageBackend(ABC):
+    """
+    Interfaz de los backends de almacenamiento de imágenes.
+    Los métodos son bloqueantes: ImageService los ejecuta en su pool de hilos.
+    """
+
+    name: str = "storage"
+
+    @abstractmethod
+    def upload(self, file_content: bytes | BinaryIO, folder: str) -> str | None:
+        """
+        Guarda una imagen.
+
+        :param file_content: Contenido binario o fichero abierto en modo binario.
+        :param folder: Carpeta lógica de destino (reviews, reviews/thumbnails...).
+        :return: URL pública de la imagen o None si falla.
+        """
+
+    @abstractmethod
+    def delete(self, url: str) -> bool:
+        """
+        Elimina una imagen a partir de su URL.
+
+        :param url: URL devuelta por upload().
+        :return: True si se eliminó, False en caso contrario.
+        """
+
+    @abstractmethod
+    def list_assets(self, folder: str) -> Iterator[tuple[str, datetime]]:
+        """
+        Recorre las imágenes almacenadas bajo una carpeta (incluidas subcarpetas).
+
+        :param folder: Carpeta lógica.
+        :return: Iterador de tuplas (URL, fecha de creación en UTC).
+        """
+
+    def delete_many(self, urls: list[str]) -> list[str]:
+        """
+        Elimina varias imágenes. Los backends con API de borrado masivo lo
+        sobrescriben para hacerlo en una sola llamada.
+
+        :param urls: URLs de las imágenes.
+        :return: URLs eliminadas.
+        """
+        return [url for url in urls if self.delete(url)]
+
+
+class CloudinaryStorage(StorageBackend):
+    """Almacenamiento en Cloudinary."""
+
+    name = "cloudinary"
+
+    def __init__(self):
+        """Inicializa la configuración de Cloudinary."""
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET
+        )
+
+    def upload(self, file_content: bytes | BinaryIO, folder: str) -> str | None:
+        """
+        Sube una imagen a Cloudinary.
+        Los ficheros se envían por trozos de IMAGE_UPLOAD_CHUNK_BYTES, de modo
+        que nunca se cargan enteros en memoria.
+
+        :param file_content: Contenido binario o fichero abierto en modo binario.
+        :param folder: Carpeta de destino en Cloudinary.
+        :return: URL segura de la imagen o None si falla.
+        """
+        try:
+            if isinstance(file_content, (bytes, bytearray)):
+                response = cloudinary.uploader.upload(
+                    file_content,
+                    folder=folder
+                )
+            else:
+                file_content.seek(0)
+                response = cloudinary.uploader.upload_large(
+                    file_content,
+                    folder=folder,
+                    resource_type="image",
+                    chunk_size=settings.IMAGE_UPLOAD_CHUNK_BYTES
+                )
+            return response.get("secure_url")
+        except Exception as e:
+            logger.warning("Cloudinary upload error: %s", e)
+            return None
+
+    @staticmethod
+    def public_id(url: str) -> str | None:
+        """
+        Obtiene el public_id de Cloudinary a partir de la URL de entrega
+        (.../image/upload/v123/reviews/abc.webp -> reviews/abc).
+
+        :param url: URL de la imagen.
+        :return: public_id o None si la URL no es de Cloudinary.
+        """
+        _, separator, path = url.partition("/upload/")
+        if not separator:
+            return None
+        segments = path.split("/")
+        if segments and _CLOUDINARY_VERSION.match(segments[0]):
+            segments = segments[1:]
+        return os.path.splitext("/".join(segments))[0] or None
+
+    def delete(self, url: str) -> bool:
+        """
+        Elimina una imagen de Cloudinary.
+
+        :param url: URL de la imagen.
+        :return: True si se eliminó correctamente, False en caso contrario.
+        """
+        public_id = self.public_id(url)
+        if not public_id:
+            return False
+        try:
+            result = cloudinary.uploader.destroy(public_id)
+            return result.get("result") == "ok"
+        except Exception as e:
+            logger.warning("Cloudinary delete error: %s", e)
+            return False
+
+    def list_assets(self, folder: str) -> Iterator[tuple[str, datetime]]:
+        """
+        Recorre las imágenes de una carpeta con la Admin API (páginas de 500).
+
+        :param folder: Prefijo de public_id.
+        :return: Iterador de tuplas (URL segura, fecha de creación en UTC).
+        """
+        cursor = None
+        while True:
+            options = {"type": "upload", "prefix": f"{folder.strip('/')}/", "max_results": 500}
+            if cursor:
+                options["next_cursor"] = cursor
+            page = cloudinary.api.resources(**options)
+            for resource in page.get("resources", []):
+                created_at = datetime.fromisoformat(resource["created_at"].replace("Z", "+00:00"))
+                yield resource["secure_url"], created_at
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return
+
+    def delete_many(self, urls: list[str]) -> list[str]:
+        """
+        Elimina varias imágenes con una sola llamada a la Admin API (máximo 100).
+
+        :param urls: URLs de las imágenes.
+        :return: URLs eliminadas.
+        """
+        by_public_id = {self.public_id(url): url for url in urls}
+        by_public_id.pop(None, None)
+        if not by_public_id:
+            return []
+        try:
+            result = cloudinary.api.delete_resources(list(by_public_id))
+        except Exception as e:
+            logger.warning("Cloudinary bulk delete error: %s", e)
+            return []
+        return [
+            by_public_id[public_id]
+            for public_id, outcome in result.get("deleted", {}).items()
+            if outcome == "deleted" and public_id in by_public_id
+        ]
+
+
+class LocalStorage(StorageBackend):
+    """
+    Almacenamiento en disco local, servido por la propia API (/media).
+    Cada fichero se nombra con el SHA-256 de su contenido, así que su URL
+    nunca cambia de contenido y puede cachearse indefinidamente.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = settings.MEDIA_ROOT, base_url: str = settings.MEDIA_BASE_URL):
+        """
+        :param root: Directorio donde se guardan las imágenes.
+        :param base_url: URL pública bajo la que se sirve el directorio.
+        """
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def path_for(self, relative_path: str) -> Path | None:
+        """
+        Traduce una ruta relativa de /media a un fichero dentro del directorio raíz.
+
+        :param relative_path: Ruta relativa (carpeta/nombre).
+        :return: Ruta absoluta o None si sale del directorio raíz.
+        """
+        path = (self.root / relative_path).resolve()
+        # Fuera del directorio raíz o fichero temporal de una subida en curso
+        if not path.is_relative_to(self.root) or path.name.startswith("."):
+            return None
+        return path
+
+    def upload(self, file_content: bytes | BinaryIO, folder: str) -> str | None:
+        """
+        Guarda una imagen en disco. Se escribe en un temporal mientras se
+        calcula el hash y se mueve a su nombre definitivo de forma atómica.
+
+        :param file_content: Contenido binario o fichero abierto en modo binario.
+        :param folder: Subcarpeta de destino.
+        :return: URL pública de la imagen o None si falla.
+        """
+        directory = self.path_for(folder)
+        if directory is None:
+            return None
+        temp_path = None
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            digest = hashlib.sha256()
+            with tempfile.NamedTemporaryFile(dir=directory, prefix=".upload-", delete=False) as output:
+                temp_path = Path(output.name)
+                if isinstance(file_content, (bytes, bytearray)):
+                    header = bytes(file_content[:16])
+                    digest.update(file_content)
+                    output.write(file_content)
+                else:
+                    file_content.seek(0)
+                    header = file_content.read(16)
+                    file_content.seek(0)
+                    while chunk := file_content.read(1024 * 1024):
+                        digest.update(chunk)
+                        output.write(chunk)
+            extension = _EXTENSIONS.get(detect_image_type(header), ".bin")
+            name = f"{digest.hexdigest()}{extension}"
+            os.replace(temp_path, directory / name)
+            return f"{self.base_url}/{folder.strip('/')}/{name}"
+        except Exception as e:
+            logger.warning("Local storage upload error: %s", e)
+            if temp_path:
+                temp_path.unlink(missing_ok=True)
+            return None
+
+    def delete(self, url: str) -> bool:
+        """
+        Elimina una imagen del disco.
+
+        :param url: URL de la imagen.
+        :return: True si se eliminó, False si no existe o no es de este backend.
+        """
+        prefix = f"{self.base_url}/"
+        if not url.startswith(prefix):
+            return False
+        path = self.path_for(url[len(prefix):])
+        if path is None or not path.is_file():
+            return False
+        path.unlink()
+        return True
+
+    def list_assets(self, folder: str) -> Iterator[tuple[str, datetime]]:
+        """
+        Recorre los ficheros de una carpeta del disco.
+
+        :param folder: Subcarpeta.
+        :return: Iterador de tuplas (URL pública, fecha de modificación en UTC).
+        """
+        directory = self.path_for(folder)
+        if directory is None or not directory.is_dir():
+            return
+        for path in directory.rglob("*"):
+            if path.is_file() and not path.name.startswith("."):
+                relative = path.relative_to(self.root).as_posix()
+                modified = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+                yield f"{self.base_url}/{relative}", modified
+
+
+_storage_backend: StorageBackend | None = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Devuelve el backend configurado en IMAGE_STORAGE_BACKEND (cloudinary o local).
+
+    :return: Instancia compartida del backend.
+    :raises ValueError: Si el backend configurado no existe.
+    """
+    global _storage_backend
+    if _storage_backend is None:
+        backends = {"cloudinary": CloudinaryStorage, "local": LocalStorage}
+        backend = backends.get(settings.IMAGE_STORAGE_BACKEND)
+        if backend is None:
+            raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND '{settings.IMAGE_STORAGE_BACKEND}'")
+        _storage_backend = backend()
+    return _storage_backend
@@ -0,0 +1,6 @@
+"""Configuración común de los tests"""
+import os
+
+# Settings exige MONGO_URI. Los tests unitarios no conectan con MongoDB: si no
+# se ha definido se deja vacía y los tests que necesitan una base de datos se saltan
+os.environ.setdefault("MONGO_URI", "")
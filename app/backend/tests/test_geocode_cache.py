@@ -0,0 +1,18 @@
+"""Tests de la normalización de direcciones de la caché de geocodificación"""
+import pytest
+from services.geocode_cache import normalize_address
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("Calle Larios, 5, Málaga", "calle larios 5 málaga"),
+    ("  CALLE   LARIOS 5 — MÁLAGA. ", "calle larios 5 málaga"),
+    ("Ｃａｌｌｅ Ｌａｒｉｏｓ", "calle larios"),
+    ("Straße 1", "strasse 1"),
+])
+def test_normalize_address(address, expected):
+    assert normalize_address(address) == expected
+
+
+def test_normalize_address_keeps_accents():
+    # Las tildes distinguen direcciones distintas; solo se ignoran mayúsculas y puntuación
+    assert normalize_address("Avenida de Andalucía") != normalize_address("Avenida de Andalucia")
@@ -0,0 +1,205 @@
+"""Tests de la estrategia hedged y del singleflight de GeocodingService con proveedores falsos"""
+import asyncio
+from collections.abc import Callable
+from services.map_service import GeocodingService
+
+MALAGA = (36.7213, -4.4216)
+SEVILLA = (37.3891, -5.9845)
+
+
+class FakeProvider:
+    """Proveedor que responde lo indicado tras esperar, sin red."""
+
+    def __init__(self, result=None, delay: float = 0.0, error: Exception | None = None, gate: asyncio.Event | None = None):
+        """
+        :param result: Coordenadas devueltas (None = sin resultados).
+        :param delay: Segundos que tarda en responder.
+        :param error: Excepción a lanzar en lugar de responder.
+        :param gate: Evento que debe activarse antes de responder.
+        """
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.gate = gate
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self, address: str, client) -> tuple[float, float] | None:
+        self.calls += 1
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class FakeGeocodingService(GeocodingService):
+    """GeocodingService con proveedores falsos y retardo de cobertura fijo."""
+
+    def __init__(self, providers: list[FakeProvider], hedge_delay: float = 0.05):
+        self.fake_providers = providers
+        self.hedge_delay = hedge_delay
+        super().__init__()
+
+    def _provider_table(self) -> list[tuple[str, Callable]]:
+        return [(f"Fake{index}", provider) for index, provider in enumerate(self.fake_providers)]
+
+    def _hedge_delay(self, service_name: str) -> float:
+        return self.hedge_delay
+
+
+async def _settle() -> None:
+    """Deja correr al event loop para que se entreguen las cancelaciones."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_hedged_returns_first_provider_when_fast():
+    async def scenario():
+        first, second = FakeProvider(MALAGA), FakeProvider(SEVILLA)
+        service = FakeGeocodingService([first, second])
+        return await service._hedged("Calle Larios", None), first, second
+
+    result, first, second = asyncio.run(scenario())
+
+    assert result == (MALAGA, True)
+    assert second.calls == 0
+
+
+def test_hedged_launches_next_provider_and_cancels_the_slow_one():
+    async def scenario():
+        slow, fast = FakeProvider(MALAGA, delay=5), FakeProvider(SEVILLA)
+        service = FakeGeocodingService([slow, fast], hedge_delay=0.05)
+        result = await asyncio.wait_for(service._hedged("Calle Larios", None), timeout=1)
+        await _settle()
+        return result, slow, service
+
+    result, slow, service = asyncio.run(scenario())
+
+    assert result == (SEVILLA, True)
+    assert slow.cancelled
+    # La cancelación no cuenta como fallo del proveedor ni deja la prueba reservada
+    assert service._health["Fake0"].total_failures == 0
+    assert service._health["Fake0"].available()
+
+
+def test_hedged_prefers_the_provider_order_when_answers_arrive_together():
+    async def scenario():
+        gate = asyncio.Event()
+        first, second = FakeProvider(MALAGA, gate=gate), FakeProvider(SEVILLA, gate=gate)
+        service = FakeGeocodingService([first, second], hedge_delay=0)
+        task = asyncio.create_task(service._hedged("Calle Larios", None))
+        while second.calls == 0:
+            await asyncio.sleep(0)
+        gate.set()
+        return await task
+
+    assert asyncio.run(scenario()) == (MALAGA, True)
+
+
+def test_hedged_launches_next_provider_immediately_after_a_failure():
+    async def scenario():
+        failing, working = FakeProvider(error=RuntimeError("HTTP 503")), FakeProvider(SEVILLA)
+        # Con un retardo de cobertura tan largo, solo el fallo puede lanzar el segundo
+        service = FakeGeocodingService([failing, working], hedge_delay=60)
+        result = await asyncio.wait_for(service._hedged("Calle Larios", None), timeout=1)
+        return result, service
+
+    result, service = asyncio.run(scenario())
+
+    assert result == (SEVILLA, True)
+    assert service._health["Fake0"].total_failures == 1
+
+
+def test_hedged_no_results_is_conclusive_only_without_failures():
+    async def scenario(providers):
+        return await FakeGeocodingService(providers, hedge_delay=0)._hedged("Calle Inventada", None)
+
+    assert asyncio.run(scenario([FakeProvider(), FakeProvider()])) == (None, True)
+    assert asyncio.run(scenario([FakeProvider(), FakeProvider(error=RuntimeError("timeout"))])) == (None, False)
+
+
+def test_hedged_skips_providers_with_open_circuit():
+    async def scenario():
+        first, second = FakeProvider(MALAGA), FakeProvider(SEVILLA)
+        service = FakeGeocodingService([first, second])
+        service._health["Fake0"]._open()
+        return await service._hedged("Calle Larios", None), first
+
+    result, first = asyncio.run(scenario())
+
+    assert result == (SEVILLA, True)
+    assert first.calls == 0
+
+
+class SingleflightService(FakeGeocodingService):
+    """Cuenta las resoluciones reales y las retiene hasta que se abre la puerta."""
+
+    def __init__(self):
+        super().__init__([])
+        self.gate = asyncio.Event()
+        self.resolutions: list[tuple[str, bool]] = []
+
+    async def _lookup_or_resolve(self, address: str, skip_negative_cache: bool = False):
+        self.resolutions.append((address, skip_negative_cache))
+        await self.gate.wait()
+        return MALAGA
+
+
+def test_get_coordinates_shares_concurrent_lookups():
+    async def scenario():
+        service = SingleflightService()
+        lookups = [
+            asyncio.create_task(service.get_coordinates(address))
+            for address in ("Calle Larios, Málaga", "calle larios málaga", "CALLE LARIOS,  MÁLAGA")
+        ]
+        await _settle()
+        service.gate.set()
+        results = await asyncio.gather(*lookups)
+        return results, service
+
+    results, service = asyncio.run(scenario())
+
+    assert results == [MALAGA, MALAGA, MALAGA]
+    assert len(service.resolutions) == 1
+    assert service._inflight == {}
+
+
+def test_get_coordinates_does_not_share_across_negative_cache_modes():
+    async def scenario():
+        service = SingleflightService()
+        lookups = [
+            asyncio.create_task(service.get_coordinates("Calle Larios")),
+            asyncio.create_task(service.get_coordinates("Calle Larios", skip_negative_cache=True))
+        ]
+        await _settle()
+        service.gate.set()
+        await asyncio.gather(*lookups)
+        return service
+
+    service = asyncio.run(scenario())
+
+    assert sorted(service.resolutions) == [("Calle Larios", False), ("Calle Larios", True)]
+
+
+def test_get_coordinates_cancelling_one_caller_keeps_the_shared_lookup():
+    async def scenario():
+        service = SingleflightService()
+        impatient = asyncio.create_task(service.get_coordinates("Calle Larios"))
+        patient = asyncio.create_task(service.get_coordinates("Calle Larios"))
+        await _settle()
+        impatient.cancel()
+        await _settle()
+        service.gate.set()
+        return await patient, impatient, service
+
+    result, impatient, service = asyncio.run(scenario())
+
+    assert result == MALAGA
+    assert impatient.cancelled()
+    assert len(service.resolutions) == 1
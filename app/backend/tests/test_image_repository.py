@@ -0,0 +1,43 @@
+"""Tests de la liberación de referencias de ImageRepository"""
+import asyncio
+from types import SimpleNamespace
+from core.database import db
+from repositories.image_repository import ImageRepository
+
+
+class FakeImagesCollection:
+    """Colección que registra las llamadas a update_many."""
+
+    def __init__(self):
+        self.updates: list[tuple[dict, dict]] = []
+
+    async def update_many(self, query: dict, update: dict):
+        self.updates.append((query, update))
+        return SimpleNamespace(modified_count=len(query["url"]["$in"]))
+
+
+def _repository(monkeypatch) -> tuple[ImageRepository, FakeImagesCollection]:
+    """Crea el repositorio sobre una colección falsa."""
+    collection = FakeImagesCollection()
+    monkeypatch.setattr(db, "get_db", lambda: SimpleNamespace(images=collection))
+    return ImageRepository(), collection
+
+
+def test_release_groups_urls_by_number_of_references(monkeypatch):
+    repository, collection = _repository(monkeypatch)
+
+    modified = asyncio.run(repository.release(["a", "b", "a", "c", "a", "d", "d"]))
+
+    assert modified == 4
+    by_count = {-update["$inc"]["ref_count"]: query for query, update in collection.updates}
+    assert set(by_count) == {1, 2, 3}
+    assert by_count[1] == ImageRepository.release_filter(["b", "c"], 1)
+    assert by_count[2] == ImageRepository.release_filter(["d"], 2)
+    assert by_count[3] == ImageRepository.release_filter(["a"], 3)
+
+
+def test_release_without_urls_does_nothing(monkeypatch):
+    repository, collection = _repository(monkeypatch)
+
+    assert asyncio.run(repository.release([])) == 0
+    assert collection.updates == []
@@ -0,0 +1,31 @@
+"""Tests de los cursores de paginación"""
+import base64
+import json
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from core.pagination import encode_cursor, decode_cursor
+
+
+def _raw_cursor(data: dict) -> str:
+    """Codifica un diccionario arbitrario con el mismo formato que encode_cursor."""
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def test_decode_cursor_round_trip():
+    created_at = datetime(2025, 3, 14, 9, 26, 53, 589793)
+    document_id = ObjectId()
+
+    assert decode_cursor(encode_cursor(created_at, document_id)) == (created_at, document_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not-a-cursor",
+    _raw_cursor({"c": "2025-03-14T09:26:53"}),
+    _raw_cursor({"c": "ayer", "i": str(ObjectId())}),
+    _raw_cursor({"c": "2025-03-14T09:26:53", "i": "1234"}),
+])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,102 @@
+"""Tests del circuit breaker de los proveedores de geocodificación"""
+import pytest
+from services.provider_health import CircuitOpenError, ProviderHealth
+
+
+def _health() -> ProviderHealth:
+    """Proveedor que abre el circuito con la mitad de fallos a partir de 4 resultados."""
+    return ProviderHealth("Fake", 0, window=10, failure_rate_threshold=0.5, min_calls=4, open_seconds=60)
+
+
+def _open(health: ProviderHealth) -> None:
+    """Lleva el circuito a abierto a base de fallos."""
+    for _ in range(health.min_calls):
+        health.record_failure()
+    assert health.state == ProviderHealth.OPEN
+
+
+def _cool_down(health: ProviderHealth) -> None:
+    """Simula que ha pasado el tiempo de enfriamiento del circuito abierto."""
+    health.opened_at -= health.open_seconds
+
+
+def test_stays_closed_below_min_calls():
+    health = _health()
+    for _ in range(health.min_calls - 1):
+        health.record_failure()
+
+    assert health.state == ProviderHealth.CLOSED
+    health.acquire()
+
+
+def test_stays_closed_below_failure_rate():
+    health = _health()
+    for _ in range(3):
+        health.record_success(0.1)
+    for _ in range(2):
+        health.record_failure()
+
+    assert health.state == ProviderHealth.CLOSED
+
+
+def test_opens_and_rejects_requests():
+    health = _health()
+    _open(health)
+
+    assert not health.available()
+    with pytest.raises(CircuitOpenError):
+        health.acquire()
+
+
+def test_half_open_allows_a_single_probe():
+    health = _health()
+    _open(health)
+    _cool_down(health)
+
+    assert health.available()
+    health.acquire()
+    assert health.state == ProviderHealth.HALF_OPEN
+    assert not health.available()
+    with pytest.raises(CircuitOpenError):
+        health.acquire()
+
+
+def test_successful_probe_closes_the_circuit():
+    health = _health()
+    _open(health)
+    _cool_down(health)
+    health.acquire()
+
+    health.record_success(0.2)
+
+    assert health.state == ProviderHealth.CLOSED
+    assert health.opened_at is None
+    assert health.success_rate == 1.0
+    # La ventana se reinicia: un fallo suelto no vuelve a abrirlo
+    health.record_failure()
+    assert health.state == ProviderHealth.CLOSED
+
+
+def test_failed_probe_reopens_the_circuit():
+    health = _health()
+    _open(health)
+    _cool_down(health)
+    health.acquire()
+
+    health.record_failure()
+
+    assert health.state == ProviderHealth.OPEN
+    assert not health.available()
+
+
+def test_release_frees_a_cancelled_probe():
+    health = _health()
+    _open(health)
+    _cool_down(health)
+    health.acquire()
+
+    health.release()
+
+    assert health.state == ProviderHealth.HALF_OPEN
+    assert health.available()
+    health.acquire()
@@ -0,0 +1,162 @@
+"""
+Verificación de los planes de QUERY_SHAPES contra un MongoDB real.
+
+Se salta si no se define MONGO_URI en el entorno. Usa una base de datos
+propia (DATABASE_NAME + "_query_plans") que se crea con datos de ejemplo y
+se borra al terminar:
+
+    MONGO_URI=mongodb://localhost:27017 python -m pytest tests/test_query_plans.py
+"""
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from core.config import settings
+from core.indexes import QUERY_SHAPES, _explain, check_plan, ensure_indexes
+
+pytestmark = pytest.mark.skipif(not settings.MONGO_URI, reason="MONGO_URI no definida")
+
+# Reseñas de ejemplo: una rejilla por todo el mundo y un grupo en el viewport de Málaga
+GRID_STEP_DEGREES = 10
+MALAGA_REVIEWS = 50
+LOCATIONS = 200
+INTERACTIONS_PER_LOCATION = 10
+JOBS = 500
+IMAGES = 500
+
+
+def _seed_reviews(now: datetime) -> list[dict]:
+    """Reseñas repartidas por el mundo, unas pocas pendientes de geocodificar."""
+    points = [
+        (lon + 0.5, lat + 0.5)
+        for lon in range(-180, 180, GRID_STEP_DEGREES)
+        for lat in range(-80, 80, GRID_STEP_DEGREES)
+    ]
+    points += [(-4.42 + i * 0.001, 36.72 + i * 0.001) for i in range(MALAGA_REVIEWS)]
+    reviews = []
+    for index, (lon, lat) in enumerate(points):
+        review = {
+            "establishment_name": f"Bar {index}" if index % 20 else f"Casa Lola {index}",
+            "address": f"Calle {index}, Ciudad",
+            "latitude": lat,
+            "longitude": lon,
+            "location": {"type": "Point", "coordinates": [lon, lat]},
+            "geocode_status": "done",
+            "rating": index % 6,
+            "image_urls": [],
+            "thumbnail_urls": [],
+            "author_email": f"user{index % 50}@example.com",
+            "author_name": f"User {index % 50}",
+            "created_at": now - timedelta(minutes=index)
+        }
+        if index % 100 == 0:
+            review.update(latitude=None, longitude=None, geocode_status="pending")
+            del review["location"]
+        reviews.append(review)
+    return reviews
+
+
+def _seed_interactions(location_ids: list[str], now: datetime) -> list[dict]:
+    """Comentarios, visitas y un like por usuario y ubicación."""
+    interactions = []
+    for location_id in location_ids:
+        for index in range(INTERACTIONS_PER_LOCATION):
+            interactions.append({
+                "location_id": location_id,
+                "user_email": f"user{index}@example.com",
+                "type": ("comment", "visit", "like")[index % 3],
+                "content": None,
+                "created_at": now - timedelta(minutes=index)
+            })
+    return interactions
+
+
+def _seed_jobs(now: datetime) -> list[dict]:
+    """Trabajos en todos los estados; algunos con clave de idempotencia."""
+    jobs = []
+    for index in range(JOBS):
+        status = ("queued", "running", "done", "failed")[index % 4]
+        job = {
+            "type": "geocode_review",
+            "payload": {"review_id": str(ObjectId())},
+            "status": status,
+            "attempts": 1,
+            "max_attempts": 5,
+            "run_at": now + timedelta(minutes=index - JOBS // 2),
+            "leased_until": now + timedelta(minutes=index - JOBS // 2) if status == "running" else None,
+            "created_at": now,
+            "updated_at": now
+        }
+        if index % 2:
+            job["key"] = f"geocode_review:{index}"
+        jobs.append(job)
+    return jobs
+
+
+def _seed_images(now: datetime) -> list[dict]:
+    """Imágenes referenciadas y huérfanas de distintas fechas."""
+    return [
+        {
+            "_id": hashlib.sha256(str(index).encode()).hexdigest(),
+            "url": f"https://example.com/{index}.webp",
+            "thumbnail_url": None,
+            "ref_count": 0 if index % 10 == 0 else 1 + index % 3,
+            "created_at": now - timedelta(days=index),
+            "updated_at": now - timedelta(days=index)
+        }
+        for index in range(IMAGES)
+    ]
+
+
+async def _seed(database) -> None:
+    """Inserta los datos de ejemplo en todas las colecciones de QUERY_SHAPES."""
+    now = datetime.utcnow()
+    locations = [{"name": f"Sitio {index}", "created_at": now - timedelta(hours=index)} for index in range(LOCATIONS)]
+    await database.locations.insert_many(locations)
+    location_ids = [str(location["_id"]) for location in locations]
+
+    await database.reviews.insert_many(_seed_reviews(now))
+    await database.interactions.insert_many(_seed_interactions(location_ids, now))
+    await database.interaction_counters.insert_many(
+        [{"_id": location_id, "comment": 4, "visit": 3, "like": 3} for location_id in location_ids]
+    )
+    await database.jobs.insert_many(_seed_jobs(now))
+    await database.images.insert_many(_seed_images(now))
+    await database.geocode_cache.insert_many(
+        [{"_id": f"calle {index} malaga", "coordinates": [36.72, -4.42], "created_at": now} for index in range(100)]
+    )
+
+
+async def _check_query_plans() -> dict[str, str | None]:
+    """
+    Crea la base de datos de prueba, comprueba el plan de cada consulta y la borra.
+
+    :return: Nombre de la consulta -> problema del plan (None si es correcto).
+    """
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    database_name = f"{settings.DATABASE_NAME}_query_plans"
+    try:
+        await client.drop_database(database_name)
+        database = client[database_name]
+        await ensure_indexes(database)
+        await _seed(database)
+        return {
+            shape.name: check_plan(shape, await _explain(database, shape))
+            for shape in QUERY_SHAPES
+        }
+    finally:
+        await client.drop_database(database_name)
+        client.close()
+
+
+@pytest.fixture(scope="module")
+def plan_problems() -> dict[str, str | None]:
+    """Resultado de la verificación, compartido por todas las consultas."""
+    return asyncio.run(_check_query_plans())
+
+
+@pytest.mark.parametrize("shape", QUERY_SHAPES, ids=[shape.name for shape in QUERY_SHAPES])
+def test_query_uses_expected_index(shape, plan_problems):
+    assert plan_problems[shape.name] is None, plan_problems[shape.name]
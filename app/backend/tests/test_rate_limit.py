@@ -0,0 +1,84 @@
+"""Tests del token bucket en memoria"""
+import asyncio
+import time
+import pytest
+from services.rate_limit import RateLimitExceeded, TokenBucket
+
+
+def test_burst_up_to_capacity_does_not_wait():
+    async def scenario():
+        bucket = TokenBucket(rate=1, capacity=3, max_wait=0.5)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        elapsed = time.monotonic() - started
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire()
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.1
+
+
+def test_waiters_are_served_in_arrival_order():
+    async def scenario():
+        bucket = TokenBucket(rate=50, capacity=1, max_wait=5)
+        served = []
+
+        async def request(index: int) -> None:
+            await bucket.acquire()
+            served.append(index)
+
+        await asyncio.gather(*(request(index) for index in range(5)))
+        return served, bucket.rejected
+
+    served, rejected = asyncio.run(scenario())
+
+    assert served == [0, 1, 2, 3, 4]
+    assert rejected == 0
+
+
+def test_waits_for_the_next_token():
+    async def scenario():
+        bucket = TokenBucket(rate=20, capacity=1, max_wait=1)
+        await bucket.acquire()
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed >= 0.04
+
+
+def test_rejects_when_the_wait_exceeds_max_wait():
+    async def scenario():
+        bucket = TokenBucket(rate=1, capacity=1, max_wait=0.2)
+        await bucket.acquire()
+        started = time.monotonic()
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire()
+        return time.monotonic() - started, bucket
+
+    elapsed, bucket = asyncio.run(scenario())
+
+    # Se rechaza sin esperar: el token no llegaría a tiempo
+    assert elapsed < 0.2
+    assert bucket.rejected == 1
+    assert bucket.waiting == 0
+
+
+def test_rejects_waiters_stuck_behind_the_queue():
+    async def scenario():
+        bucket = TokenBucket(rate=2, capacity=1, max_wait=0.7)
+        results = await asyncio.gather(
+            *(bucket.acquire() for _ in range(3)),
+            return_exceptions=True
+        )
+        return results, bucket
+
+    results, bucket = asyncio.run(scenario())
+
+    # El primero pasa, el segundo espera 0,5 s y el tercero no cabe en 0,7 s
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], RateLimitExceeded)
+    assert bucket.rejected == 1
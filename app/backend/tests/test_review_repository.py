@@ -0,0 +1,69 @@
+"""Tests del filtro de viewport de ReviewRepository"""
+import pytest
+from repositories.review_repository import MAX_POLYGON_LON_SPAN, POLYGON_EDGE_STEP, ReviewRepository
+
+
+def _polygons(query: dict) -> list[list[list[float]]]:
+    """Devuelve los anillos exteriores de todos los polígonos de un filtro, en orden."""
+    if "$or" in query:
+        return [ring for branch in query["$or"] for ring in _polygons(branch)]
+    geometry = query["location"]["$geoWithin"]["$geometry"]
+    assert geometry["type"] == "Polygon"
+    return [geometry["coordinates"][0]]
+
+
+def _lon_range(ring: list[list[float]]) -> tuple[float, float]:
+    """Longitudes mínima y máxima de un anillo."""
+    longitudes = [lon for lon, _ in ring]
+    return min(longitudes), max(longitudes)
+
+
+def test_small_box_is_a_single_closed_polygon():
+    rings = _polygons(ReviewRepository._bbox_filter((-4.45, 36.70, -4.39, 36.74)))
+
+    assert len(rings) == 1
+    ring = rings[0]
+    assert ring[0] == ring[-1]
+    assert ring[0] == [-4.45, 36.70]
+    assert _lon_range(ring) == (-4.45, -4.39)
+    assert {lat for _, lat in ring} == {36.70, 36.74}
+
+
+def test_parallel_edges_are_densified():
+    ring = _polygons(ReviewRepository._bbox_filter((-30.0, 20.0, 30.0, 60.0)))[0]
+
+    for (lon_a, lat_a), (lon_b, lat_b) in zip(ring, ring[1:]):
+        if lat_a == lat_b:
+            # Lados norte y sur: vértices como mucho cada POLYGON_EDGE_STEP grados
+            assert abs(lon_b - lon_a) <= POLYGON_EDGE_STEP + 1e-9
+        else:
+            # Lados este y oeste: meridianos de un solo tramo
+            assert lon_a == lon_b
+    # 60 tramos por lado más el vértice de cierre
+    assert len(ring) == 2 * 61 + 1
+
+
+def test_box_crossing_the_antimeridian_is_split():
+    query = ReviewRepository._bbox_filter((170.0, -10.0, -170.0, 10.0))
+
+    assert "$or" in query
+    assert [_lon_range(ring) for ring in _polygons(query)] == [(170.0, 180.0), (-180.0, -170.0)]
+
+
+@pytest.mark.parametrize("bbox, strips", [
+    ((-180.0, -60.0, 180.0, 60.0), 4),
+    ((-100.0, -10.0, 100.0, 10.0), 3),
+    ((0.0, 0.0, 90.0, 10.0), 1),
+])
+def test_wide_box_is_split_into_equal_strips(bbox, strips):
+    rings = _polygons(ReviewRepository._bbox_filter(bbox))
+
+    assert len(rings) == strips
+    ranges = [_lon_range(ring) for ring in rings]
+    widths = [east - west for west, east in ranges]
+    assert all(width <= MAX_POLYGON_LON_SPAN for width in widths)
+    assert max(widths) - min(widths) < 1e-9
+    # Las franjas cubren la caja sin huecos
+    assert ranges[0][0] == bbox[0]
+    assert ranges[-1][1] == bbox[2]
+    assert all(ranges[i][1] == ranges[i + 1][0] for i in range(strips - 1))
@@ -9,14 +9,18 @@ export interface Review_Model {
     establishment_name: string;
     /** Dirección postal del establecimiento */
     address: string;
-    /** Latitud obtenida por geocoding */
-    latitude: number;
-    /** Longitud obtenida por geocoding */
-    longitude: number;
+    /** Latitud obtenida por geocoding (null mientras está pendiente) */
+    latitude: number | null;
+    /** Longitud obtenida por geocoding (null mientras está pendiente) */
+    longitude: number | null;
+    /** Estado del geocoding: pending mientras las coordenadas se calculan en segundo plano */
+    geocode_status?: 'pending' | 'done' | 'failed';
     /** Valoración de 0 a 5 puntos */
     rating: number;
     /** URLs de las imágenes en Cloudinary */
     image_urls: string[];
+    /** URLs de las miniaturas, en el mismo orden que image_urls */
+    thumbnail_urls?: string[];
     /** Email del autor de la reseña */
     author_email: string;
     /** Nombre del autor de la reseña */
@@ -29,6 +33,44 @@ export interface Review_Model {
     expires_at?: Date;
 }
 
+/**
+ * Página de reseñas devuelta por el listado paginado por cursor.
+ */
+export interface Review_Page {
+    /** Reseñas de la página actual */
+    items: Review_Model[];
+    /** Cursor para pedir la siguiente página (null si no hay más) */
+    next_cursor: string | null;
+}
+
+/**
+ * Grupo de reseñas cercanas agregado en el servidor.
+ */
+export interface Review_Cluster {
+    /** Latitud del centroide del grupo */
+    latitude: number;
+    /** Longitud del centroide del grupo */
+    longitude: number;
+    /** Número de reseñas del grupo */
+    count: number;
+    /** Valoración media del grupo */
+    average_rating: number;
+    /** ID de la reseña cuando el grupo contiene una sola */
+    review_id: string | null;
+}
+
+/**
+ * Marcadores del mapa para un viewport y nivel de zoom.
+ */
+export interface Review_Cluster_Response {
+    /** Nivel de zoom solicitado */
+    zoom: number;
+    /** Grupos de reseñas (zoom bajo) */
+    clusters: Review_Cluster[];
+    /** Reseñas individuales (zoom alto) */
+    points: Review_Model[];
+}
+
 /**
  * Datos para crear una nueva reseña.
  * Solo incluye los campos que el usuario proporciona directamente.
@@ -1,4 +1,4 @@
-import type { Review_Model, Geocoding_Result } from "../models/Review";
+import type { Review_Model, Review_Page, Review_Cluster_Response, Geocoding_Result } from "../models/Review";
 
 /**
  * Interfaz del repositorio de reseñas.
@@ -6,10 +6,20 @@ import type { Review_Model, Geocoding_Result } from "../models/Review";
  */
 export interface Review_Repository {
     /**
-     * Obtiene todas las reseñas del sistema.
-     * @returns Promesa con la lista de reseñas.
+     * Obtiene una página de reseñas.
+     * @param limit Número máximo de reseñas de la página.
+     * @param after Cursor de la página anterior.
+     * @returns Promesa con la página y el cursor siguiente.
      */
-    get_all(): Promise<Review_Model[]>;
+    get_page(limit: number, after?: string | null): Promise<Review_Page>;
+    
+    /**
+     * Obtiene los marcadores agrupados de un viewport del mapa.
+     * @param bbox Viewport en formato minLon,minLat,maxLon,maxLat.
+     * @param zoom Nivel de zoom del mapa.
+     * @returns Promesa con los clusters o las reseñas individuales.
+     */
+    get_clusters(bbox: string, zoom: number): Promise<Review_Cluster_Response>;
     
     /**
      * Obtiene una reseña por su ID.
@@ -1,5 +1,5 @@
 import type { Review_Repository } from "../../domain/repositories/ReviewRepository";
-import type { Review_Model, Geocoding_Result } from "../../domain/models/Review";
+import type { Review_Model, Review_Page, Review_Cluster_Response, Geocoding_Result } from "../../domain/models/Review";
 import api from "../api/axios_client";
 
 /**
@@ -8,11 +8,28 @@ import api from "../api/axios_client";
  */
 export class Http_Review_Repository implements Review_Repository {
     /**
-     * Obtiene todas las reseñas desde la API.
-     * @returns Promesa con la lista de reseñas.
+     * Obtiene una página de reseñas desde la API.
+     * @param limit Número máximo de reseñas de la página.
+     * @param after Cursor de la página anterior.
+     * @returns Promesa con la página y el cursor siguiente.
      */
-    async get_all(): Promise<Review_Model[]> {
-        const response = await api.get('/reviews');
+    async get_page(limit: number, after?: string | null): Promise<Review_Page> {
+        const response = await api.get('/reviews', {
+            params: { limit, ...(after ? { after } : {}) },
+        });
+        return response.data;
+    }
+
+    /**
+     * Obtiene los marcadores agrupados de un viewport del mapa.
+     * @param bbox Viewport en formato minLon,minLat,maxLon,maxLat.
+     * @param zoom Nivel de zoom del mapa.
+     * @returns Promesa con los clusters o las reseñas individuales.
+     */
+    async get_clusters(bbox: string, zoom: number): Promise<Review_Cluster_Response> {
+        const response = await api.get('/reviews/clusters', {
+            params: { bbox, zoom },
+        });
         return response.data;
     }
 
@@ -1,10 +1,10 @@
-import { MapContainer, TileLayer, Marker, Popup, useMap } from 'react-leaflet';
+import { MapContainer, TileLayer, Marker, Popup, useMap, useMapEvents } from 'react-leaflet';
 import 'leaflet/dist/leaflet.css';
 import L from 'leaflet';
 import { useState, useEffect } from 'react';
 import { FontAwesomeIcon } from '@fortawesome/react-fontawesome';
 import { faSearch, faSpinner, faMapMarkerAlt } from '@fortawesome/free-solid-svg-icons';
-import type { Review_Model, Geocoding_Result } from '../../domain/models/Review';
+import type { Review_Model, Review_Cluster, Geocoding_Result } from '../../domain/models/Review';
 import { StarRating } from './StarRating';
 
 // Fix for default marker icon in Leaflet + React
@@ -27,6 +27,10 @@ interface MapComponentProps {
     initial_lng?: number;
     /** Lista de reseñas para mostrar como marcadores */
     reviews?: Review_Model[];
+    /** Grupos de reseñas agregados en el servidor */
+    clusters?: Review_Cluster[];
+    /** Callback cuando cambia el viewport visible (bbox minLon,minLat,maxLon,maxLat y zoom) */
+    on_viewport_change?: (bbox: string, zoom: number) => void;
     /** Callback cuando se selecciona una reseña */
     on_review_select?: (review: Review_Model) => void;
     /** Función para geocodificar direcciones */
@@ -48,6 +52,75 @@ const MapController = ({ center }: { center: [number, number] | null }) => {
     return null;
 };
 
+/**
+ * Componente interno que notifica el viewport visible al moverse el mapa.
+ */
+const ViewportWatcher = ({ on_change }: { on_change: (bbox: string, zoom: number) => void }) => {
+    const notify = (map: L.Map) => {
+        const bounds = map.getBounds();
+        const bbox = [
+            Math.max(bounds.getWest(), -180),
+            Math.max(bounds.getSouth(), -90),
+            Math.min(bounds.getEast(), 180),
+            Math.min(bounds.getNorth(), 90)
+        ].map(value => value.toFixed(6)).join(',');
+        on_change(bbox, map.getZoom());
+    };
+
+    const map = useMapEvents({
+        moveend: () => notify(map)
+    });
+
+    useEffect(() => {
+        notify(map);
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [map]);
+
+    return null;
+};
+
+/**
+ * Crea el icono de un grupo de reseñas con su contador.
+ * @param count Número de reseñas del grupo.
+ * @returns Icono de Leaflet.
+ */
+const cluster_icon = (count: number) => {
+    const size = count < 10 ? 36 : count < 100 ? 44 : 52;
+    return L.divIcon({
+        html: `<div class="flex items-center justify-center rounded-full bg-indigo-500/90 text-white text-sm font-bold border-2 border-white shadow-lg" style="width:${size}px;height:${size}px">${count}</div>`,
+        className: '',
+        iconSize: [size, size],
+        iconAnchor: [size / 2, size / 2]
+    });
+};
+
+/**
+ * Indica si la reseña ya tiene coordenadas (no está pendiente de geocodificar).
+ * @param review Reseña a comprobar.
+ * @returns true si latitud y longitud están disponibles.
+ */
+const has_coordinates = (
+    review: Review_Model
+): review is Review_Model & { latitude: number; longitude: number } =>
+    review.latitude !== null && review.longitude !== null;
+
+/**
+ * Componente interno que acerca el mapa al pulsar un grupo.
+ */
+const ClusterMarker = ({ cluster }: { cluster: Review_Cluster }) => {
+    const map = useMap();
+
+    return (
+        <Marker
+            position={[cluster.latitude, cluster.longitude]}
+            icon={cluster_icon(cluster.count)}
+            eventHandlers={{
+                click: () => map.flyTo([cluster.latitude, cluster.longitude], map.getZoom() + 2)
+            }}
+        />
+    );
+};
+
 /**
  * Componente de mapa interactivo con marcadores de reseñas y búsqueda.
  * Permite buscar direcciones y ver reseñas en el mapa.
@@ -58,6 +131,8 @@ export const MapComponent = ({
     initial_lat = 40.4168, 
     initial_lng = -3.7038, 
     reviews = [],
+    clusters = [],
+    on_viewport_change,
     on_review_select,
     on_geocode
 }: MapComponentProps) => {
@@ -166,6 +241,16 @@ export const MapComponent = ({
                 
                 <MapController center={map_center} />
 
+                {on_viewport_change && <ViewportWatcher on_change={on_viewport_change} />}
+
+                {/* Review Clusters */}
+                {clusters.map((cluster) => (
+                    <ClusterMarker
+                        key={`${cluster.latitude},${cluster.longitude}`}
+                        cluster={cluster}
+                    />
+                ))}
+
                 {/* Search Result Marker */}
                 {search_marker && (
                     <Marker position={search_marker}>
@@ -179,7 +264,7 @@ export const MapComponent = ({
                 )}
 
                 {/* Review Markers */}
-                {reviews.map((review) => (
+                {reviews.filter(has_coordinates).map((review) => (
                     <Marker 
                         key={review.id} 
                         position={[review.latitude, review.longitude]}
@@ -191,7 +276,7 @@ export const MapComponent = ({
                             <div className="min-w-[200px]">
                                 {review.image_urls && review.image_urls.length > 0 && (
                                     <img 
-                                        src={review.image_urls[0]} 
+                                        src={review.thumbnail_urls?.[0] ?? review.image_urls[0]} 
                                         alt={review.establishment_name}
                                         className="w-full h-24 object-cover rounded-lg mb-2"
                                     />
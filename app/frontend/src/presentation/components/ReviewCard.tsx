@@ -1,5 +1,5 @@
 import { FontAwesomeIcon } from '@fortawesome/react-fontawesome';
-import { faMapMarkerAlt, faUser, faCalendar, faImage } from '@fortawesome/free-solid-svg-icons';
+import { faMapMarkerAlt, faUser, faCalendar, faImage, faSpinner } from '@fortawesome/free-solid-svg-icons';
 import { StarRating } from './StarRating';
 import type { Review_Model } from '../../domain/models/Review';
 
@@ -47,7 +47,7 @@ export const ReviewCard = ({ review, on_click }: ReviewCardProps) => {
             {review.image_urls && review.image_urls.length > 0 ? (
                 <div className="relative h-40 -mx-5 -mt-5 mb-4 overflow-hidden rounded-t-2xl">
                     <img
-                        src={review.image_urls[0]}
+                        src={review.thumbnail_urls?.[0] ?? review.image_urls[0]}
                         alt={`Imagen de ${review.establishment_name}`}
                         className="w-full h-full object-cover transition-transform group-hover:scale-105"
                     />
@@ -83,7 +83,14 @@ export const ReviewCard = ({ review, on_click }: ReviewCardProps) => {
 
                 {/* Coordinates */}
                 <div className="mt-2 text-xs text-slate-500 font-mono bg-slate-100/60 rounded-lg px-2 py-1 inline-block">
-                    📍 {review.latitude.toFixed(6)}, {review.longitude.toFixed(6)}
+                    {review.latitude === null || review.longitude === null ? (
+                        <span className="flex items-center gap-1.5">
+                            <FontAwesomeIcon icon={faSpinner} className="animate-spin text-indigo-500" />
+                            geocodificando…
+                        </span>
+                    ) : (
+                        <>📍 {review.latitude.toFixed(6)}, {review.longitude.toFixed(6)}</>
+                    )}
                 </div>
 
                 {/* Footer: Author and Date */}
@@ -10,7 +10,8 @@ import {
     faEnvelope,
     faChevronLeft,
     faChevronRight,
-    faTrash
+    faTrash,
+    faSpinner
 } from '@fortawesome/free-solid-svg-icons';
 import { StarRating } from './StarRating';
 import type { Review_Model } from '../../domain/models/Review';
@@ -171,7 +172,14 @@ export const ReviewDetail = ({
                         <div>
                             <p className="font-semibold text-slate-700">{review.address}</p>
                             <p className="text-sm text-slate-500 font-mono mt-1">
-                                Lon: {review.longitude.toFixed(7)}, Lat: {review.latitude.toFixed(7)}
+                                {review.latitude === null || review.longitude === null ? (
+                                    <span className="flex items-center gap-1.5">
+                                        <FontAwesomeIcon icon={faSpinner} className="animate-spin text-indigo-500" />
+                                        geocodificando…
+                                    </span>
+                                ) : (
+                                    <>Lon: {review.longitude.toFixed(7)}, Lat: {review.latitude.toFixed(7)}</>
+                                )}
                             </p>
                         </div>
                     </div>
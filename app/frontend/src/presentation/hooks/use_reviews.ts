@@ -1,9 +1,15 @@
 import { useState, useEffect, useCallback } from 'react';
-import type { Review_Model, Geocoding_Result } from '../../domain/models/Review';
+import type { Review_Model, Review_Cluster, Geocoding_Result } from '../../domain/models/Review';
 import { Http_Review_Repository } from '../../infrastructure/repositories/HttpReviewRepository';
 
 const review_repository = new Http_Review_Repository();
 
+/** Esperas (ms) entre consultas a una reseña cuyo geocoding sigue pendiente */
+const GEOCODE_POLL_DELAYS = [2000, 5000, 10000, 20000, 40000];
+
+/** Número de reseñas que se piden en cada página del listado */
+const PAGE_SIZE = 20;
+
 /**
  * Hook personalizado para gestionar las reseñas.
  * Proporciona estado y operaciones CRUD para reseñas.
@@ -13,16 +19,21 @@ export const use_reviews = () => {
     const [reviews, set_reviews] = useState<Review_Model[]>([]);
     const [loading, set_loading] = useState<boolean>(true);
     const [error, set_error] = useState<string | null>(null);
+    const [next_cursor, set_next_cursor] = useState<string | null>(null);
+    const [loading_more, set_loading_more] = useState<boolean>(false);
+    const [clusters, set_clusters] = useState<Review_Cluster[]>([]);
+    const [map_points, set_map_points] = useState<Review_Model[]>([]);
 
     /**
-     * Carga todas las reseñas desde el servidor.
+     * Carga la primera página de reseñas desde el servidor.
      */
     const fetch_reviews = useCallback(async () => {
         try {
             set_loading(true);
             set_error(null);
-            const data = await review_repository.get_all();
-            set_reviews(data);
+            const page = await review_repository.get_page(PAGE_SIZE);
+            set_reviews(page.items);
+            set_next_cursor(page.next_cursor);
         } catch (err) {
             set_error('Error al cargar las reseñas');
             console.error('Error fetching reviews:', err);
@@ -31,6 +42,44 @@ export const use_reviews = () => {
         }
     }, []);
 
+    /**
+     * Carga la página siguiente de reseñas y la añade al listado.
+     */
+    const fetch_more_reviews = useCallback(async () => {
+        if (!next_cursor || loading_more) return;
+        try {
+            set_loading_more(true);
+            set_error(null);
+            const page = await review_repository.get_page(PAGE_SIZE, next_cursor);
+            set_reviews(prev => {
+                // Una reseña creada en esta sesión puede volver a aparecer en páginas posteriores
+                const known = new Set(prev.map(review => review.id));
+                return [...prev, ...page.items.filter(review => !known.has(review.id))];
+            });
+            set_next_cursor(page.next_cursor);
+        } catch (err) {
+            set_error('Error al cargar más reseñas');
+            console.error('Error fetching more reviews:', err);
+        } finally {
+            set_loading_more(false);
+        }
+    }, [next_cursor, loading_more]);
+
+    /**
+     * Carga los marcadores del mapa para el viewport visible.
+     * @param bbox Viewport en formato minLon,minLat,maxLon,maxLat.
+     * @param zoom Nivel de zoom del mapa.
+     */
+    const fetch_clusters = useCallback(async (bbox: string, zoom: number) => {
+        try {
+            const data = await review_repository.get_clusters(bbox, zoom);
+            set_clusters(data.clusters);
+            set_map_points(data.points);
+        } catch (err) {
+            console.error('Error fetching clusters:', err);
+        }
+    }, []);
+
     /**
      * Crea una nueva reseña.
      * @param form_data FormData con los datos de la reseña.
@@ -39,9 +88,33 @@ export const use_reviews = () => {
     const create_review = async (form_data: FormData): Promise<Review_Model> => {
         const new_review = await review_repository.create(form_data);
         set_reviews(prev => [new_review, ...prev]);
+        if (new_review.geocode_status === 'pending') {
+            wait_for_geocoding(new_review.id);
+        }
         return new_review;
     };
 
+    /**
+     * Consulta una reseña con geocoding pendiente hasta que tiene coordenadas
+     * y la sustituye en el estado.
+     * @param id ID de la reseña.
+     */
+    const wait_for_geocoding = async (id: string): Promise<void> => {
+        for (const delay of GEOCODE_POLL_DELAYS) {
+            await new Promise(resolve => setTimeout(resolve, delay));
+            try {
+                const review = await review_repository.get_by_id(id);
+                if (!review) return;
+                if (review.geocode_status !== 'pending') {
+                    set_reviews(prev => prev.map(item => item.id === id ? review : item));
+                    return;
+                }
+            } catch (err) {
+                console.error('Error polling review geocoding:', err);
+            }
+        }
+    };
+
     /**
      * Elimina una reseña por su ID.
      * @param id ID de la reseña a eliminar.
@@ -81,7 +154,13 @@ export const use_reviews = () => {
         reviews,
         loading,
         error,
+        has_more: next_cursor !== null,
+        loading_more,
+        clusters,
+        map_points,
         fetch_reviews,
+        fetch_more_reviews,
+        fetch_clusters,
         create_review,
         delete_review,
         get_review_by_id,
@@ -27,6 +27,12 @@ export const ReviewsPage = () => {
         reviews, 
         loading, 
         error, 
+        has_more,
+        loading_more,
+        fetch_more_reviews,
+        clusters,
+        map_points,
+        fetch_clusters,
         create_review, 
         delete_review,
         get_review_by_id,
@@ -140,7 +146,7 @@ export const ReviewsPage = () => {
                             Reseñas de Establecimientos
                         </h2>
                         <p className="text-slate-600 text-sm mt-1">
-                            {reviews.length} reseña{reviews.length !== 1 ? 's' : ''} registrada{reviews.length !== 1 ? 's' : ''}
+                            {reviews.length}{has_more ? '+' : ''} reseña{reviews.length !== 1 ? 's' : ''} registrada{reviews.length !== 1 ? 's' : ''}
                         </p>
                     </div>
                     
@@ -232,11 +238,27 @@ export const ReviewsPage = () => {
                             </div>
                         )}
 
+                        {/* Load More */}
+                        {view_mode === 'list' && has_more && (
+                            <div className="flex justify-center mt-6">
+                                <button
+                                    onClick={fetch_more_reviews}
+                                    disabled={loading_more}
+                                    className="px-6 py-3 bg-white/80 text-slate-700 border border-white/60 font-semibold rounded-xl shadow-sm hover:bg-white hover:shadow-md transition-all flex items-center gap-2 backdrop-blur-sm disabled:opacity-60"
+                                >
+                                    {loading_more && <FontAwesomeIcon icon={faSpinner} className="animate-spin text-indigo-500" />}
+                                    Cargar más reseñas
+                                </button>
+                            </div>
+                        )}
+
                         {/* Map View */}
                         {view_mode === 'map' && (
                             <div className="h-[calc(100vh-220px)] min-h-[500px] rounded-3xl overflow-hidden border border-white/40 shadow-xl shadow-indigo-500/10 bg-white/60 backdrop-blur-lg">
                                 <MapComponent
-                                    reviews={reviews}
+                                    reviews={map_points}
+                                    clusters={clusters}
+                                    on_viewport_change={fetch_clusters}
                                     on_review_select={handle_select_review}
                                     on_geocode={geocode_address}
                                 />